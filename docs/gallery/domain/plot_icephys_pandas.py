@@ -329,6 +329,17 @@ dataframe_image.export(
 #     :alt: icephys_meta_dataframe_drop_id.png
 #     :align: center
 
+#####################################################################
+# The same flat table can also be created directly with
+# :py:meth:`~pynwb.file.NWBFile.get_icephys_meta_dataframe`, which joins the rows of the tables using
+# the row indices stored in the tables instead of building a nested `DataFrame`_ for each row. This is
+# much faster for large tables. The ``tables`` argument selects the tables to include, e.g., to get one row
+# for each sequential recording with the metadata of its repetition, only the repetitions and
+# sequential_recordings tables are read.
+
+flat_icephys_meta_df = nwbfile.get_icephys_meta_dataframe()
+sequential_recordings_df = nwbfile.get_icephys_meta_dataframe(tables=["repetitions", "sequential_recordings"])
+
 #####################################################################
 # Useful additional data preparations
 # -----------------------------------
@@ -137,6 +137,14 @@ def get_type_map(**kwargs):
     return type_map
 
 
+def _is_type_config_loaded():
+    '''
+    Return whether a type configuration is loaded. The type configuration is shared by the global TypeMap and
+    all its copies, so this does not need to copy the global TypeMap.
+    '''
+    return len(__TYPE_MAP.type_config.path) > 0
+
+
 @docval(*get_docval(get_type_map),
         returns="the namespaces loaded from the given file", rtype=tuple,
         is_method=False)
@@ -1,11 +1,16 @@
 from warnings import warn
 from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from typing import NamedTuple
 
+import h5py
 import numpy as np
 
-from hdmf.utils import docval, popargs_to_dict, get_docval, popargs
+from hdmf.utils import docval, popargs_to_dict, get_docval, popargs, getargs
 from hdmf.common import DynamicTable, VectorData
+from hdmf.container import Data
+from hdmf.data_utils import DataIO
+from hdmf.backends.hdf5.h5_utils import ContainerH5TableDataset
 from hdmf.utils import get_data_shape
 
 from . import register_class, CORE_NAMESPACE
@@ -162,6 +167,7 @@ class TimeSeries(NWBDataInterface):
         keys_to_process = ("data", "timestamps")  # these are properties and cannot be set with setattr
         args_to_process = popargs_to_dict(keys_to_process, kwargs)
         super().__init__(**kwargs)
+        self.__fixed_shapes = dict()
 
         for key, val in args_to_set.items():
             setattr(self, key, val)
@@ -209,8 +215,8 @@ class TimeSeries(NWBDataInterface):
         if self.timestamps is None:
             return True
 
-        data_shape = get_data_shape(data=self.fields["data"], strict_no_data_load=True)
-        timestamps_shape = get_data_shape(data=self.fields["timestamps"], strict_no_data_load=True)
+        data_shape = self.__get_shape(self.fields["data"])
+        timestamps_shape = self.__get_shape(self.fields["timestamps"])
 
         # skip check if shape of data or timestamps cannot be computed
         if data_shape is None or timestamps_shape is None:
@@ -222,10 +228,35 @@ class TimeSeries(NWBDataInterface):
 
         return data_shape[0] == timestamps_shape[0]
 
+    def __get_fixed_shape(self, data):
+        """Get the shape of a dataset whose shape cannot change, or None if the shape of data may change.
+
+        The shape is looked up once, so that repeated calls do not query the file, which can be expensive
+        for remote files.
+        """
+        cached = self.__fixed_shapes.get(id(data))
+        if cached is not None and cached[0] is data:
+            return cached[1]
+        if not _has_fixed_shape(data):
+            return None
+        shape = data.shape
+        self.__fixed_shapes[id(data)] = (data, shape)
+        return shape
+
+    def __get_shape(self, data):
+        shape = self.__get_fixed_shape(data)
+        if shape is None:
+            shape = get_data_shape(data=data, strict_no_data_load=True)
+        return shape
+
     @property
     def num_samples(self):
         ''' Tries to return the number of data samples. If this cannot be assessed, returns None.
         '''
+        data = self.data
+        shape = self.__get_fixed_shape(data)
+        if shape:
+            return shape[0]
 
         def unreadable_warning(attr):
             return (
@@ -236,18 +267,22 @@ class TimeSeries(NWBDataInterface):
         def no_len_warning(attr):
             return 'The {} attribute on this TimeSeries (named: {}) has no __len__'.format(attr, self.name)
 
-        if hasattr(self.data, '__len__'):
+        if hasattr(data, '__len__'):
             try:
-                return len(self.data)  # for an ndarray this will return the first element of shape
+                return len(data)  # for an ndarray this will return the first element of shape
             except TypeError:
                 warn(unreadable_warning('data'), UserWarning)
         else:
             warn(no_len_warning('data'), UserWarning)
 
         # only get here if self.data has no __len__ or __len__ is unreadable
-        if hasattr(self.timestamps, '__len__'):
+        timestamps = self.timestamps
+        shape = self.__get_fixed_shape(timestamps)
+        if shape:
+            return shape[0]
+        if hasattr(timestamps, '__len__'):
             try:
-                return len(self.timestamps)
+                return len(timestamps)
             except TypeError:
                 warn(unreadable_warning('timestamps'), UserWarning)
         elif self.rate is None and self.starting_time is None:
@@ -362,6 +397,282 @@ class TimeSeries(NWBDataInterface):
             scale_factor = self.conversion
         return np.asarray(self.data) * scale_factor + self.offset
 
+    @docval({'name': 'event_times', 'type': ('array_data', 'data', DynamicTable),
+             'doc': 'The times of the events to align to, in seconds, or a TimeIntervals table (e.g., '
+                    'NWBFile.trials) whose rows define the events.'},
+            {'name': 'window', 'type': (list, tuple), 'shape': (2,),
+             'doc': 'Start and stop of the window around each event, in seconds relative to the event time, '
+                    'e.g., (-0.5, 1.0).'},
+            {'name': 'align_to', 'type': str, 'default': 'start_time',
+             'doc': 'The column of the TimeIntervals table that holds the event times. Ignored if '
+                    'event_times is an array.'},
+            {'name': 'fill_value', 'type': (int, float), 'default': np.nan,
+             'doc': 'Value used for samples of a window that fall outside of the data.'},
+            {'name': 'max_workers', 'type': int, 'default': None,
+             'doc': 'Number of threads used to read the data. By default, all reads are done in the calling thread.'},
+            returns='Array of shape (events, samples, ...) with the data in the window around each event',
+            rtype=np.ndarray)
+    def get_event_aligned_data(self, **kwargs):
+        """
+        Extract the data in a fixed time window around each event into a single array.
+
+        The sample indices for all windows are computed at once. Overlapping or nearby windows are then
+        merged into a small number of large reads of the data, which are copied into a preallocated array
+        of shape (events, samples, ...), where the trailing dimensions are those of the data.
+
+        If the TimeSeries has a sampling rate, each window starts at the sample nearest to the start of the
+        window and all windows have the same number of samples. If the TimeSeries has timestamps, each
+        window contains the samples with timestamps in [event + window[0], event + window[1]) and shorter
+        windows are padded with *fill_value* at the end. Samples of a window that fall before the start or
+        after the end of the data are also set to *fill_value*. If *fill_value* is NaN and the data is not
+        floating point, the returned array is cast to float64.
+
+        NOTE: The raw values of the data are returned, i.e., conversion and offset are not applied.
+        """
+        event_times, window, align_to = getargs('event_times', 'window', 'align_to', kwargs)
+        fill_value, max_workers = getargs('fill_value', 'max_workers', kwargs)
+        if isinstance(event_times, DynamicTable):
+            event_times = event_times[align_to].data
+        event_times = np.asarray(event_times[:], dtype=float)
+        if window[1] < window[0]:
+            raise ValueError("window start must not be larger than window stop, got %s" % str(tuple(window)))
+
+        num_samples = self.num_samples
+        if self.timestamps is not None:
+            timestamps = np.asarray(self.timestamps[:])
+            starts = np.searchsorted(timestamps, event_times + window[0], side='left')
+            stops = np.searchsorted(timestamps, event_times + window[1], side='left')
+            window_len = int(np.max(stops - starts)) if len(starts) else 0
+        else:
+            window_len = int(round((window[1] - window[0]) * self.rate))
+            starts = np.rint((event_times + window[0] - self.starting_time) * self.rate).astype(np.int64)
+            stops = starts + window_len
+        # restrict the reads to the samples that exist and remember where they go in each window
+        read_starts = np.clip(starts, 0, num_samples)
+        read_stops = np.clip(stops, read_starts, num_samples)
+        offsets = read_starts - starts
+
+        data = self.data
+        data_shape = get_data_shape(data)
+        dtype = data.dtype if hasattr(data, 'dtype') else np.asarray(data[:1]).dtype
+        if np.isnan(fill_value) and dtype.kind not in 'fc':
+            dtype = np.result_type(dtype, np.float64)
+        ret = np.full((len(event_times), window_len) + tuple(data_shape[1:]), fill_value, dtype=dtype)
+        for i, values in _iter_ranges(data, read_starts, read_stops, max_workers=max_workers):
+            ret[i, offsets[i]:offsets[i] + len(values)] = values
+        return ret
+
+
+class TimeSeriesPyramid:
+    """
+    Multi-resolution summary of the data of a :py:class:`~pynwb.base.TimeSeries` for fast overview rendering.
+
+    Each level *L* of the pyramid splits the data into consecutive bins of ``factor**L`` samples and stores
+    the minimum, maximum and mean of each bin. The pyramid is computed in a single pass over the data,
+    and :py:meth:`~pynwb.base.TimeSeriesPyramid.get_data` then returns the finest representation of a time
+    range that has at most as many points as requested, so that drawing hours of data at screen
+    resolution only reads a few kilobytes.
+
+    The levels can be stored alongside the source TimeSeries (e.g., in a ProcessingModule) as regular
+    TimeSeries via :py:meth:`~pynwb.base.TimeSeriesPyramid.to_timeseries` and reloaded with
+    :py:meth:`~pynwb.base.TimeSeriesPyramid.from_timeseries`.
+    """
+
+    STATISTICS = ('min', 'max', 'mean')
+    """Order of the statistics along the second dimension of the data of the TimeSeries of each level"""
+
+    @docval({'name': 'timeseries', 'type': TimeSeries, 'doc': 'the TimeSeries to summarize'},
+            {'name': 'factor', 'type': int, 'default': 10,
+             'doc': 'the number of bins of a level that are combined into one bin of the next level'},
+            {'name': 'num_levels', 'type': int, 'default': None,
+             'doc': 'the number of levels to compute. By default, levels are added until a level has at most '
+                    '*factor* bins.'},
+            {'name': 'buffer_size', 'type': int, 'default': 2**20,
+             'doc': 'the approximate number of samples read from the data at a time'})
+    def __init__(self, **kwargs):
+        timeseries, factor, num_levels, buffer_size = getargs('timeseries', 'factor', 'num_levels', 'buffer_size',
+                                                              kwargs)
+        if factor < 2:
+            raise ValueError("factor must be at least 2, got %d" % factor)
+        self.__timeseries = timeseries
+        self.__factor = factor
+        self.__levels = list()  # for each level, a tuple (minimum, maximum, mean, bin start times or None)
+        num_samples = timeseries.num_samples or 0
+        if num_samples == 0 or num_levels == 0:
+            return
+
+        # compute the first level in a single pass over the data, reading blocks that are a multiple of
+        # both the factor and the chunk size of the data
+        data = timeseries.data
+        block_size = max(buffer_size // factor, 1) * factor
+        chunks = getattr(data, 'chunks', None)
+        if isinstance(chunks, tuple):
+            block_size = max(block_size // np.lcm(factor, chunks[0]), 1) * np.lcm(factor, chunks[0])
+        minimum, maximum, sums = list(), list(), list()
+        for start in range(0, num_samples, block_size):
+            block = np.asarray(data[start:start + block_size])
+            bin_starts = np.arange(0, len(block), factor)
+            minimum.append(np.minimum.reduceat(block, bin_starts, axis=0))
+            maximum.append(np.maximum.reduceat(block, bin_starts, axis=0))
+            sums.append(np.add.reduceat(block, bin_starts, axis=0, dtype=np.float64))
+        minimum, maximum, sums = np.concatenate(minimum), np.concatenate(maximum), np.concatenate(sums)
+        timestamps = timeseries.timestamps
+        if timestamps is not None:
+            timestamps = np.asarray(timestamps[:])
+
+        bin_size = factor
+        while True:
+            counts = np.minimum(bin_size, num_samples - np.arange(len(sums)) * bin_size)
+            means = sums / counts.reshape((-1,) + (1,) * (sums.ndim - 1))
+            level_timestamps = timestamps[::bin_size] if timestamps is not None else None
+            self.__levels.append((minimum, maximum, means, level_timestamps))
+            if len(minimum) <= factor or len(self.__levels) == num_levels:
+                break
+            bin_starts = np.arange(0, len(minimum), factor)
+            minimum = np.minimum.reduceat(minimum, bin_starts, axis=0)
+            maximum = np.maximum.reduceat(maximum, bin_starts, axis=0)
+            sums = np.add.reduceat(sums, bin_starts, axis=0)
+            bin_size *= factor
+
+    @property
+    def timeseries(self):
+        """The TimeSeries summarized by this pyramid"""
+        return self.__timeseries
+
+    @property
+    def factor(self):
+        """The number of bins of a level that are combined into one bin of the next level"""
+        return self.__factor
+
+    @property
+    def num_levels(self):
+        """The number of levels of the pyramid, not counting the original data"""
+        return len(self.__levels)
+
+    def bin_size(self, level):
+        """Return the number of samples of the original data in each bin of the given level."""
+        return self.__factor ** level
+
+    def __bin_range(self, level, start_time, stop_time):
+        """Return the range [start, stop) of the bins of the given level that cover the time range."""
+        if level == 0:
+            num_bins = self.__timeseries.num_samples
+            timestamps = self.__timeseries.timestamps
+        else:
+            num_bins = len(self.__levels[level - 1][0])
+            timestamps = self.__levels[level - 1][3]
+        if timestamps is not None:
+            start = 0 if start_time is None else max(int(np.searchsorted(timestamps, start_time, side='right')) - 1, 0)
+            stop = num_bins if stop_time is None else int(np.searchsorted(timestamps, stop_time, side='left'))
+        else:
+            # round before taking floor and ceil to avoid extra bins due to floating point errors
+            ts = self.__timeseries
+            samples_per_second = ts.rate / self.bin_size(level)
+            start = 0 if start_time is None else \
+                int(np.floor(np.round((start_time - ts.starting_time) * samples_per_second, 9)))
+            stop = num_bins if stop_time is None else \
+                int(np.ceil(np.round((stop_time - ts.starting_time) * samples_per_second, 9)))
+        return min(max(start, 0), num_bins), min(max(stop, 0), num_bins)
+
+    @docval({'name': 'start_time', 'type': float, 'doc': 'start of the time range, in seconds', 'default': None},
+            {'name': 'stop_time', 'type': float, 'doc': 'end of the time range, in seconds', 'default': None},
+            {'name': 'max_points', 'type': int, 'doc': 'the maximum number of bins to return, e.g., the number of '
+                                                      'pixels available to draw the time range', 'default': 2000},
+            returns='the level to use, where 0 is the original data', rtype=int)
+    def select_level(self, **kwargs):
+        """Select the finest level that represents the time range with at most *max_points* bins."""
+        start_time, stop_time, max_points = getargs('start_time', 'stop_time', 'max_points', kwargs)
+        for level in range(self.num_levels + 1):
+            start, stop = self.__bin_range(level, start_time, stop_time)
+            if stop - start <= max_points:
+                return level
+        return self.num_levels
+
+    @docval(*get_docval(select_level),
+            returns='tuple of (level, timestamps, minimum, maximum, mean) where timestamps are the start times of '
+                    'the bins', rtype=tuple)
+    def get_data(self, **kwargs):
+        """
+        Get the minimum, maximum, and mean of the bins of the selected level that cover the given time range.
+
+        For level 0, the original data is returned as minimum, maximum, and mean.
+        """
+        start_time, stop_time = getargs('start_time', 'stop_time', kwargs)
+        level = self.select_level(**kwargs)
+        start, stop = self.__bin_range(level, start_time, stop_time)
+        ts = self.__timeseries
+        if level == 0:
+            minimum = maximum = mean = np.asarray(ts.data[start:stop])
+            timestamps = ts.timestamps
+        else:
+            minimum, maximum, mean, timestamps = self.__levels[level - 1]
+            minimum, maximum, mean = (np.asarray(x[start:stop]) for x in (minimum, maximum, mean))
+        if timestamps is not None:
+            timestamps = np.asarray(timestamps[start:stop])
+        else:
+            timestamps = ts.starting_time + np.arange(start, stop) * self.bin_size(level) / ts.rate
+        return level, timestamps, minimum, maximum, mean
+
+    @docval(returns='one TimeSeries for each level of the pyramid', rtype=list)
+    def to_timeseries(self):
+        """
+        Get the levels of the pyramid as TimeSeries that can be stored alongside the source TimeSeries.
+
+        The data of each TimeSeries has shape (bins, 3, ...) with the statistics ordered as in
+        :py:attr:`~pynwb.base.TimeSeriesPyramid.STATISTICS`.
+        """
+        ts = self.__timeseries
+        ret = list()
+        for level, (minimum, maximum, mean, timestamps) in enumerate(self.__levels, start=1):
+            bin_size = self.bin_size(level)
+            data = np.stack([minimum.astype(mean.dtype), maximum.astype(mean.dtype), mean], axis=1)
+            kwargs = dict(name='%s_pyramid_%d' % (ts.name, bin_size), data=data, unit=ts.unit,
+                          conversion=ts.conversion, offset=ts.offset,
+                          description=("Minimum, maximum, and mean (along the second dimension) of bins of %d "
+                                       "samples of the data of TimeSeries '%s'" % (bin_size, ts.name)))
+            if timestamps is not None:
+                kwargs['timestamps'] = timestamps
+            else:
+                kwargs['starting_time'] = ts.starting_time
+                kwargs['rate'] = ts.rate / bin_size
+            ret.append(TimeSeries(**kwargs))
+        return ret
+
+    @classmethod
+    @docval({'name': 'timeseries', 'type': TimeSeries, 'doc': 'the TimeSeries summarized by the pyramid'},
+            {'name': 'levels', 'type': (list, tuple),
+             'doc': 'the TimeSeries of the levels as created by to_timeseries, from finest to coarsest'},
+            {'name': 'factor', 'type': int, 'default': 10,
+             'doc': 'the number of bins of a level that are combined into one bin of the next level'},
+            returns='the pyramid', rtype='TimeSeriesPyramid')
+    def from_timeseries(cls, **kwargs):
+        """
+        Create a pyramid from levels that have been stored as TimeSeries, e.g., after reading them from a file.
+
+        The data of the levels is not loaded, i.e., only the bins needed for a query are read.
+        """
+        timeseries, levels, factor = getargs('timeseries', 'levels', 'factor', kwargs)
+        ret = cls(timeseries, factor=factor, num_levels=0)
+        for level in levels:
+            data = level.data
+            stats = tuple(_StatisticView(data, i) for i in range(len(cls.STATISTICS)))
+            ret.__levels.append(stats + (level.timestamps, ))
+        return ret
+
+
+class _StatisticView:
+    """Lazy view of one statistic of the (bins, statistics, ...) data of a stored TimeSeriesPyramid level"""
+
+    def __init__(self, data, index):
+        self.__data = data
+        self.__index = index
+
+    def __len__(self):
+        return len(self.__data)
+
+    def __getitem__(self, arg):
+        return np.asarray(self.__data[arg])[:, self.__index]
+
 
 @register_class('Image', CORE_NAMESPACE)
 class Image(NWBData):
@@ -576,6 +887,45 @@ class TimeSeriesReference(NamedTuple):
         return cls(-1, -1, timeseries)
 
 
+class TimeSeriesReferenceColumns(NamedTuple):
+    """
+    Columnar representation of a selection of rows of a :py:class:`~pynwb.base.TimeSeriesReferenceVectorData`,
+    as returned by :py:meth:`~pynwb.base.TimeSeriesReferenceVectorData.get_columns`.
+    This is a ``typing.NamedTuple`` type with predefined tuple components
+    :py:meth:`~pynwb.base.TimeSeriesReferenceColumns.idx_start`,
+    :py:meth:`~pynwb.base.TimeSeriesReferenceColumns.count`,
+    :py:meth:`~pynwb.base.TimeSeriesReferenceColumns.timeseries`,
+    :py:meth:`~pynwb.base.TimeSeriesReferenceColumns.valid`,
+    :py:meth:`~pynwb.base.TimeSeriesReferenceColumns.codes`, and
+    :py:meth:`~pynwb.base.TimeSeriesReferenceColumns.categories`.
+
+    :cvar idx_start:
+    :cvar count:
+    :cvar timeseries:
+    :cvar valid:
+    :cvar codes:
+    :cvar categories:
+    """
+    idx_start: np.ndarray
+    """Integer array with the start index of each reference. Missing values are stored as -1"""
+
+    count: np.ndarray
+    """Integer array with the number of timesteps of each reference. Missing values are stored as -1"""
+
+    timeseries: np.ndarray
+    """Object array with the :py:class:`~pynwb.base.TimeSeries` of each reference. None for missing values"""
+
+    valid: np.ndarray
+    """Boolean array indicating which references are valid, i.e., are not missing values"""
+
+    codes: np.ndarray
+    """Integer array with the index of the :py:class:`~pynwb.base.TimeSeries` of each reference in
+    :py:meth:`~pynwb.base.TimeSeriesReferenceColumns.categories`. -1 for missing values"""
+
+    categories: np.ndarray
+    """Object array with the distinct :py:class:`~pynwb.base.TimeSeries` the references point to"""
+
+
 @register_class('TimeSeriesReferenceVectorData', CORE_NAMESPACE)
 class TimeSeriesReferenceVectorData(VectorData):
     """
@@ -631,7 +981,8 @@ class TimeSeriesReferenceVectorData(VectorData):
         to be added to this class then we have a place for it without having to also
         update :py:class:`~pynwb.io.epoch.TimeIntervalsMap` (which would likely get forgotten)
         """
-        pass
+        # columns of the whole dataset, cached if the data is read from a file and cannot change
+        self.__columns = None
 
     @docval({'name': 'val', 'type': (TIME_SERIES_REFERENCE_TUPLE, tuple),
              'doc': 'the value to add to this column. If this is a regular tuple then it '
@@ -655,6 +1006,72 @@ class TimeSeriesReferenceVectorData(VectorData):
         arg.check_types()
         super().append(arg)
 
+    @docval({'name': 'idx_start', 'type': 'array_data', 'doc': 'the start index of each reference'},
+            {'name': 'count', 'type': 'array_data', 'doc': 'the number of timesteps of each reference'},
+            {'name': 'timeseries', 'type': (TimeSeries, 'array_data'),
+             'doc': 'the TimeSeries of each reference, or a single TimeSeries that all references point to'})
+    def add_rows(self, **kwargs):
+        """
+        Append many references to this column at once.
+
+        The types of the values and the ranges of the references are checked for all references at once,
+        as :py:meth:`~pynwb.base.TimeSeriesReference.isvalid` does for a single reference. Missing values are
+        given as ``-1`` for both idx_start and count.
+
+        :raises TypeError: If idx_start or count are not integers or timeseries are not TimeSeries
+        :raises IndexError: If the combination of idx_start and count of a reference is not valid for its
+            TimeSeries.
+        """
+        idx_start, count, timeseries = getargs('idx_start', 'count', 'timeseries', kwargs)
+        idx_start = np.asarray(idx_start)
+        count = np.asarray(count)
+        if idx_start.ndim != 1 or idx_start.shape != count.shape:
+            raise ValueError("idx_start and count must be 1D arrays of the same length, got shapes %s and %s"
+                             % (idx_start.shape, count.shape))
+        if len(idx_start) and idx_start.dtype.kind not in 'iu':
+            raise TypeError("idx_start must be an integer not %s" % str(idx_start.dtype))
+        if len(count) and count.dtype.kind not in 'iu':
+            raise TypeError("count must be an integer %s" % str(count.dtype))
+        if isinstance(timeseries, TimeSeries):
+            codes = np.zeros(len(idx_start), dtype=np.int64)
+            categories = np.empty(1, dtype=object)
+            categories[0] = timeseries
+        else:
+            if len(timeseries) != len(idx_start):
+                raise ValueError("timeseries must be a single TimeSeries or have the same length as idx_start, "
+                                 "got %d TimeSeries for %d references" % (len(timeseries), len(idx_start)))
+            codes, categories = _encode_timeseries(timeseries)
+            for ts in categories:
+                if not isinstance(ts, TimeSeries):
+                    raise TypeError("timeseries must be of type TimeSeries. %s" % str(type(ts)))
+        missing = (idx_start < 0) & (count < 0)
+        for code, ts in enumerate(categories):
+            rows = np.flatnonzero((codes == code) & ~missing)
+            _check_reference_ranges(idx_start[rows], count[rows], ts)
+        self.__extend([self.TIME_SERIES_REFERENCE_TUPLE(*row)
+                       for row in zip(idx_start.tolist(), count.tolist(), categories[codes])])
+
+    def extend(self, ar, **kwargs):
+        """
+        Append all elements of the iterable ar to the end of this column at once.
+
+        :param ar: Iterable of :py:class:`~pynwb.base.TimeSeriesReferenceVectorData.TIME_SERIES_REFERENCE_TUPLE`
+                   or tuples that are convertible to it
+        """
+        rows = [val if isinstance(val, self.TIME_SERIES_REFERENCE_TUPLE) else self.TIME_SERIES_REFERENCE_TUPLE(*val)
+                for val in ar]
+        for val in rows:
+            val.check_types()
+        self.__extend(rows)
+
+    def __extend(self, rows):
+        if isinstance(self.data, (list, DataIO)):
+            # VectorData.extend calls add_row for each element of subclasses, so extend the data directly
+            Data.extend(self, rows)
+        else:
+            for val in rows:
+                super().append(val)
+
     def get(self, key, **kwargs):
         """
         Retrieve elements from this object.
@@ -676,9 +1093,9 @@ class TimeSeriesReferenceVectorData(VectorData):
                   :py:class:`~pynwb.base.TimeSeriesReferenceVectorData.TIME_SERIES_REFERENCE_NONE_TYPE`
                   in which all values (i.e., idx_start, count, timeseries) are set to None.
         """
-        vals = super().get(key)
         # we only selected one row.
         if isinstance(key, (int, np.integer)):
+            vals = super().get(key)
             # NOTE: If we never wrote the data to disk, then vals will be a single tuple.
             #       If the data is loaded from an h5py.Dataset then vals will be a single
             #       np.void object. I.e., an alternative check would be
@@ -689,9 +1106,277 @@ class TimeSeriesReferenceVectorData(VectorData):
             else:
                 return self.TIME_SERIES_REFERENCE_TUPLE(*vals)
         else:  # key selected multiple rows
-            # When loading from HDF5 we get an np.ndarray otherwise we get list-of-list. This
-            # makes the values consistent and transforms the data to use our namedtuple type
-            re = [self.TIME_SERIES_REFERENCE_NONE_TYPE
-                  if (v[0] < 0 or v[1] < 0) else self.TIME_SERIES_REFERENCE_TUPLE(*v)
-                  for v in vals]
+            # Select the rows as columns, which resolves each TimeSeries only once when loading from
+            # HDF5, and transform the data to use our namedtuple type
+            columns = self.get_columns(key)
+            re = [self.TIME_SERIES_REFERENCE_TUPLE(idx_start, count, timeseries)
+                  if valid else self.TIME_SERIES_REFERENCE_NONE_TYPE
+                  for idx_start, count, timeseries, valid in zip(columns.idx_start.tolist(),
+                                                                 columns.count.tolist(),
+                                                                 columns.timeseries,
+                                                                 columns.valid)]
             return re
+
+    def get_columns(self, key=None):
+        """
+        Retrieve elements from this object as columns of NumPy arrays instead of a list of
+        :py:class:`~pynwb.base.TimeSeriesReferenceVectorData.TIME_SERIES_REFERENCE_TUPLE` objects.
+
+        When the data is read from a file, each referenced :py:class:`~pynwb.base.TimeSeries` is resolved
+        only once. If the dataset cannot change, i.e., the file is open read-only, the columns of the whole
+        dataset are read once and reused by subsequent calls.
+
+        :param key: Selection of the elements, i.e., an int, a slice, a list or array of indices, or a
+                    boolean mask. Select all elements if None.
+
+        :returns: :py:class:`~pynwb.base.TimeSeriesReferenceColumns` with one element per selected row.
+                  Missing values, i.e., ``(-1, -1, TimeSeries)`` values, are marked as not valid.
+        """
+        if key is None:
+            key = slice(None)
+        elif isinstance(key, (int, np.integer)):
+            key = np.asarray([key])
+        elif not isinstance(key, slice):
+            key = np.asarray(key)
+            if key.dtype == bool:
+                key = np.flatnonzero(key)
+        data = self.data
+        if isinstance(data, ContainerH5TableDataset):
+            if self.__columns is not None and self.__columns[0] is data:
+                idx_start, count, codes, categories = self.__columns[1]
+            elif _has_fixed_shape(data.dataset):
+                idx_start, count, codes, categories = _read_reference_columns(data, slice(None))
+                self.__columns = (data, (idx_start, count, codes, categories))
+            else:
+                idx_start, count, codes, categories = _read_reference_columns(data, key)
+                key = slice(None)
+            idx_start, count, codes = idx_start[key], count[key], codes[key]
+        else:
+            rows = super().get(key if isinstance(key, slice) else key.tolist())
+            idx_start = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+            count = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+            codes, categories = _encode_timeseries([row[2] for row in rows])
+        valid = (idx_start >= 0) & (count >= 0)
+        codes = np.where(valid, codes, -1)
+        timeseries = np.append(categories, None)[codes]
+        return TimeSeriesReferenceColumns(idx_start, count, timeseries, valid, codes, categories)
+
+    @docval({'name': 'key', 'type': (int, slice, 'array_data'), 'default': None,
+             'doc': 'Selection of the rows, i.e., an int, a slice, a list or array of indices, or a boolean mask. '
+                    'Select all rows if None.'},
+            {'name': 'pad', 'type': bool, 'default': False,
+             'doc': 'Return a single array padded with fill_value instead of a list of arrays.'},
+            {'name': 'fill_value', 'type': (int, float), 'default': np.nan,
+             'doc': 'Value used for padding and for missing values if pad is True.'},
+            {'name': 'max_workers', 'type': int, 'default': None,
+             'doc': 'Number of threads used to read the data. By default, all reads are done in the calling thread.'},
+            returns='List with the data of each selected reference, or array of shape (references, samples, ...) '
+                    'if pad is True',
+            rtype=(list, np.ndarray))
+    def get_data(self, **kwargs):
+        """
+        Get the data of many references at once.
+
+        This is equivalent to getting :py:meth:`~pynwb.base.TimeSeriesReference.data` of each selected
+        reference, but the references are grouped by :py:class:`~pynwb.base.TimeSeries` and the ranges of each
+        TimeSeries that overlap or are close to each other are read together, so that fetching thousands of
+        references only issues a few reads. Note that the arrays of references that were read together
+        may share memory.
+
+        :raises IndexError: If the combination of idx_start and count of a reference is not valid for its
+            TimeSeries.
+        """
+        key, pad, fill_value, max_workers = getargs('key', 'pad', 'fill_value', 'max_workers', kwargs)
+        columns = self.get_columns(key)
+        ret = [None] * len(columns.idx_start)
+        for code, timeseries in enumerate(columns.categories):
+            rows = np.flatnonzero(columns.codes == code)
+            if len(rows) == 0:
+                continue
+            starts = columns.idx_start[rows]
+            stops = starts + columns.count[rows]
+            _check_reference_ranges(starts, columns.count[rows], timeseries)
+            data = timeseries.data
+            for i, values in _iter_ranges(data, starts, stops, max_workers=max_workers):
+                ret[rows[i]] = values
+            for i in np.flatnonzero(stops == starts):
+                ret[rows[i]] = np.asarray(data[starts[i]:stops[i]])
+        if not pad:
+            return ret
+        values = [v for v in ret if v is not None]
+        if len({v.shape[1:] for v in values}) > 1:
+            raise ValueError("Cannot pad the data of references to TimeSeries with different shapes %s"
+                             % sorted({v.shape[1:] for v in values}))
+        dtype = np.result_type(*[v.dtype for v in values]) if values else np.float64
+        if np.isnan(fill_value) and dtype.kind not in 'fc':
+            dtype = np.result_type(dtype, np.float64)
+        length = max((len(v) for v in values), default=0)
+        padded = np.full((len(ret), length) + (values[0].shape[1:] if values else ()), fill_value, dtype=dtype)
+        for i, v in enumerate(ret):
+            if v is not None:
+                padded[i, :len(v)] = v
+        return padded
+
+
+def _has_fixed_shape(data):
+    """
+    Check whether data is an h5py.Dataset whose shape cannot change while it is open, i.e., it is either not
+    resizable or it is in a file that is open read-only and not in SWMR mode.
+    """
+    if not isinstance(data, h5py.Dataset) or not data.id.valid:
+        return False
+    if data.maxshape == data.shape:
+        return True
+    return data.file.mode == 'r' and not data.file.swmr_mode
+
+
+def _check_reference_ranges(idx_start, count, timeseries):
+    """
+    Check that the references given by the idx_start and count arrays are valid for the given TimeSeries.
+    This is the vectorized equivalent of the range checks of TimeSeriesReference.isvalid.
+    """
+    num_samples = timeseries.num_samples
+    if num_samples is not None:
+        bad = np.flatnonzero((idx_start >= num_samples) | (idx_start < 0))
+        if len(bad):
+            raise IndexError("'idx_start' %i out of range for timeseries '%s'" % (idx_start[bad[0]], timeseries.name))
+    bad = np.flatnonzero(count < 0)
+    if len(bad):
+        raise IndexError("'count' %i invalid. 'count' must be positive" % count[bad[0]])
+    if num_samples is not None and np.any(idx_start + count > num_samples):
+        raise IndexError("'idx_start + count' out of range for timeseries '%s'" % timeseries.name)
+
+
+def _encode_timeseries(timeseries):
+    """Get the index of each TimeSeries in a list of TimeSeries in the list of the distinct TimeSeries."""
+    lookup = dict()
+    categories = list()
+    codes = np.empty(len(timeseries), dtype=np.int64)
+    for i, ts in enumerate(timeseries):
+        code = lookup.get(id(ts))
+        if code is None:
+            code = lookup[id(ts)] = len(categories)
+            categories.append(ts)
+        codes[i] = code
+    ret = np.empty(len(categories), dtype=object)
+    ret[:] = categories
+    return codes, ret
+
+
+def _read_reference_columns(data, key):
+    """
+    Read the idx_start, count, and timeseries columns of the rows of a ContainerH5TableDataset selected by key.
+    The object references are dereferenced in HDF5 and each referenced TimeSeries is resolved only once.
+    """
+    dataset = data.dataset
+    if isinstance(key, slice):
+        rows = dataset[key]
+    else:
+        # h5py requires the indices of a point selection to be increasing
+        indices, inverse = np.unique(key, return_inverse=True)
+        rows = dataset[indices][inverse] if len(indices) else dataset[0:0]
+    names = rows.dtype.names
+    fid = dataset.file.id
+    lookup = dict()
+    categories = list()
+    codes = np.empty(len(rows), dtype=np.int64)
+    for i, ref in enumerate(rows[names[2]]):
+        obj_id = h5py.h5r.dereference(ref, fid)
+        code = lookup.get(obj_id)
+        if code is None:
+            code = lookup[obj_id] = len(categories)
+            categories.append(data.get_object(dataset.file[ref]))
+        codes[i] = code
+    ret = np.empty(len(categories), dtype=object)
+    ret[:] = categories
+    return rows[names[0]].astype(np.int64), rows[names[1]].astype(np.int64), codes, ret
+
+
+def _coalesce_ranges(starts, stops, max_gap=0):
+    """
+    Merge the [start, stop) ranges that overlap or are at most *max_gap* elements apart into blocks.
+
+    :returns: Tuple of arrays (block_starts, block_stops, block_ids) where block_ids gives the index of
+              the block that contains each of the input ranges.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    stops = np.asarray(stops, dtype=np.int64)
+    order = np.argsort(starts, kind='stable')
+    sorted_starts = starts[order]
+    reach = np.maximum.accumulate(stops[order]) if len(order) else stops
+    # a new block begins wherever a range starts beyond the end of all previous ranges plus the gap
+    new_block = np.ones(len(order), dtype=bool)
+    new_block[1:] = sorted_starts[1:] > reach[:-1] + max_gap
+    sorted_ids = np.cumsum(new_block) - 1
+    block_starts = sorted_starts[new_block]
+    block_stops = reach[np.append(np.flatnonzero(new_block)[1:] - 1, len(order) - 1)] if len(order) else reach
+    block_ids = np.empty(len(order), dtype=np.int64)
+    block_ids[order] = sorted_ids
+    return block_starts, block_stops, block_ids
+
+
+def _iter_ranges(data, starts, stops, max_gap=None, max_workers=None):
+    """
+    Read the [start, stop) ranges along the first dimension of *data* with as few reads as possible.
+
+    Ranges that overlap or are close to each other are merged into a single read. For chunked datasets
+    (e.g., HDF5), ranges that are less than a chunk apart are merged by default, since reading them
+    separately would read the same chunks again.
+
+    :param data: The array or dataset to read from
+    :param starts: Array with the start index of each range
+    :param stops: Array with the stop index (exclusive) of each range
+    :param max_gap: Maximum number of elements between two ranges that are merged into the same read
+    :param max_workers: Number of threads used to read the blocks. If None, blocks are read in the calling thread.
+
+    :returns: Generator of (index, values) tuples for all non-empty ranges, where index is the position of the
+              range in starts and stops, and values is a numpy array (usually a view of the block read).
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    stops = np.asarray(stops, dtype=np.int64)
+    nonempty = np.flatnonzero(stops > starts)
+    if len(nonempty) == 0:
+        return
+    if max_gap is None:
+        max_gap = _get_max_gap(data)
+    block_starts, block_stops, block_ids = _coalesce_ranges(starts[nonempty], stops[nonempty], max_gap)
+
+    def read_block(b):
+        return np.asarray(data[block_starts[b]:block_stops[b]])
+
+    blocks = range(len(block_starts))
+    if max_workers is not None and max_workers > 1 and len(block_starts) > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            block_values = list(executor.map(read_block, blocks))
+    else:
+        block_values = [read_block(b) for b in blocks]
+    for i, b in zip(nonempty, block_ids):
+        offset = block_starts[b]
+        yield i, block_values[b][starts[i] - offset:stops[i] - offset]
+
+
+def _read_ranges(data, starts, stops, max_gap=None):
+    """
+    Read the [start, stop) ranges along the first dimension of *data* into a single array with as few reads
+    as possible, merging ranges like :py:func:`_iter_ranges`.
+
+    :returns: Tuple (values, offsets) where values is the array with all blocks read and range i is
+              ``values[offsets[i]:offsets[i] + stops[i] - starts[i]]``
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    stops = np.asarray(stops, dtype=np.int64)
+    if max_gap is None:
+        max_gap = _get_max_gap(data)
+    block_starts, block_stops, block_ids = _coalesce_ranges(starts, stops, max_gap)
+    blocks = [np.asarray(data[start:stop]) for start, stop in zip(block_starts.tolist(), block_stops.tolist())]
+    values = np.concatenate(blocks) if blocks else np.asarray(data[0:0])
+    block_offsets = np.zeros(len(blocks), dtype=np.int64)
+    block_offsets[1:] = np.cumsum(block_stops - block_starts)[:-1]
+    return values, block_offsets[block_ids] + starts - block_starts[block_ids]
+
+
+def _get_max_gap(data):
+    """Get the default number of elements between two ranges of data that are merged into the same read"""
+    # ranges that are less than a chunk apart would read the same chunks again
+    chunks = getattr(data, 'chunks', None)
+    return chunks[0] if isinstance(chunks, tuple) else 0
@@ -1,3 +1,4 @@
+from itertools import chain
 from warnings import warn
 
 import numpy as np
@@ -6,11 +7,11 @@ from hdmf import Container, Data
 from hdmf.container import AbstractContainer, MultiContainerInterface as hdmf_MultiContainerInterface, Table
 from hdmf.common import DynamicTable, DynamicTableRegion  # noqa: F401
 from hdmf.common import VectorData, VectorIndex, ElementIdentifiers  # noqa: F401
-from hdmf.utils import docval, popargs
+from hdmf.utils import docval, popargs, get_docval, is_ragged
 from hdmf.utils import LabelledDict  # noqa: F401
 
 from . import CORE_NAMESPACE, register_class
-from pynwb import get_type_map
+from pynwb import get_type_map, _is_type_config_loaded
 
 
 def _not_parent(arg):
@@ -25,6 +26,10 @@ class NWBMixin(AbstractContainer):
 
     _data_type_attr = 'neurodata_type'
 
+    # whether this container or one of its descendants was modified since the NWBFile that contains this container
+    # last updated its index of objects. Unlike the modified flag, this is only reset by that index.
+    _NWBMixin__changed = True
+
     @docval({'name': 'neurodata_type', 'type': str, 'doc': 'the data_type to search for', 'default': None})
     def get_ancestor(self, **kwargs):
         """
@@ -33,6 +38,21 @@ class NWBMixin(AbstractContainer):
         neurodata_type = kwargs['neurodata_type']
         return super().get_ancestor(data_type=neurodata_type)
 
+    @docval(*get_docval(AbstractContainer.set_modified))
+    def set_modified(self, **kwargs):
+        super().set_modified(**kwargs)
+        if kwargs['modified']:
+            self.__changed = True
+
+    def _pop_changed(self):
+        """
+        Return whether this container or one of its descendants was modified since the last call, see
+        :py:attr:`~pynwb.file.NWBFile.objects`
+        """
+        ret = self.__changed
+        self.__changed = False
+        return ret
+
     def _error_on_new_warn_on_construct(self, error_msg: str):
         """
         Raise an error when a check is violated on instance creation.
@@ -48,8 +68,17 @@ class NWBMixin(AbstractContainer):
         warn(error_msg)
 
     def _get_type_map(self):
+        # the TypeMap is only used by _field_config to look up the TermSet of a field if a type configuration
+        # is loaded, so avoid copying the global TypeMap every time a field is set otherwise
+        if not _is_type_config_loaded():
+            return None
         return get_type_map()
 
+    def _field_config(self, arg_name, val, type_map):
+        if type_map is None:
+            return val
+        return super()._field_config(arg_name=arg_name, val=val, type_map=type_map)
+
     @property
     def data_type(self):
         """
@@ -161,3 +190,171 @@ class MultiContainerInterface(NWBDataInterface, hdmf_MultiContainerInterface):
     """Defined in PyNWB for API backward compatibility. See HDMF MultiContainterInterface for details."""
 
     pass
+
+
+def _add_table_rows(table, data, ids=None, enforce_unique_id=False, check_ragged=True, unique_ids=None):
+    """
+    Add many rows to a DynamicTable at once.
+
+    This is equivalent to calling ``table.add_row`` for each row, but each column is extended once with the
+    values of all rows instead of once per row.
+
+    :param table: The DynamicTable to add the rows to
+    :param data: dict mapping each column name to a sequence with the value of the column for each new row.
+                 The values of ragged columns are sequences themselves. Columns mapped to None are ignored,
+                 like optional columns that are not given to add_row.
+    :param ids: The ids of the new rows. If None, ids are auto-incremented. If data is empty, e.g., for a table
+                without columns, one row is added for each id.
+    :param enforce_unique_id: Enforce that the ids are not in the table yet and are distinct
+    :param check_ragged: Warn if the values of a column that is not ragged have different lengths
+    :param unique_ids: The _UniqueIds of the table to check the ids with if enforce_unique_id is True. If None,
+                       the ids of the table are read to check the ids.
+    """
+    data = {name: values for name, values in data.items() if values is not None}
+    num_rows = {len(values) for values in data.values()}
+    if len(num_rows) > 1:
+        raise ValueError("all columns must have the same number of rows, got %s"
+                         % {name: len(values) for name, values in data.items()})
+    num_rows = num_rows.pop() if num_rows else (0 if ids is None else len(ids))
+    if ids is not None:
+        ids = np.asarray(ids).tolist()
+        if len(ids) != num_rows:
+            raise ValueError("got %d ids for %d rows" % (len(ids), num_rows))
+    if num_rows == 0:
+        return
+    if set(data) != set(table.colnames):
+        # add_row raises the error for missing or unexpected columns, or adds the optional columns
+        # that are predefined by the table, so add the first row with it and then the remaining rows
+        table.add_row(data={name: values[0] for name, values in data.items()},
+                      id=None if ids is None else ids[0],
+                      enforce_unique_id=enforce_unique_id,
+                      check_ragged=check_ragged)
+        _add_table_rows(table, {name: values[1:] for name, values in data.items()},
+                        ids=None if ids is None else ids[1:],
+                        enforce_unique_id=enforce_unique_id,
+                        check_ragged=check_ragged,
+                        unique_ids=unique_ids)
+        return
+    if ids is None:
+        ids = list(range(len(table), len(table) + num_rows))
+    if enforce_unique_id:
+        # auto-incremented ids can also collide with ids that were given explicitly before
+        (unique_ids or _UniqueIds(table)).check(ids)
+    _extend_data(table.id, ids)
+    for name, values in data.items():
+        column = table[name]
+        if isinstance(column, VectorIndex):
+            _extend_index(column, values)
+        else:
+            _extend_data(column, values)
+            if check_ragged and is_ragged(column.data):
+                warn(("Data has elements with different lengths and therefore cannot be coerced into an "
+                      "N-dimensional array. Use the 'index' argument when creating a column to add rows "
+                      "with different lengths."),
+                     stacklevel=3)
+
+
+def _extend_index(index, rows):
+    """Add a ragged value for each element of rows to a VectorIndex and its target at once."""
+    lengths = np.fromiter((len(row) for row in rows), dtype=np.int64, count=len(rows))
+    values = list(chain.from_iterable(rows))
+    if isinstance(index.target, VectorIndex):
+        _extend_index(index.target, values)
+    else:
+        _extend_data(index.target, values)
+    if len(lengths) == 0:
+        return
+    ends = (int(index.data[-1]) if len(index.data) else 0) + np.cumsum(lengths)
+    # use the smallest unsigned integer type for the largest offset, i.e., uint8, uint16, uint32, or uint64,
+    # and widen the offsets already in a list if needed, as VectorIndex.add_vector does
+    uint = np.min_scalar_type(int(ends[-1]))
+    dtype = np.asarray(index.data[-1]).dtype if len(index.data) else uint
+    if dtype.kind == 'u' and dtype.itemsize > uint.itemsize:
+        uint = dtype
+    elif dtype.kind == 'u' and dtype.itemsize < uint.itemsize and isinstance(index.data, list):
+        index.data[:] = list(np.asarray(index.data).astype(uint))
+    _extend_data(index, list(ends.astype(uint)))
+
+
+def _extend_data(data, values):
+    """Add all values to a Data object at once, without calling add_row or append for each value if possible."""
+    if isinstance(data.data, np.ndarray):
+        # extend_data stacks arrays vertically, which does not work for 1D arrays
+        for val in values:
+            data.append(val)
+    elif type(data) in (VectorData, VectorIndex, DynamicTableRegion, ElementIdentifiers):
+        # VectorData.extend calls add_row for each value of subclasses, and VectorIndex.add_row adds a vector
+        Data.extend(data, values)
+    else:
+        data.extend(values)
+
+
+def _get_csr(index):
+    """
+    Get the flat data of a ragged column and the CSR-style offsets of each level of its (nested) VectorIndex.
+
+    The index and the target data are read once each. NumPy arrays are returned as they are, without copying.
+
+    :param index: The VectorIndex of the column
+    :returns: Tuple with the flat data followed by the offsets of each level of the index, from the outermost
+              to the innermost level. Each offsets array has one more element than the level has rows, such
+              that the elements of row i of a level are offsets[i]:offsets[i+1] of the next level.
+    """
+    indptrs = list()
+    while isinstance(index, VectorIndex):
+        indptrs.append(_get_indptr(index))
+        index = index.target
+    return (_read_array(index.data), *indptrs)
+
+
+def _get_indptr(index):
+    """Get the CSR-style offsets of a VectorIndex, i.e., its data with a leading 0, with a single read."""
+    ends = _read_array(index.data)
+    indptr = np.zeros(len(ends) + 1, dtype=np.int64)
+    indptr[1:] = ends
+    return indptr
+
+
+def _read_array(data):
+    """Read the data of a Data object as a NumPy array, without copying it if it already is one."""
+    if isinstance(data, (np.ndarray, list, tuple)):
+        return np.asarray(data)
+    return np.asarray(data[:])
+
+
+class _UniqueIds:
+    """
+    The ids of a DynamicTable as a set, to check that the ids of new rows are unique in O(1) per row
+    instead of scanning the ids of the table, as add_row does with enforce_unique_id=True.
+
+    The set is updated with the ids that were added to the table since the last check, so the ids of the table
+    must only be appended to, as add_row does.
+    """
+
+    def __init__(self, table):
+        self.__table = table
+        self.__ids = set()
+        self.__num_ids = 0
+
+    @property
+    def table(self):
+        return self.__table
+
+    def check(self, ids):
+        """Raise a ValueError if any of the ids is already in the table or if the ids are not distinct."""
+        id_data = self.__table.id.data
+        if len(id_data) < self.__num_ids:
+            self.__ids = set()
+            self.__num_ids = 0
+        if len(id_data) > self.__num_ids:
+            self.__ids.update(_read_array(id_data[self.__num_ids:]).tolist())
+            self.__num_ids = len(id_data)
+        new_ids = set()
+        for row_id in ids:
+            if row_id in self.__ids or row_id in new_ids:
+                raise ValueError("id %i already in the table" % row_id)
+            new_ids.add(row_id)
+
+    def check_row(self, row_id=None):
+        """Check the id of a row to add with add_row, which uses the number of rows as id if it is None."""
+        self.check([len(self.__table) if row_id is None else row_id])
@@ -1,4 +1,9 @@
 from bisect import bisect_left
+from typing import NamedTuple
+
+import h5py
+import numpy as np
+import pandas as pd
 
 from hdmf.data_utils import DataIO
 from hdmf.common import DynamicTable
@@ -6,6 +11,36 @@ from hdmf.utils import docval, getargs, popargs, get_docval
 
 from . import register_class, CORE_NAMESPACE
 from .base import TimeSeries, TimeSeriesReferenceVectorData, TimeSeriesReference
+from .core import _add_table_rows
+
+
+class TimeIntervalsTagIndex(NamedTuple):
+    """
+    Index of the tags of the rows of a :py:class:`~pynwb.epoch.TimeIntervals` table, as returned by
+    :py:meth:`~pynwb.epoch.TimeIntervals.get_tag_index`. The rows with the i-th tag are given by
+    ``rows[indptr[i]:indptr[i+1]]``, like the indices of a row of a CSR sparse matrix.
+    This is a ``typing.NamedTuple`` type with predefined tuple components
+    :py:meth:`~pynwb.epoch.TimeIntervalsTagIndex.tags`,
+    :py:meth:`~pynwb.epoch.TimeIntervalsTagIndex.counts`,
+    :py:meth:`~pynwb.epoch.TimeIntervalsTagIndex.indptr`, and
+    :py:meth:`~pynwb.epoch.TimeIntervalsTagIndex.rows`.
+
+    :cvar tags:
+    :cvar counts:
+    :cvar indptr:
+    :cvar rows:
+    """
+    tags: np.ndarray
+    """Array with the distinct tags, in sorted order"""
+
+    counts: np.ndarray
+    """Integer array with the number of rows with each tag"""
+
+    indptr: np.ndarray
+    """Integer array of length ``len(tags) + 1`` with the start of the rows of each tag in ``rows``"""
+
+    rows: np.ndarray
+    """Integer array with the indices of the rows with each tag, in increasing order for each tag"""
 
 
 @register_class('TimeIntervals', CORE_NAMESPACE)
@@ -30,6 +65,8 @@ class TimeIntervals(DynamicTable):
             *get_docval(DynamicTable.__init__, 'id', 'columns', 'colnames'))
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        self.__interval_index = None
+        self.__tag_index = None
 
     @docval({'name': 'start_time', 'type': float, 'doc': 'Start time of epoch, in seconds'},
             {'name': 'stop_time', 'type': float, 'doc': 'Stop time of epoch, in seconds'},
@@ -55,8 +92,256 @@ class TimeIntervals(DynamicTable):
                 tmp.append(TimeSeriesReference(idx_start, count, ts))
             timeseries = tmp
             rkwargs['timeseries'] = timeseries
+        self.__interval_index = None
+        self.__tag_index = None
         return super().add_row(**rkwargs)
 
+    @docval({'name': 'start_time', 'type': ('array_data', 'data', pd.DataFrame),
+             'doc': 'Start time of each interval, in seconds, or a DataFrame with a column for each argument '
+                    'of add_interval and the other columns of this table, and one row per interval'},
+            {'name': 'stop_time', 'type': ('array_data', 'data'), 'default': None,
+             'doc': 'Stop time of each interval, in seconds. Required if start_time is not a DataFrame'},
+            {'name': 'tags', 'type': ('array_data', 'data'), 'default': None,
+             'doc': 'the tags of each interval, given as a list of tags or a comma-separated string'},
+            {'name': 'timeseries', 'type': (list, tuple, TimeSeries), 'default': None,
+             'doc': 'the TimeSeries the intervals apply to. Either a TimeSeries or a list of TimeSeries that all '
+                    'intervals apply to, or a list with the TimeSeries (or list of TimeSeries or '
+                    'TimeSeriesReference) of each interval'},
+            {'name': 'id', 'type': ('array_data', 'data'), 'default': None,
+             'doc': 'the ID of each interval. By default, IDs are auto-incremented'},
+            allow_extra=True)
+    def add_intervals(self, **kwargs):
+        """
+        Add many intervals at once.
+
+        This is equivalent to calling :py:meth:`~pynwb.epoch.TimeIntervals.add_interval` for each interval,
+        but the indices into each TimeSeries are computed for all intervals at once and each column is
+        extended once. Values for the other columns of this table are given as additional keyword arguments
+        with one value per interval.
+        """
+        start_time, stop_time, tags, timeseries, ids = popargs('start_time', 'stop_time', 'tags', 'timeseries',
+                                                               'id', kwargs)
+        if isinstance(start_time, pd.DataFrame):
+            df = start_time
+            if stop_time is not None or tags is not None or timeseries is not None or ids is not None or kwargs:
+                raise ValueError("no other arguments can be given if start_time is a DataFrame")
+            kwargs = {name: df[name].tolist() for name in df.columns}
+            start_time, stop_time = kwargs.pop('start_time'), kwargs.pop('stop_time', None)
+            tags, timeseries = kwargs.pop('tags', None), kwargs.pop('timeseries', None)
+            ids = kwargs.pop('id', df.index.tolist() if df.index.name == 'id' else None)
+        if stop_time is None:
+            raise ValueError("stop_time is required if start_time is not a DataFrame")
+        start_time = np.asarray(start_time, dtype=float)
+        stop_time = np.asarray(stop_time, dtype=float)
+        if start_time.shape != stop_time.shape:
+            raise ValueError("start_time and stop_time must have the same length, got %d and %d"
+                             % (len(start_time), len(stop_time)))
+        rows = dict(kwargs)
+        rows['start_time'] = start_time.tolist()
+        rows['stop_time'] = stop_time.tolist()
+        if tags is not None:
+            rows['tags'] = [[s.strip() for s in t.split(",") if not s.isspace()] if isinstance(t, str) else t
+                            for t in tags]
+        if not (timeseries is None or (isinstance(timeseries, (tuple, list)) and len(timeseries) == 0)):
+            rows['timeseries'] = self.__get_timeseries_references(start_time, stop_time, timeseries)
+        self.__interval_index = None
+        self.__tag_index = None
+        _add_table_rows(self, rows, ids=ids)
+
+    @docval({'name': 'start_time', 'type': (int, float), 'doc': 'the start of the time range, in seconds'},
+            {'name': 'stop_time', 'type': (int, float), 'doc': 'the stop of the time range, in seconds'},
+            {'name': 'tags', 'type': (str, list, tuple), 'default': None,
+             'doc': 'only return intervals with any of these tags'},
+            returns='the indices of the rows of the intervals overlapping the time range, in increasing order',
+            rtype=np.ndarray)
+    def overlapping(self, **kwargs):
+        """
+        Get the intervals that overlap the time range [start_time, stop_time).
+
+        An interval overlaps the time range if it starts before stop_time and stops after start_time. The
+        returned row indices can be used to select the intervals, e.g., ``trials[trials.overlapping(0., 10.)]``.
+        """
+        start_time, stop_time, tags = getargs('start_time', 'stop_time', 'tags', kwargs)
+        rows = list()
+        for class_rows, starts, stops, max_duration in self.__get_interval_index():
+            # only intervals starting less than max_duration before start_time can stop after it
+            lo = np.searchsorted(starts, start_time - max_duration, side='right')
+            hi = np.searchsorted(starts, stop_time, side='left')
+            candidates = np.arange(lo, max(lo, hi))
+            rows.append(class_rows[candidates[stops[candidates] > start_time]])
+        rows = np.sort(np.concatenate(rows)) if rows else np.zeros(0, dtype=np.int64)
+        if tags is not None:
+            rows = rows[self.get_tag_mask(tags)[rows]]
+        return rows
+
+    @docval({'name': 'times', 'type': ('array_data', 'data', int, float), 'doc': 'the times to look up, in seconds'},
+            {'name': 'tags', 'type': (str, list, tuple), 'default': None,
+             'doc': 'only return intervals with any of these tags'},
+            returns='the indices into times and the indices of the rows of the intervals containing them',
+            rtype=tuple)
+    def containing(self, **kwargs):
+        """
+        Get the intervals that contain each of the given times.
+
+        An interval contains a time if the time falls within [start_time, stop_time) of the interval. Since
+        a time can be contained by several intervals, the result is given as a pair of arrays, like
+        :py:func:`numpy.nonzero`: the indices into times and the indices of the rows of the intervals that
+        contain them, sorted by the index into times and then by row. Times that are not contained by any
+        interval do not appear in the result.
+        """
+        times, tags = getargs('times', 'tags', kwargs)
+        times = np.atleast_1d(np.asarray(times, dtype=float))
+        time_idx, rows = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+        for class_rows, starts, stops, max_duration in self.__get_interval_index():
+            lo = np.searchsorted(starts, times - max_duration, side='right')
+            hi = np.maximum(np.searchsorted(starts, times, side='right'), lo)
+            # expand the candidate intervals of all times at once
+            counts = hi - lo
+            class_time_idx = np.repeat(np.arange(len(times)), counts)
+            candidates = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts - lo, counts)
+            keep = stops[candidates] > times[class_time_idx]
+            time_idx.append(class_time_idx[keep])
+            rows.append(class_rows[candidates[keep]])
+        time_idx, rows = np.concatenate(time_idx), np.concatenate(rows)
+        if tags is not None:
+            keep = self.get_tag_mask(tags)[rows]
+            time_idx, rows = time_idx[keep], rows[keep]
+        sort = np.lexsort((rows, time_idx))
+        return time_idx[sort], rows[sort]
+
+    def __get_interval_index(self):
+        """
+        Get the intervals grouped by the power of two of their duration and sorted by start time.
+
+        Each group is given as the rows, start times, and stop times of its intervals and their maximum
+        duration. Within a group, the intervals containing a time t can only start between t minus the
+        maximum duration and t, and since the durations in a group differ at most by a factor of two,
+        most of the intervals found in that range contain t. The index is built lazily and reset when
+        intervals are added.
+        """
+        if self.__interval_index is None or self.__interval_index[0] != len(self):
+            starts = np.asarray(self['start_time'].data[:], dtype=float)
+            stops = np.asarray(self['stop_time'].data[:], dtype=float)
+            # intervals with a NaN start or stop time cannot overlap anything
+            rows = np.flatnonzero(~(np.isnan(starts) | np.isnan(stops)))
+            durations = stops[rows] - starts[rows]
+            exponents = np.frexp(durations)[1]
+            classes = list()
+            for exponent in np.unique(exponents):
+                class_rows = rows[exponents == exponent]
+                class_rows = class_rows[np.argsort(starts[class_rows], kind='stable')]
+                classes.append((class_rows, starts[class_rows], stops[class_rows],
+                                durations[exponents == exponent].max()))
+            self.__interval_index = (len(self), classes)
+        return self.__interval_index[1]
+
+    def get_tag_index(self):
+        """
+        Get the index of the tags of the rows of this table.
+
+        The index is computed from the flat tags data and the tags index at once, without building the list
+        of tags of each row. It is built on first use and reset when intervals are added.
+
+        :returns: the distinct tags with their number of rows and the rows with each tag
+        :rtype: TimeIntervalsTagIndex
+        """
+        if self.__tag_index is None or self.__tag_index[0] != len(self):
+            if 'tags' in self.colnames:
+                ends = np.asarray(self['tags'].data[:], dtype=np.int64)
+                flat = np.asarray(self['tags'].target.data[:], dtype=object).astype(str)
+            else:
+                ends, flat = np.zeros(len(self), dtype=np.int64), np.zeros(0, dtype=str)
+            tags, codes = np.unique(flat, return_inverse=True)
+            row_of_tag = np.repeat(np.arange(len(ends)), np.diff(ends, prepend=0))
+            # count each tag once per row, sorted by tag and then by row
+            pairs = np.unique(codes.ravel() * len(ends) + row_of_tag)
+            tag_codes, rows = np.divmod(pairs, max(len(ends), 1))
+            counts = np.bincount(tag_codes, minlength=len(tags))
+            indptr = np.concatenate([[0], np.cumsum(counts)])
+            self.__tag_index = (len(self), TimeIntervalsTagIndex(tags, counts, indptr, rows))
+        return self.__tag_index[1]
+
+    @docval({'name': 'tags', 'type': (str, list, tuple), 'doc': 'the tag or tags to match'},
+            {'name': 'match', 'type': str, 'default': 'any', 'enum': ['any', 'all'],
+             'doc': "whether rows must have 'any' or 'all' of the tags"},
+            {'name': 'exclude', 'type': (str, list, tuple), 'default': None,
+             'doc': 'tags that rows must not have'},
+            returns='a boolean mask of the rows that match', rtype=np.ndarray)
+    def get_tag_mask(self, **kwargs):
+        """
+        Get a boolean mask of the rows that have any or all of the given tags and none of the excluded tags.
+        """
+        tags, match, exclude = getargs('tags', 'match', 'exclude', kwargs)
+        index = self.get_tag_index()
+        tags = np.unique([tags] if isinstance(tags, str) else np.asarray(tags, dtype=str))
+        hits = np.zeros(len(self), dtype=np.int64)
+        np.add.at(hits, self.__get_tag_rows(index, tags), 1)
+        mask = hits > 0 if match == 'any' else hits == len(tags)
+        if exclude is not None:
+            exclude = [exclude] if isinstance(exclude, str) else list(exclude)
+            mask[self.__get_tag_rows(index, exclude)] = False
+        return mask
+
+    @staticmethod
+    def __get_tag_rows(index, tags):
+        """Get the rows with the given tags from the tag index, once for each tag of a row"""
+        pos = np.searchsorted(index.tags, tags)
+        found = pos < len(index.tags)
+        pos = pos[found][index.tags[pos[found]] == np.asarray(tags)[found]]
+        return np.concatenate([np.zeros(0, dtype=np.int64)] +
+                              [index.rows[index.indptr[i]:index.indptr[i + 1]] for i in pos])
+
+    def __get_timeseries_references(self, start_times, stop_times, timeseries):
+        """Get the list of TimeSeriesReference of each interval for add_intervals"""
+        if isinstance(timeseries, TimeSeries):
+            timeseries = [timeseries]
+        if all(isinstance(ts, TimeSeries) for ts in timeseries):
+            # the same TimeSeries apply to all intervals
+            timeseries = [timeseries] * len(start_times)
+        elif len(timeseries) != len(start_times):
+            raise ValueError("timeseries must be given for all intervals or for each interval, got %d values for "
+                             "%d intervals" % (len(timeseries), len(start_times)))
+        timeseries = [[ts] if isinstance(ts, TimeSeries) else list(ts) for ts in timeseries]
+        # compute the indices for all intervals of each distinct TimeSeries at once
+        positions = dict()
+        for i, interval_timeseries in enumerate(timeseries):
+            for ts in interval_timeseries:
+                if not isinstance(ts, TimeSeriesReference):
+                    positions.setdefault(id(ts), (ts, list()))[1].append(i)
+        refs = dict()
+        for ts, intervals in positions.values():
+            intervals = np.asarray(intervals)
+            idx_start, count = self.__calculate_idx_counts(start_times[intervals], stop_times[intervals], ts)
+            for i, s, c in zip(intervals.tolist(), idx_start.tolist(), count.tolist()):
+                refs[(i, id(ts))] = TimeSeriesReference(s, c, ts)
+        return [[ts if isinstance(ts, TimeSeriesReference) else refs[(i, id(ts))] for ts in interval_timeseries]
+                for i, interval_timeseries in enumerate(timeseries)]
+
+    def __calculate_idx_counts(self, start_times, stop_times, ts_data):
+        """Vectorized version of __calculate_idx_count for arrays of start and stop times"""
+        if isinstance(ts_data.timestamps, DataIO):
+            ts_timestamps = ts_data.timestamps.data
+        else:
+            ts_timestamps = ts_data.timestamps
+        ts_starting_time = ts_data.starting_time
+        ts_rate = ts_data.rate
+        if ts_starting_time is not None and ts_rate:
+            # truncate like int() does in __calculate_idx_count
+            start_idx = np.trunc((start_times - ts_starting_time) * ts_rate).astype(np.int64)
+            stop_idx = np.trunc((stop_times - ts_starting_time) * ts_rate).astype(np.int64)
+        elif len(ts_timestamps) > 0:
+            if isinstance(ts_timestamps, h5py.Dataset):
+                # resolve all start and stop times in one sweep over the chunks of the timestamps
+                idx = _searchsorted_dataset(ts_timestamps, np.concatenate([start_times, stop_times]))
+                start_idx, stop_idx = idx[:len(start_times)], idx[len(start_times):]
+            else:
+                timestamps = np.asarray(ts_timestamps)
+                start_idx = np.searchsorted(timestamps, start_times, side='left')
+                stop_idx = np.searchsorted(timestamps, stop_times, side='left')
+        else:
+            raise ValueError("TimeSeries object must have timestamps or starting_time and rate")
+        return start_idx, stop_idx - start_idx
+
     def __calculate_idx_count(self, start_time, stop_time, ts_data):
         if isinstance(ts_data.timestamps, DataIO):
             ts_timestamps = ts_data.timestamps.data
@@ -72,10 +357,65 @@ class TimeIntervals(DynamicTable):
             stop_idx = int((stop_time - ts_starting_time)*ts_rate)
         elif len(ts_timestamps) > 0:
             timestamps = ts_timestamps
-            start_idx = bisect_left(timestamps, start_time)
-            stop_idx = bisect_left(timestamps, stop_time)
+            if isinstance(timestamps, h5py.Dataset):
+                start_idx, stop_idx = _searchsorted_dataset(timestamps, [start_time, stop_time])
+            else:
+                start_idx = bisect_left(timestamps, start_time)
+                stop_idx = bisect_left(timestamps, stop_time)
         else:
             raise ValueError("TimeSeries object must have timestamps or starting_time and rate")
         count = stop_idx - start_idx
         idx_start = start_idx
         return int(idx_start), int(count)
+
+
+# number of elements read at a time from timestamps that are not stored in chunks
+_SEARCH_BLOCK_SIZE = 65536
+
+
+def _searchsorted_dataset(dataset, values, side='left'):
+    """
+    Find the indices of values in a sorted 1D h5py.Dataset, like numpy.searchsorted.
+
+    The values are sorted and resolved in one sweep over the blocks of the dataset, where a block is one
+    chunk of the dataset (or _SEARCH_BLOCK_SIZE elements if the dataset is not chunked). Blocks are located
+    by bisecting over the last element of each block, and each block that contains values is read once,
+    instead of reading single elements of the dataset for every bisection step of every value.
+    """
+    values = np.asarray(values)
+    order = np.argsort(values, kind='stable')
+    sorted_values = values[order]
+    ret = np.empty(len(values), dtype=np.int64)
+    n = len(dataset)
+    block = dataset.chunks[0] if dataset.chunks is not None else _SEARCH_BLOCK_SIZE
+    nblocks = -(-n // block)
+    last_elements = dict()
+
+    def before(b, value):
+        # whether all elements of block b come before value
+        if b not in last_elements:
+            last_elements[b] = dataset[min((b + 1) * block, n) - 1]
+        return last_elements[b] < value if side == 'left' else last_elements[b] <= value
+
+    pos, lo = 0, 0
+    while pos < len(sorted_values):
+        value = sorted_values[pos]
+        hi = nblocks
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if before(mid, value):
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == nblocks:
+            ret[order[pos:]] = n
+            break
+        data = dataset[lo * block:min((lo + 1) * block, n)]
+        # all remaining values up to the last element of this block are found in this block
+        end = np.searchsorted(sorted_values, data[-1], side='right' if side == 'left' else 'left')
+        if end == pos:  # the remaining values are NaN, which numpy.searchsorted places at the end
+            ret[order[pos:]] = n
+            break
+        ret[order[pos:end]] = lo * block + np.searchsorted(data, sorted_values[pos:end], side=side)
+        pos, lo = end, lo + 1
+    return ret
@@ -3,12 +3,16 @@ from dateutil.tz import tzlocal
 from collections.abc import Iterable
 from warnings import warn
 import copy as _copy
+import sys
 
+import h5py
 import numpy as np
 import pandas as pd
 
 from hdmf.common import DynamicTableRegion, DynamicTable
-from hdmf.container import HERDManager
+from hdmf.container import AbstractContainer, Data, HERDManager
+from hdmf.data_utils import DataIO
+from hdmf.query import HDMFDataset
 from hdmf.utils import docval, getargs, get_docval, popargs, popargs_to_dict, AllowPositional
 
 from . import register_class, CORE_NAMESPACE
@@ -18,12 +22,13 @@ from .epoch import TimeIntervals
 from .ecephys import ElectrodeGroup
 from .icephys import (IntracellularElectrode, SweepTable, PatchClampSeries, IntracellularRecordingsTable,
                       SimultaneousRecordingsTable, SequentialRecordingsTable, RepetitionsTable,
-                      ExperimentalConditionsTable)
+                      ExperimentalConditionsTable, _flatten_icephys_tables)
 from .image import Images
 from .ophys import ImagingPlane
 from .ogen import OptogeneticStimulusSite
 from .misc import Units
-from .core import NWBContainer, NWBDataInterface, MultiContainerInterface, ScratchData, LabelledDict
+from .core import NWBMixin, NWBContainer, NWBDataInterface, MultiContainerInterface, ScratchData, LabelledDict
+from .core import _add_table_rows, _UniqueIds
 
 
 def _not_parent(arg):
@@ -244,6 +249,12 @@ class NWBFile(MultiContainerInterface, HERDManager):
         }
     ]
 
+    # set_modified may be called before __init__ has set up the index of objects
+    _NWBFile__obj = None
+    _NWBFile__obj_stale = False
+    # the tables of the file that a lazy copy links to until they are accessed, see NWBFile.copy
+    _NWBFile__linked_tables = frozenset()
+
     __nwbfields__ = ({'name': 'session_description', 'settable': False},
                      {'name': 'identifier', 'settable': False},
                      {'name': 'session_start_time', 'settable': False},
@@ -523,29 +534,194 @@ class NWBFile(MultiContainerInterface, HERDManager):
             setattr(self, key, val)
 
         self.__obj = None
+        self.__obj_children = None
+        self.__obj_by_class = None
+        self.__obj_stale = False
+        self.__electrode_index = None
+        self.__electrode_ids = None
+
+    @classmethod
+    def _getter(cls, field):
+        getter = super()._getter(field)
+        if not field.get('child', False):
+            return getter
+        name = field['name']
+
+        def copy_on_access(self):
+            if name in self.__linked_tables:
+                self.__copy_linked_table(name)
+            return getter(self)
+
+        copy_on_access.__doc__ = getter.__doc__
+        return copy_on_access
 
     def all_children(self):
         stack = [self]
         ret = list()
         self.__obj = LabelledDict(label='all_objects', key_attr='object_id')
+        self.__obj_children = dict()
+        self.__obj_by_class = dict()
+        self.__obj_stale = False
         while len(stack):
             n = stack.pop()
             ret.append(n)
             if n.object_id is not None:
-                self.__obj[n.object_id] = n
+                self.__index_object(n)
             else:
                 warn('%s "%s" does not have an object_id' % (n.neurodata_type, n.name))
-            if hasattr(n, 'children'):
-                for c in n.children:
-                    stack.append(c)
+            if isinstance(n, NWBMixin):
+                n._pop_changed()
+            children = n.children if hasattr(n, 'children') else ()
+            self.__obj_children[id(n)] = children
+            for c in children:
+                stack.append(c)
         return ret
 
     @property
     def objects(self):
         if self.__obj is None:
             self.all_children()
+        elif self.__obj_stale:
+            self.__update_objects()
         return self.__obj
 
+    @docval({'name': 'neurodata_type', 'type': (str, type),
+             'doc': 'the neurodata_type (or the class) of the objects to get'},
+            {'name': 'include_subtypes', 'type': bool, 'default': True,
+             'doc': 'whether to also get the objects of types that extend neurodata_type'},
+            returns='the objects of the given type in this file', rtype=list)
+    def get_objects_by_type(self, **kwargs):
+        """
+        Get all objects of a neurodata_type in this file, e.g., all TimeSeries.
+
+        This uses the same index as :py:attr:`~pynwb.file.NWBFile.objects`, which keeps track of the objects of
+        each type as objects are added to and removed from the file.
+        """
+        neurodata_type, include_subtypes = getargs('neurodata_type', 'include_subtypes', kwargs)
+        if isinstance(neurodata_type, type):
+            neurodata_type = neurodata_type.neurodata_type
+        self.objects  # make sure that the index is up to date
+        ret = list()
+        for cls, objs in self.__obj_by_class.items():
+            if include_subtypes:
+                match = any(getattr(base, 'neurodata_type', None) == neurodata_type
+                            for base in cls.__mro__ if 'neurodata_type' in base.__dict__)
+            else:
+                match = cls.neurodata_type == neurodata_type
+            if match:
+                ret.extend(objs.values())
+        return ret
+
+    @docval(returns='the memory and storage footprint of the data in this file', rtype=pd.DataFrame)
+    def get_footprint(self):
+        """
+        Get the memory and storage footprint of the data of the objects in this file.
+
+        The returned DataFrame has one row for each array of data, e.g., the data and timestamps of a TimeSeries or
+        the data of a column of a DynamicTable, with the columns:
+
+        - ``path``: the path of the dataset in the HDF5 file or, for data that is not stored in a file, the names of
+          the objects from the NWBFile to the object followed by the name of the field if the object is not data
+        - ``neurodata_type``, ``object_id``, ``field``: the type and ID of the object and the field with the data
+        - ``shape``, ``dtype``: the shape and data type of the data
+        - ``memory_bytes``: the size of the arrays of the data loaded in memory
+        - ``overhead_bytes``: the size of the Python objects that hold the data in memory, e.g., the lists and
+          elements of data given as a list
+        - ``data_bytes``: the uncompressed size of the data stored in an HDF5 file
+        - ``stored_bytes``: the size of the data on disk
+        - ``compression_ratio``: ``data_bytes / stored_bytes``
+        - ``num_chunks``, ``chunks``, ``compression``: the number of chunks written, the chunk shape, and
+          the compression filter of the dataset
+
+        The storage columns are missing for data that is not stored in an HDF5 file. Data that is shared by multiple
+        objects, e.g., timestamps linked between TimeSeries, is only reported for the first object. Sort the
+        DataFrame, e.g., by ``memory_bytes`` or ``stored_bytes``, to find the objects that use the most memory
+        or disk space.
+        """
+        rows = list()
+        seen = set()
+        for obj in self.all_children():
+            fields = dict(data=obj.data) if isinstance(obj, Data) else obj.fields
+            for field, data in fields.items():
+                if isinstance(data, DataIO):
+                    data = data.data
+                elif isinstance(data, HDMFDataset):
+                    # e.g., a dataset of references wrapped for resolving them when read
+                    data = data.dataset
+                if isinstance(data, (list, tuple)):
+                    # skip lists of metadata, e.g., the names of the columns of a table, and lists of containers
+                    if (not isinstance(obj, Data)
+                            and (len(data) == 0 or isinstance(data[0], (str, datetime, AbstractContainer)))):
+                        continue
+                elif not isinstance(data, (np.ndarray, h5py.Dataset)):
+                    continue
+                key = (data.file.filename, data.name) if isinstance(data, h5py.Dataset) else id(data)
+                if key in seen:
+                    continue
+                seen.add(key)
+                row = _get_data_footprint(data)
+                if row['path'] is None:
+                    row['path'] = _get_object_path(obj, self)
+                    if not isinstance(obj, Data):
+                        row['path'] += '/' + field
+                row.update(neurodata_type=obj.neurodata_type, object_id=obj.object_id, field=field)
+                rows.append(row)
+        columns = ['path', 'neurodata_type', 'object_id', 'field', 'shape', 'dtype', 'memory_bytes', 'overhead_bytes',
+                   'data_bytes', 'stored_bytes', 'compression_ratio', 'num_chunks', 'chunks', 'compression']
+        return pd.DataFrame(rows, columns=columns)
+
+    @docval(*get_docval(NWBContainer.set_modified))
+    def set_modified(self, **kwargs):
+        super().set_modified(**kwargs)
+        if kwargs['modified']:
+            # a container of this file was modified, which may have added or removed children
+            self.__obj_stale = True
+
+    def __update_objects(self):
+        """
+        Update the index of the objects in this file after containers were added or removed.
+
+        Adding a child to or removing a child from a container calls set_modified on the container and all its
+        ancestors, which flags the ancestors that are NWB containers as changed until the index is updated. So
+        only the changed containers and new children, and the DynamicTables and other containers that cannot
+        be flagged below changed containers, need to be visited, even if the file was never written and all
+        containers are still marked as modified.
+        """
+        stack = [self]
+        while len(stack):
+            n = stack.pop()
+            changed = n._pop_changed() if isinstance(n, NWBMixin) else True
+            old_children = self.__obj_children.get(id(n))
+            if old_children is not None and not changed:
+                # nothing was added to or removed from this subtree
+                continue
+            children = getattr(n, 'children', ())
+            if old_children is None:
+                # a new container, whose subtree is new as well
+                if n.object_id is not None:
+                    self.__index_object(n)
+            else:
+                current = {id(c) for c in children}
+                for c in old_children:
+                    if id(c) not in current:
+                        self.__unindex_subtree(c)
+            stack.extend(children)
+            self.__obj_children[id(n)] = children
+        self.__obj_stale = False
+
+    def __index_object(self, obj):
+        self.__obj[obj.object_id] = obj
+        self.__obj_by_class.setdefault(type(obj), dict())[id(obj)] = obj
+
+    def __unindex_subtree(self, obj):
+        stack = [obj]
+        while len(stack):
+            n = stack.pop()
+            if n.object_id is not None and self.__obj.get(n.object_id) is n:
+                self.__obj.pop(n.object_id)
+                self.__obj_by_class[type(n)].pop(id(n), None)
+            stack.extend(self.__obj_children.pop(id(n), ()))
+
     @property
     def modules(self):
         warn("NWBFile.modules has been replaced by NWBFile.processing.", DeprecationWarning)
@@ -553,7 +729,9 @@ class NWBFile(MultiContainerInterface, HERDManager):
 
     @property
     def epoch_tags(self):
-        return set(self.epochs.tags[:]) if self.epochs is not None else set()
+        # read the table from the fields so that a lazy copy does not copy the table, see NWBFile.copy
+        epochs = self.fields.get('epochs')
+        return set(epochs.get_tag_index().tags.tolist()) if epochs is not None else set()
 
     @property
     def ec_electrode_groups(self):
@@ -639,10 +817,25 @@ class NWBFile(MultiContainerInterface, HERDManager):
         self.__check_epochs()
         self.epochs.add_interval(**kwargs)
 
+    @docval(*get_docval(TimeIntervals.add_intervals), allow_extra=True)
+    def add_epochs(self, **kwargs):
+        """
+        Add many epochs to the epoch table at once.
+        See :py:meth:`~pynwb.epoch.TimeIntervals.add_intervals` for more details.
+        """
+        self.__check_epochs()
+        self.epochs.add_intervals(**kwargs)
+
     def __check_electrodes(self):
         if self.electrodes is None:
             self.electrodes = ElectrodeTable()
 
+    def __get_electrode_ids(self):
+        """Get the ids of the electrodes table as a set that is updated as electrodes are added."""
+        if self.__electrode_ids is None or self.__electrode_ids.table is not self.electrodes:
+            self.__electrode_ids = _UniqueIds(self.electrodes)
+        return self.__electrode_ids
+
     @docval(*get_docval(DynamicTable.add_column), allow_extra=True)
     def add_electrode_column(self, **kwargs):
         """
@@ -701,30 +894,141 @@ class NWBFile(MultiContainerInterface, HERDManager):
         if d.get('group_name', None) is None:
             d['group_name'] = d['group'].name
 
-        new_cols = [('x', 'the x coordinate of the position (+x is posterior)'),
-                    ('y', 'the y coordinate of the position (+y is inferior)'),
-                    ('z', 'the z coordinate of the position (+z is right)'),
-                    ('imp', 'the impedance of the electrode, in ohms'),
-                    ('filtering', 'description of hardware filtering, including the filter name and frequency cutoffs'),
-                    ('rel_x', 'the x coordinate within the electrode group'),
-                    ('rel_y', 'the y coordinate within the electrode group'),
-                    ('rel_z', 'the z coordinate within the electrode group'),
-                    ('reference', 'Description of the reference electrode and/or reference scheme used for this \
-                        electrode, e.g.,"stainless steel skull screw" or "online common average referencing".')
-                    ]
-
         # add column if the arg is supplied and column does not yet exist
         # do not pass arg to add_row if arg is not supplied
-        for col_name, col_doc in new_cols:
+        for col_name, col_doc in _ELECTRODE_OPTIONAL_COLUMNS:
             if kwargs[col_name] is not None:
                 if col_name not in self.electrodes:
                     self.electrodes.add_column(col_name, col_doc)
             else:
                 d.pop(col_name)  # remove args from d if not set
 
+        if d.pop('enforce_unique_id', False):
+            self.__get_electrode_ids().check_row(d.get('id'))
         self.electrodes.add_row(**d)
 
-    @docval({'name': 'region', 'type': (slice, list, tuple), 'doc': 'the indices of the table'},
+    @docval({'name': 'location', 'type': ('array_data', 'data', pd.DataFrame),
+             'doc': 'the location of each electrode within the subject e.g. brain region, or a DataFrame with a '
+                    'column for each argument of add_electrode and the other columns of the electrodes table, and '
+                    'one row per electrode'},
+            {'name': 'group', 'type': ('array_data', 'data', ElectrodeGroup), 'default': None,
+             'doc': 'the ElectrodeGroup of each electrode, or a single ElectrodeGroup for all electrodes. Required '
+                    'if location is not a DataFrame'},
+            {'name': 'id', 'type': ('array_data', 'data'), 'default': None,
+             'doc': 'a unique identifier for each electrode. By default, IDs are auto-incremented'},
+            {'name': 'enforce_unique_id', 'type': bool, 'doc': 'enforce that the ids in the table must be unique',
+             'default': True},
+            allow_extra=True)
+    def add_electrodes(self, **kwargs):
+        """
+        Add many electrodes to the electrodes table at once.
+
+        This is equivalent to calling :py:meth:`~pynwb.file.NWBFile.add_electrode` for each electrode, but the
+        optional columns are created once, *location* and *group* are checked for all electrodes at once, and
+        each column is extended once. The optional arguments of add_electrode (e.g., *x*, *y*, *z*, *imp*,
+        *filtering*, *rel_x*, *rel_y*, *rel_z*, *reference*, and *group_name*) and the values of columns that
+        have been added (through calls to `add_electrode_column`) are given as additional keyword arguments
+        with one value per electrode.
+        """
+        location, group, ids, enforce_unique_id = popargs('location', 'group', 'id', 'enforce_unique_id', kwargs)
+        if isinstance(location, pd.DataFrame):
+            df = location
+            if group is not None or ids is not None or kwargs:
+                raise ValueError("no other arguments can be given if location is a DataFrame")
+            kwargs = {name: df[name].tolist() for name in df.columns}
+            location, group = kwargs.pop('location', None), kwargs.pop('group', None)
+            ids = kwargs.pop('id', df.index.tolist() if df.index.name == 'id' else None)
+        if location is None or any(not loc for loc in location):
+            raise ValueError("The 'location' argument is required when creating an electrode.")
+        if isinstance(group, ElectrodeGroup):
+            group = [group] * len(location)
+        if group is None or any(not isinstance(g, ElectrodeGroup) for g in group):
+            raise ValueError("The 'group' argument is required when creating an electrode.")
+        self.__check_electrodes()
+        rows = dict(kwargs)
+        rows['location'] = list(location)
+        rows['group'] = list(group)
+        if rows.get('group_name') is None:
+            rows['group_name'] = [g.name for g in group]
+        for col_name, col_doc in _ELECTRODE_OPTIONAL_COLUMNS:
+            if rows.get(col_name) is not None:
+                rows[col_name] = np.asarray(rows[col_name]).tolist()
+                if col_name not in self.electrodes:
+                    self.electrodes.add_column(col_name, col_doc)
+        _add_table_rows(self.electrodes, rows, ids=ids, enforce_unique_id=enforce_unique_id,
+                        unique_ids=self.__get_electrode_ids())
+
+    @docval({'name': 'location', 'type': (str, list, tuple), 'default': None,
+             'doc': 'only select the electrodes in this location or in any of these locations'},
+            {'name': 'group_name', 'type': (str, list, tuple), 'default': None,
+             'doc': 'only select the electrodes of the electrode group with this name or any of these names'},
+            {'name': 'group', 'type': (ElectrodeGroup, list, tuple), 'default': None,
+             'doc': 'only select the electrodes of this electrode group or any of these electrode groups'},
+            *[{'name': name, 'type': (list, tuple), 'shape': (2,), 'default': None,
+               'doc': 'only select the electrodes with %s within this [min, max] range. '
+                      'Use None for a range that is not bounded on one side' % name}
+              for name in ('x', 'y', 'z', 'rel_x', 'rel_y', 'rel_z')],
+            returns='the indices of the rows of the selected electrodes, in increasing order', rtype=np.ndarray)
+    def get_electrode_indices(self, **kwargs):
+        """
+        Select electrodes by location, electrode group, and coordinates.
+
+        All given criteria must match. The electrode groups are matched by name, without resolving the
+        references to the ElectrodeGroup objects stored in the group column. The locations and group names
+        are encoded as categories, and each coordinate column is sorted, once when they are first queried,
+        and again only after electrodes are added. The indices can be passed to
+        :py:meth:`~pynwb.file.NWBFile.create_electrode_table_region` to select these electrodes for an
+        ElectricalSeries.
+        """
+        if self.fields.get('electrodes') is None:
+            raise RuntimeError("no electrodes available. add electrodes before selecting them")
+        criteria = [(name, value) for name, value in kwargs.items() if value is not None]
+        mask = np.ones(len(self.fields['electrodes']), dtype=bool)
+        for name, value in criteria:
+            if name == 'group':
+                name, value = 'group_name', [g.name for g in np.atleast_1d(np.asarray(value, dtype=object))]
+            if name in ('location', 'group_name'):
+                categories, codes = self.__get_electrode_index(name)
+                selected = np.flatnonzero(np.isin(categories, np.atleast_1d(np.asarray(value, dtype=str))))
+                mask &= np.isin(codes, selected)
+            else:
+                order, values = self.__get_electrode_index(name)
+                low, high = value
+                # NaN values are sorted last and never fall within a range
+                lo = 0 if low is None else np.searchsorted(values, low, side='left')
+                hi = np.count_nonzero(~np.isnan(values)) if high is None else \
+                    np.searchsorted(values, high, side='right')
+                in_range = np.zeros(len(mask), dtype=bool)
+                in_range[order[lo:hi]] = True
+                mask &= in_range
+        return np.flatnonzero(mask)
+
+    def __get_electrode_index(self, name):
+        """
+        Get the categories and the code of each electrode for a text column of the electrodes table, or the
+        order of the electrodes and the sorted values for a numeric column. The index of each column is built
+        when the column is first queried and reset when electrodes are added.
+        """
+        # read the table from the fields so that a lazy copy does not copy the table, see NWBFile.copy
+        electrodes = self.fields['electrodes']
+        if name not in electrodes:
+            raise ValueError("the electrodes table has no column '%s'" % name)
+        key = (id(electrodes), len(electrodes))
+        if self.__electrode_index is None or self.__electrode_index[0] != key:
+            self.__electrode_index = (key, dict())
+        index = self.__electrode_index[1]
+        if name not in index:
+            data = electrodes[name].data
+            data = data[:] if not isinstance(data, (list, np.ndarray)) else data
+            if name in ('location', 'group_name'):
+                index[name] = np.unique(np.asarray(data, dtype=str), return_inverse=True)
+            else:
+                values = np.asarray(data, dtype=float)
+                order = np.argsort(values, kind='stable')
+                index[name] = (order, values[order])
+        return index[name]
+
+    @docval({'name': 'region', 'type': (slice, list, tuple, np.ndarray), 'doc': 'the indices of the table'},
             {'name': 'description', 'type': str, 'doc': 'a brief description of what this electrode is'},
             {'name': 'name', 'type': str, 'doc': 'the name of this container', 'default': 'electrodes'})
     def create_electrode_table_region(self, **kwargs):
@@ -732,6 +1036,8 @@ class NWBFile(MultiContainerInterface, HERDManager):
             msg = "no electrodes available. add electrodes before creating a region"
             raise RuntimeError(msg)
         region = getargs('region', kwargs)
+        if isinstance(region, np.ndarray):
+            region = region.tolist()
         for idx in region:
             if idx < 0 or idx >= len(self.electrodes):
                 raise IndexError('The index ' + str(idx) +
@@ -764,6 +1070,15 @@ class NWBFile(MultiContainerInterface, HERDManager):
         self.__check_units()
         self.units.add_unit(**kwargs)
 
+    @docval(*get_docval(Units.add_units), allow_extra=True)
+    def add_units(self, **kwargs):
+        """
+        Add many units to the unit table at once.
+        See :py:meth:`~pynwb.misc.Units.add_units` for more details.
+        """
+        self.__check_units()
+        self.units.add_units(**kwargs)
+
     def __check_trials(self):
         if self.trials is None:
             self.trials = TimeIntervals(name='trials', description='experimental trials')
@@ -789,6 +1104,18 @@ class NWBFile(MultiContainerInterface, HERDManager):
         self.__check_trials()
         self.trials.add_interval(**kwargs)
 
+    @docval(*get_docval(TimeIntervals.add_intervals), allow_extra=True)
+    def add_trials(self, **kwargs):
+        """
+        Add many trials to the trial table at once.
+        See :py:meth:`~pynwb.epoch.TimeIntervals.add_intervals` for more details.
+
+        Required fields are *start_time*, *stop_time*, and any columns that have
+        been added (through calls to `add_trial_columns`).
+        """
+        self.__check_trials()
+        self.trials.add_intervals(**kwargs)
+
     def __check_invalid_times(self):
         if self.invalid_times is None:
             self.invalid_times = TimeIntervals(
@@ -930,6 +1257,32 @@ class NWBFile(MultiContainerInterface, HERDManager):
         # Add the recoding to the intracellular_recordings table
         return self.get_intracellular_recordings().add_recording(**kwargs)
 
+    @docval(*get_docval(IntracellularRecordingsTable.add_recordings),
+            returns='Integer indices of the rows that were added to IntracellularRecordingsTable',
+            rtype=np.ndarray,
+            allow_extra=True)
+    def add_intracellular_recordings(self, **kwargs):
+        """
+        Add many intracellular recordings to the intracellular_recordings table at once. If the
+        electrodes, stimuli, and/or responses do not exist yet in the NWBFile, then
+        they will be added to this NWBFile before adding them to the table.
+        See :py:meth:`~pynwb.icephys.IntracellularRecordingsTable.add_recordings` for more details.
+        """
+        stimuli, responses, electrodes = getargs('stimuli', 'responses', 'electrodes', kwargs)
+        # Add each distinct stimulus, response, and electrode to the file if they don't exist yet
+        for stimulus in {id(ts): ts for ts in stimuli or () if ts is not None}.values():
+            if stimulus.name not in self.stimulus and stimulus.name not in self.stimulus_template:
+                self.add_stimulus(stimulus, use_sweep_table=False)
+        for response in {id(ts): ts for ts in responses or () if ts is not None}.values():
+            if response.name not in self.acquisition:
+                self.add_acquisition(response, use_sweep_table=False)
+        if isinstance(electrodes, IntracellularElectrode):
+            electrodes = [electrodes]
+        for electrode in {id(e): e for e in electrodes or () if e is not None}.values():
+            if electrode.name not in self.icephys_electrodes:
+                self.add_icephys_electrode(electrode)
+        return self.get_intracellular_recordings().add_recordings(**kwargs)
+
     @docval(returns='The NWBFile.icephys_simultaneous_recordings table', rtype=SimultaneousRecordingsTable)
     def get_icephys_simultaneous_recordings(self):
         """
@@ -1050,6 +1403,35 @@ class NWBFile(MultiContainerInterface, HERDManager):
         else:
             return None
 
+    @docval({'name': 'tables', 'type': (list, tuple), 'default': None,
+             'doc': 'the names of the tables of the icephys metadata table hierarchy to include in the DataFrame, '
+                    'e.g., ["sequential_recordings", "intracellular_recordings"]. By default all tables are '
+                    'included.'},
+            *get_docval(IntracellularRecordingsTable.to_dataframe),
+            returns='DataFrame with one row for each row of the deepest selected table or None if the file does '
+                    'not contain any icephys metadata tables',
+            rtype=pd.DataFrame)
+    def get_icephys_meta_dataframe(self, **kwargs):
+        """
+        Get the intracellular ephys metadata table hierarchy as a single flat DataFrame.
+
+        Starting from the table returned by :py:meth:`~pynwb.file.NWBFile.get_icephys_meta_parent_table`, the
+        rows of each table are joined with the rows they reference in the next table of the hierarchy, down to the
+        deepest selected table. The columns of the result are labelled with the name of the source table and
+        the name of the column, e.g., ``('repetitions', 'id')``. The columns of the intracellular_recordings
+        table are labelled by category as in
+        :py:meth:`~pynwb.icephys.IntracellularRecordingsTable.to_dataframe`.
+
+        This gives the same rows as resetting the index of the DataFrame from
+        :py:func:`~hdmf.common.hierarchicaltable.to_hierarchical_dataframe`, but the rows are joined using the
+        row indices of the tables instead of row by row, and only the selected tables are read.
+        """
+        tables = popargs('tables', kwargs)
+        root = self.get_icephys_meta_parent_table()
+        if root is None:
+            return None
+        return _flatten_icephys_tables(root, tables, **kwargs)
+
     @docval({'name': 'data',
              'type': ('scalar_data', np.ndarray, list, tuple, pd.DataFrame, DynamicTable, NWBContainer, ScratchData),
              'doc': 'The data to add to the scratch space.'},
@@ -1122,11 +1504,27 @@ class NWBFile(MultiContainerInterface, HERDManager):
                 ret = np.asarray(ret.data)
         return ret
 
-    def copy(self):
+    @docval({'name': 'lazy', 'type': bool, 'default': False,
+             'doc': 'link to the tables of this file and copy them only when they are accessed in the copy'})
+    def copy(self, **kwargs):
         """
         Shallow copy of an NWB file.
         Useful for linking across files.
+
+        By default, the tables of this file, e.g., the electrodes table and the trials table, are copied right away
+        so that new objects can reference them. With ``lazy=True``, the copy links to the tables of this file and
+        copies a table only when it is accessed through the copy, e.g., ``nwbfile_copy.electrodes``. Tables that are
+        not accessed are written as links to this file. The other tables in ``scratch`` and ``intervals`` are always
+        linked in a lazy copy.
+
+        A table is copied on any access of its attribute, not only when it is modified, because the returned table
+        may be referenced by new objects, e.g., by a ``DynamicTableRegion``, or be given new columns, which requires
+        a table that belongs to the copy. Like the copies made without ``lazy``, the copy is shallow: it is a new
+        table with the same columns, so no data is copied or read. Methods of the copy that
+        only read a table, i.e., :py:meth:`~pynwb.file.NWBFile.get_electrode_indices` and ``epoch_tags``, do not
+        copy it. Read the tables of this file to read a table without copying it.
         """
+        lazy = getargs('lazy', kwargs)
         kwargs = self.fields.copy()
         for key in self.fields:
             if isinstance(self.fields[key], LabelledDict):
@@ -1136,12 +1534,25 @@ class NWBFile(MultiContainerInterface, HERDManager):
         # contain such object references and types such as ElectricalSeries contain references to DynamicTables.
         # Below, copy the table and link to the columns so that object references work.
         fields_to_copy = ['electrodes', 'epochs', 'trials', 'units', 'sweep_table', 'invalid_times']
+        linked_tables = set()
         for field in fields_to_copy:
             if field in kwargs:
-                if isinstance(self.fields[field], DynamicTable):
-                    kwargs[field] = self.fields[field].copy()
-                else:
+                if not isinstance(self.fields[field], DynamicTable):
                     warn('Cannot copy child of NWBFile that is not a DynamicTable: %s' % field)
+                elif lazy:
+                    linked_tables.add(field)
+                else:
+                    kwargs[field] = self.fields[field].copy()
+        if lazy:
+            # a table that is also a field, e.g., trials in the intervals of a file that was read, is only linked
+            # through its field, so that the intervals of the copy do not keep the table once the field is copied
+            linked = [self.fields[field] for field in linked_tables]
+            for dt in ('scratch', 'intervals'):
+                if dt in kwargs:
+                    kwargs[dt] = [v for v in kwargs[dt] if not any(v is table for table in linked)]
+            ret = NWBFile(**kwargs)
+            ret.__linked_tables = frozenset(linked_tables)
+            return ret
 
         # handle dictionaries of DynamicTables
         dt_to_copy = ['scratch', 'intervals']
@@ -1151,6 +1562,12 @@ class NWBFile(MultiContainerInterface, HERDManager):
 
         return NWBFile(**kwargs)
 
+    def __copy_linked_table(self, name):
+        """Replace a table that a lazy copy links to with a copy of the table."""
+        self.__linked_tables = self.__linked_tables - {name}
+        table = self.fields.pop(name)
+        setattr(self, name, table.copy())
+
 
 def _add_missing_timezone(date):
     """
@@ -1176,6 +1593,64 @@ def _tablefunc(table_name, description, columns):
     return t
 
 
+def _get_object_path(obj, root):
+    """Get the names of the objects from root to obj, each preceded by '/'."""
+    names = list()
+    while obj is not None and obj is not root:
+        names.append(obj.name)
+        obj = obj.parent
+    return ''.join('/' + name for name in reversed(names))
+
+
+def _get_data_footprint(data):
+    """
+    Get the size of the data in memory and, for an HDF5 dataset, on disk as a dict.
+
+    The size in memory is split into the size of the NumPy arrays and the size of the Python objects around them.
+    """
+    row = dict(path=None, shape=None, dtype=None, memory_bytes=0, overhead_bytes=0)
+    if isinstance(data, h5py.Dataset):
+        data_bytes = data.size * data.dtype.itemsize
+        stored_bytes = data.id.get_storage_size()
+        row.update(path=data.name, shape=data.shape, dtype=data.dtype, data_bytes=data_bytes,
+                   stored_bytes=stored_bytes, compression_ratio=data_bytes / stored_bytes if stored_bytes else np.nan,
+                   num_chunks=data.id.get_num_chunks() if data.chunks is not None else np.nan,
+                   chunks=data.chunks, compression=data.compression)
+        return row
+    if isinstance(data, np.ndarray):
+        row.update(shape=data.shape, dtype=data.dtype)
+    else:
+        row.update(shape=(len(data), ))
+    stack = [data]
+    while len(stack):
+        value = stack.pop()
+        if isinstance(value, np.ndarray):
+            row['memory_bytes'] += value.nbytes
+            row['overhead_bytes'] += sys.getsizeof(value) - (value.nbytes if value.flags.owndata else 0)
+            if value.dtype == object:
+                stack.extend(value.ravel())
+        else:
+            row['overhead_bytes'] += sys.getsizeof(value)
+            if isinstance(value, (list, tuple)):
+                stack.extend(value)
+    return row
+
+
+# the optional columns of the electrodes table that add_electrode creates when a value is given for them
+_ELECTRODE_OPTIONAL_COLUMNS = [
+    ('x', 'the x coordinate of the position (+x is posterior)'),
+    ('y', 'the y coordinate of the position (+y is inferior)'),
+    ('z', 'the z coordinate of the position (+z is right)'),
+    ('imp', 'the impedance of the electrode, in ohms'),
+    ('filtering', 'description of hardware filtering, including the filter name and frequency cutoffs'),
+    ('rel_x', 'the x coordinate within the electrode group'),
+    ('rel_y', 'the y coordinate within the electrode group'),
+    ('rel_z', 'the z coordinate within the electrode group'),
+    ('reference', 'Description of the reference electrode and/or reference scheme used for this \
+        electrode, e.g.,"stainless steel skull screw" or "online common average referencing".')
+]
+
+
 def ElectrodeTable(name='electrodes',
                    description='metadata about extracellular electrodes'):
     return _tablefunc(name, description,
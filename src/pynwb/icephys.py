@@ -2,13 +2,14 @@ import warnings
 from copy import copy
 
 import numpy as np
+import pandas as pd
 
 from hdmf.common import DynamicTable, AlignedDynamicTable
 from hdmf.utils import docval, popargs, popargs_to_dict, get_docval, getargs
 
 from . import register_class, CORE_NAMESPACE
-from .base import TimeSeries, TimeSeriesReferenceVectorData
-from .core import NWBContainer
+from .base import TimeSeries, TimeSeriesReferenceVectorData, _encode_timeseries
+from .core import NWBContainer, _add_table_rows, _get_indptr, _read_array, _UniqueIds
 from .device import Device
 
 
@@ -341,6 +342,7 @@ class SweepTable(DynamicTable):
                       "instead. See also the  NWBFile.add_intracellular_recordings function.",
                       DeprecationWarning)
         super().__init__(**kwargs)
+        self.__sweep_index = None
 
     @docval({'name': 'pcs', 'type': PatchClampSeries,
              'doc': 'PatchClampSeries to add to the table must have a valid sweep_number'})
@@ -358,27 +360,43 @@ class SweepTable(DynamicTable):
     def get_series(self, sweep_number):
         """
         Return a list of PatchClampSeries for the given sweep number.
-        """
 
-        ids = self.__get_row_ids(sweep_number)
+        If a list or array of sweep numbers is given, return a list with the list of PatchClampSeries of each
+        sweep number instead. The list of PatchClampSeries of a sweep number that is not in the table is None.
+        """
+        row_ids, indptr, sweeps = self.__get_sweep_index()
+        if np.ndim(sweep_number) == 0:
+            return self.__get_series(sweeps.get(sweep_number), row_ids, indptr)
+        return [self.__get_series(sweeps.get(x), row_ids, indptr) for x in np.asarray(sweep_number).tolist()]
 
-        if len(ids) == 0:
+    def __get_series(self, rows, row_ids, indptr):
+        """
+        Return the PatchClampSeries of the given slice of the row ids sorted by sweep number.
+        """
+        if rows is None:
             return None
-
+        target = self['series'].target
         matches = []
-
-        for x in ids:
-            for y in self[(x, 'series')]:
-                matches.append(y)
-
+        for x in row_ids[rows].tolist():
+            matches.extend(target.get(slice(indptr[x], indptr[x + 1])))
         return matches
 
-    def __get_row_ids(self, sweep_number):
-        """
-        Return the row ids for the given sweep number.
+    def __get_sweep_index(self):
         """
+        Return the row ids sorted by sweep number, the offsets of the series of each row, and a dict mapping
+        each sweep number to the slice of the sorted row ids with that sweep number.
 
-        return [index for index, elem in enumerate(self['sweep_number'].data) if elem == sweep_number]
+        The index is computed once with a single read of the sweep_number and series index columns and is
+        recomputed when rows are added to the table.
+        """
+        if self.__sweep_index is None or self.__sweep_index[0] != len(self):
+            sweep_numbers = _read_array(self['sweep_number'].data)
+            row_ids = np.argsort(sweep_numbers, kind='stable')
+            numbers, starts, counts = np.unique(sweep_numbers[row_ids], return_index=True, return_counts=True)
+            sweeps = {number: slice(start, stop)
+                      for number, start, stop in zip(numbers.tolist(), starts.tolist(), (starts + counts).tolist())}
+            self.__sweep_index = (len(self), row_ids, _get_indptr(self['series']).tolist(), sweeps)
+        return self.__sweep_index[1:]
 
 
 @register_class('IntracellularElectrodesTable', CORE_NAMESPACE)
@@ -511,6 +529,7 @@ class IntracellularRecordingsTable(AlignedDynamicTable):
             kwargs['categories'] = categories_arg
 
         super().__init__(**kwargs)
+        self.__unique_ids = _UniqueIds(self)
 
     @docval(
         {
@@ -650,13 +669,237 @@ class IntracellularRecordingsTable(AlignedDynamicTable):
         responses['response'] = TimeSeriesReferenceVectorData.TIME_SERIES_REFERENCE_TUPLE(
             response_start_index, response_index_count, response)
 
-        _ = super().add_row(enforce_unique_id=True,
-                            electrodes=electrodes,
+        self.__unique_ids.check_row(kwargs.get('id'))
+        _ = super().add_row(electrodes=electrodes,
                             responses=responses,
                             stimuli=stimuli,
                             **kwargs)
         return len(self) - 1
 
+    @docval({'name': 'electrodes', 'type': ('array_data', IntracellularElectrode), 'default': None,
+             'doc': 'The intracellular electrode of each recording, or one electrode for all recordings. By default, '
+                    'the electrode of the stimulus, or of the response if there is no stimulus, is used'},
+            {'name': 'stimuli', 'type': 'array_data', 'default': None,
+             'doc': 'The TimeSeries (usually a PatchClampSeries) with the stimulus of each recording, '
+                    'or None for recordings without a stimulus'},
+            {'name': 'stimulus_start_index', 'type': 'array_data', 'default': None,
+             'doc': 'Start index of each stimulus. -1 selects the default of add_recording'},
+            {'name': 'stimulus_index_count', 'type': 'array_data', 'default': None,
+             'doc': 'Number of samples of each stimulus. -1 selects the default of add_recording'},
+            {'name': 'stimulus_templates', 'type': 'array_data', 'default': None,
+             'doc': 'The TimeSeries (usually a PatchClampSeries) with the stimulus template waveforms of each '
+                    'recording, or None for recordings without a stimulus template'},
+            {'name': 'stimulus_template_start_index', 'type': 'array_data', 'default': None,
+             'doc': 'Start index of each stimulus template. -1 selects the default of add_recording'},
+            {'name': 'stimulus_template_index_count', 'type': 'array_data', 'default': None,
+             'doc': 'Number of samples of each stimulus template. -1 selects the default of add_recording'},
+            {'name': 'responses', 'type': 'array_data', 'default': None,
+             'doc': 'The TimeSeries (usually a PatchClampSeries) with the response of each recording, '
+                    'or None for recordings without a response'},
+            {'name': 'response_start_index', 'type': 'array_data', 'default': None,
+             'doc': 'Start index of each response. -1 selects the default of add_recording'},
+            {'name': 'response_index_count', 'type': 'array_data', 'default': None,
+             'doc': 'Number of samples of each response. -1 selects the default of add_recording'},
+            {'name': 'electrode_metadata', 'type': dict, 'default': None,
+             'doc': 'Additional electrode metadata to be stored in the electrodes table, with one value per '
+                    'recording for each column'},
+            {'name': 'stimulus_metadata', 'type': dict, 'default': None,
+             'doc': 'Additional stimulus metadata to be stored in the stimuli table, with one value per '
+                    'recording for each column'},
+            {'name': 'response_metadata', 'type': dict, 'default': None,
+             'doc': 'Additional response metadata to be stored in the responses table, with one value per '
+                    'recording for each column'},
+            {'name': 'id', 'type': 'array_data', 'default': None,
+             'doc': 'The ID of each recording. By default, IDs are auto-incremented'},
+            returns='Integer indices of the rows that were added to this table',
+            rtype=np.ndarray,
+            allow_extra=True)
+    def add_recordings(self, **kwargs):
+        """
+        Add many recordings to the IntracellularRecordingsTable table at once.
+
+        This is equivalent to calling :py:meth:`~pynwb.icephys.IntracellularRecordingsTable.add_recording` for
+        each recording, but the start indices and counts, the types of the stimuli and responses, and the
+        electrodes are checked for all recordings at once, and each column of this table and of its category
+        tables is extended once. Values for the other columns of this table are given as additional keyword
+        arguments with one value per recording, and values for other category tables as dicts mapping the
+        names of their columns to one value per recording.
+        """
+        stimuli, responses, stimulus_templates, electrodes, ids = popargs('stimuli', 'responses',
+                                                                          'stimulus_templates', 'electrodes',
+                                                                          'id', kwargs)
+        if stimuli is None and responses is None:
+            raise ValueError("stimuli and responses cannot both be None.")
+        num_recordings = len(stimuli) if stimuli is not None else len(responses)
+        stimuli = [None] * num_recordings if stimuli is None else list(stimuli)
+        responses = [None] * num_recordings if responses is None else list(responses)
+        if len(responses) != num_recordings:
+            raise ValueError("stimuli and responses must have the same length, got %d and %d"
+                             % (num_recordings, len(responses)))
+        category_data = dict(electrodes=popargs('electrode_metadata', kwargs) or {},
+                             stimuli=popargs('stimulus_metadata', kwargs) or {},
+                             responses=popargs('response_metadata', kwargs) or {})
+        category_data.update({name: kwargs.pop(name) for name in self.categories if name in kwargs})
+        missing_categories = set(self.categories) - set(category_data)
+        if missing_categories:
+            raise KeyError('row data keys do not match available categories\n'
+                           'missing {} category keys: {}'.format(len(missing_categories), missing_categories))
+
+        # Compute the start and stop indices for all recordings of each TimeSeries at once
+        stimulus_indices = self.__compute_indices(popargs('stimulus_start_index', kwargs),
+                                                  popargs('stimulus_index_count', kwargs),
+                                                  stimuli, 'stimulus')
+        response_indices = self.__compute_indices(popargs('response_start_index', kwargs),
+                                                  popargs('response_index_count', kwargs),
+                                                  responses, 'response')
+        template_start_index, template_index_count = popargs('stimulus_template_start_index',
+                                                             'stimulus_template_index_count', kwargs)
+        if stimulus_templates is not None:
+            stimulus_templates = list(stimulus_templates)
+            if (all(template is None for template in stimulus_templates)
+                    and 'stimulus_template' not in self.category_tables['stimuli'].colnames):
+                # like add_recording, only add the stimulus_template column if a stimulus template is given
+                stimulus_templates = None
+        if stimulus_templates is not None:
+            template_indices = self.__compute_indices(template_start_index, template_index_count,
+                                                      stimulus_templates, 'stimulus_template')
+        elif 'stimulus_template' in self.category_tables['stimuli'].colnames:
+            stimulus_templates = [None] * num_recordings
+            template_indices = (np.full(num_recordings, -1), np.full(num_recordings, -1))
+
+        missing = np.flatnonzero([stimulus is None and response is None
+                                  for stimulus, response in zip(stimuli, responses)])
+        if len(missing):
+            raise ValueError("stimulus and response cannot both be None, got None for both in recording %d"
+                             % missing[0])
+        if electrodes is None:
+            electrodes = [(stimulus if stimulus is not None else response).electrode
+                          for stimulus, response in zip(stimuli, responses)]
+        elif isinstance(electrodes, IntracellularElectrode):
+            electrodes = [electrodes] * num_recordings
+        else:
+            invalid = next((i for i, electrode in enumerate(electrodes)
+                            if not isinstance(electrode, IntracellularElectrode)), None)
+            if invalid is not None:
+                raise TypeError("electrodes must be IntracellularElectrode objects, got %s for recording %d"
+                                % (type(electrodes[invalid]), invalid))
+        # If either stimulus or response are None, then set them to the same TimeSeries to keep the I/O happy
+        stimulus_given = np.array([stimulus is not None for stimulus in stimuli], dtype=bool)
+        responses = [response if response is not None else stimulus for stimulus, response in zip(stimuli, responses)]
+        stimuli = [stimulus if stimulus is not None else response for stimulus, response in zip(stimuli, responses)]
+        if stimulus_templates is not None:
+            stimulus_templates = [template if template is not None else stimulus
+                                  for template, stimulus in zip(stimulus_templates, stimuli)]
+        self.__check_stimuli_and_responses(stimuli, responses, stimulus_given)
+
+        category_data['electrodes'] = dict(category_data['electrodes'], electrode=list(electrodes))
+        category_data['stimuli'] = dict(category_data['stimuli'],
+                                        stimulus=self.__get_references(*stimulus_indices, stimuli))
+        if stimulus_templates is not None:
+            category_data['stimuli']['stimulus_template'] = self.__get_references(*template_indices,
+                                                                                  stimulus_templates)
+        category_data['responses'] = dict(category_data['responses'],
+                                          response=self.__get_references(*response_indices, responses))
+
+        # Check all data before adding anything, so that the tables stay aligned if the data is invalid
+        if set(kwargs) != set(self.colnames):
+            extra_columns, missing_columns = set(kwargs) - set(self.colnames), set(self.colnames) - set(kwargs)
+            raise ValueError("row data keys don't match available columns\n"
+                             "you supplied {} extra keys: {}\nand were missing {} keys: {}".format(
+                                 len(extra_columns), extra_columns, len(missing_columns), missing_columns))
+        for data in (kwargs, *category_data.values()):
+            for name, values in data.items():
+                if values is not None and len(values) != num_recordings:
+                    raise ValueError("got %d values of column '%s' for %d recordings"
+                                     % (len(values), name, num_recordings))
+        start = len(self)
+        if ids is None:
+            ids = np.arange(start, start + num_recordings)
+        _add_table_rows(self, kwargs, ids=ids, enforce_unique_id=True, unique_ids=self.__unique_ids)
+        for category, data in category_data.items():
+            _add_table_rows(self.category_tables[category], data)
+        return np.arange(start, len(self))
+
+    @staticmethod
+    def __compute_indices(start_index, index_count, timeseries, name):
+        """
+        Internal helper function to compute the start_index and index_count of many references at once.
+        This is the vectorized equivalent of __compute_index, where each TimeSeries is queried only once.
+
+        :returns: A tuple of integer arrays with the start_index and index_count to use.
+        """
+        starts = np.full(len(timeseries), -1, dtype=np.int64) if start_index is None else np.array(start_index)
+        counts = np.full(len(timeseries), -1, dtype=np.int64) if index_count is None else np.array(index_count)
+        if starts.shape != (len(timeseries), ) or counts.shape != (len(timeseries), ):
+            raise ValueError("%s_start_index and %s_index_count must have one value per %s, got %d and %d values "
+                             "for %d recordings" % (name, name, name, starts.size, counts.size, len(timeseries)))
+        if (len(starts) and starts.dtype.kind not in 'iu') or (len(counts) and counts.dtype.kind not in 'iu'):
+            raise TypeError("%s_start_index and %s_index_count must be integers" % (name, name))
+        codes, categories = _encode_timeseries(timeseries)
+        for ts in categories:
+            if ts is not None and not isinstance(ts, TimeSeries):
+                raise TypeError("%s must be a TimeSeries or None, got %s" % (name, type(ts)))
+        num_samples = np.array([np.nan if ts is None or ts.num_samples is None else ts.num_samples
+                                for ts in categories], dtype=float)[codes]
+        invalid = np.array([ts is None for ts in categories], dtype=bool)[codes]
+        unknown = np.isnan(num_samples)
+        starts = np.where(starts < 0, 0, starts)
+        unset = counts < 0
+        if np.any(unset & unknown & ~invalid):
+            raise IndexError("Invalid %s_index_count cannot be determined from %s data." % (name, name))
+        counts = np.where(unset & ~unknown, num_samples - starts, counts).astype(np.int64)
+        known = ~unknown & ~invalid
+        if np.any(starts[known] >= num_samples[known]):
+            raise IndexError("%s_start_index out of range" % name)
+        if np.any(starts[known] + counts[known] > num_samples[known]):
+            raise IndexError("%s_start_index + %s_index_count out of range" % (name, name))
+        # If times_series is not valid then use -1, -1 to indicate invalid times
+        starts[invalid] = -1
+        counts[invalid] = -1
+        return starts, counts
+
+    @staticmethod
+    def __check_stimuli_and_responses(stimuli, responses, stimulus_given):
+        """
+        Internal helper function to check the stimulus and response of many recordings at once,
+        as add_recording does for a single recording, with each TimeSeries checked only once.
+        """
+        stimulus_codes, stimulus_series = _encode_timeseries(stimuli)
+        response_codes, response_series = _encode_timeseries(responses)
+
+        def get_properties(series, codes):
+            types = [ts.neurodata_type for ts in series]
+            is_current = np.array([t.startswith("CurrentClamp") for t in types], dtype=bool)[codes]
+            is_voltage = np.array([t.startswith("VoltageClamp") for t in types], dtype=bool)[codes]
+            electrodes = np.array([id(ts.electrode) if isinstance(ts, PatchClampSeries) else 0 for ts in series],
+                                  dtype=np.int64)[codes]
+            return is_current, is_voltage, electrodes
+
+        stimulus_current, stimulus_voltage, stimulus_electrodes = get_properties(stimulus_series, stimulus_codes)
+        response_current, response_voltage, response_electrodes = get_properties(response_series, response_codes)
+        # Make sure the types are compatible.
+        bad = np.flatnonzero((response_current & stimulus_voltage) | (response_voltage & stimulus_current))
+        if len(bad):
+            raise ValueError("Incompatible types given for 'stimulus' and 'response' parameters. "
+                             "'stimulus' is of type %s and 'response' is of type %s." %
+                             (stimuli[bad[0]].neurodata_type, responses[bad[0]].neurodata_type))
+        is_izero = np.array([ts.neurodata_type == 'IZeroClampSeries' for ts in response_series],
+                            dtype=bool)[response_codes]
+        if np.any(is_izero & stimulus_given):
+            raise ValueError("stimulus should usually be None for IZeroClampSeries response")
+        if np.any((stimulus_electrodes != 0) & (response_electrodes != 0)
+                  & (stimulus_electrodes != response_electrodes)):
+            raise ValueError(
+                "electrodes are usually expected to be the same for PatchClampSeries type stimulus and response "
+                "pairs in an intracellular recording."
+            )
+
+    @staticmethod
+    def __get_references(starts, counts, timeseries):
+        """Internal helper function to create the TimeSeriesReference tuples of many references."""
+        return [TimeSeriesReferenceVectorData.TIME_SERIES_REFERENCE_TUPLE(*row)
+                for row in zip(starts.tolist(), counts.tolist(), timeseries)]
+
     @staticmethod
     def __compute_index(start_index, index_count, time_series, name):
         """
@@ -711,19 +954,31 @@ class IntracellularRecordingsTable(AlignedDynamicTable):
         """Convert the collection of tables to a single pandas DataFrame"""
         res = super().to_dataframe(ignore_category_ids=getargs('ignore_category_ids', kwargs))
         if getargs('electrode_refs_as_objectids', kwargs):
-            res[('electrodes', 'electrode')] = [e.object_id for e in res[('electrodes', 'electrode')]]
+            # look up the object_id of each distinct electrode only once
+            codes, electrodes = _encode_timeseries(res[('electrodes', 'electrode')])
+            object_ids = np.array([e.object_id for e in electrodes], dtype=object)
+            res[('electrodes', 'electrode')] = object_ids[codes]
         if getargs('stimulus_refs_as_objectids', kwargs):
-            res[('stimuli', 'stimulus')] = \
-                [e if e[2] is None
-                 else TimeSeriesReferenceVectorData.TIME_SERIES_REFERENCE_TUPLE(e[0], e[1],  e[2].object_id)
-                 for e in res[('stimuli', 'stimulus')]]
+            res[('stimuli', 'stimulus')] = self.__refs_as_objectids(self.category_tables['stimuli']['stimulus'])
         if getargs('response_refs_as_objectids', kwargs):
-            res[('responses', 'response')] = \
-                [e if e[2] is None else
-                 TimeSeriesReferenceVectorData.TIME_SERIES_REFERENCE_TUPLE(e[0], e[1],  e[2].object_id)
-                 for e in res[('responses', 'response')]]
+            res[('responses', 'response')] = self.__refs_as_objectids(self.category_tables['responses']['response'])
         return res
 
+    @staticmethod
+    def __refs_as_objectids(column):
+        """
+        Get the references of a TimeSeriesReferenceVectorData column with the object_id of the TimeSeries instead
+        of the TimeSeries, looking up the object_id of each distinct TimeSeries only once.
+        """
+        columns = column.get_columns()
+        object_ids = np.array([ts.object_id for ts in columns.categories] + [None], dtype=object)
+        return [TimeSeriesReferenceVectorData.TIME_SERIES_REFERENCE_TUPLE(idx_start, count, object_id)
+                if valid else TimeSeriesReferenceVectorData.TIME_SERIES_REFERENCE_NONE_TYPE
+                for idx_start, count, object_id, valid in zip(columns.idx_start.tolist(),
+                                                              columns.count.tolist(),
+                                                              object_ids[columns.codes],
+                                                              columns.valid)]
+
 
 @register_class('SimultaneousRecordingsTable', CORE_NAMESPACE)
 class SimultaneousRecordingsTable(DynamicTable):
@@ -757,6 +1012,7 @@ class SimultaneousRecordingsTable(DynamicTable):
                                  'from different electrodes.')
         # Initialize the DynamicTable
         super().__init__(**kwargs)
+        self.__unique_ids = _UniqueIds(self)
         if self['recordings'].target.table is None:
             if intracellular_recordings_table is not None:
                 self['recordings'].target.table = intracellular_recordings_table
@@ -774,7 +1030,8 @@ class SimultaneousRecordingsTable(DynamicTable):
         Add a single simultaneous recording (i.e., one sweep, or one row) consisting of one or more
         recordings and associated custom simultaneous recording metadata to the table.
         """
-        _ = super().add_row(enforce_unique_id=True, **kwargs)
+        self.__unique_ids.check_row(kwargs.get('id'))
+        _ = super().add_row(**kwargs)
         return len(self.id) - 1
 
 
@@ -817,6 +1074,7 @@ class SequentialRecordingsTable(DynamicTable):
                                  'same type with varying parameters have been presented in a sequence.')
         # Initialize the DynamicTable
         super().__init__(**kwargs)
+        self.__unique_ids = _UniqueIds(self)
         if self['simultaneous_recordings'].target.table is None:
             if simultaneous_recordings_table is not None:
                 self['simultaneous_recordings'].target.table = simultaneous_recordings_table
@@ -837,7 +1095,8 @@ class SequentialRecordingsTable(DynamicTable):
         Add a sequential recording (i.e., one row) consisting of one or more simultaneous recordings
         and associated custom sequential recording metadata to the table.
         """
-        _ = super().add_row(enforce_unique_id=True, **kwargs)
+        self.__unique_ids.check_row(kwargs.get('id'))
+        _ = super().add_row(**kwargs)
         return len(self.id) - 1
 
 
@@ -874,6 +1133,7 @@ class RepetitionsTable(DynamicTable):
                                  'of stimuli applied in sequence.')
         # Initialize the DynamicTable
         super().__init__(**kwargs)
+        self.__unique_ids = _UniqueIds(self)
         if self['sequential_recordings'].target.table is None:
             if sequential_recordings_table is not None:
                 self['sequential_recordings'].target.table = sequential_recordings_table
@@ -892,7 +1152,8 @@ class RepetitionsTable(DynamicTable):
         Add a repetition (i.e., one row) consisting of one or more sequential recordings
         and associated custom repetition metadata to the table.
         """
-        _ = super().add_row(enforce_unique_id=True, **kwargs)
+        self.__unique_ids.check_row(kwargs.get('id'))
+        _ = super().add_row(**kwargs)
         return len(self.id) - 1
 
 
@@ -924,6 +1185,7 @@ class ExperimentalConditionsTable(DynamicTable):
                                  'belong to the same experimental conditions.')
         # Initialize the DynamicTable
         super().__init__(**kwargs)
+        self.__unique_ids = _UniqueIds(self)
         if self['repetitions'].target.table is None:
             if repetitions_table is not None:
                 self['repetitions'].target.table = repetitions_table
@@ -942,5 +1204,65 @@ class ExperimentalConditionsTable(DynamicTable):
         Add a condition (i.e., one row) consisting of one or more repetitions of sequential recordings
         and associated custom experimental_conditions metadata to the table.
         """
-        _ = super().add_row(enforce_unique_id=True, **kwargs)
+        self.__unique_ids.check_row(kwargs.get('id'))
+        _ = super().add_row(**kwargs)
         return len(self.id) - 1
+
+
+# the DynamicTableRegion column of each table of the icephys metadata table hierarchy that references the rows of
+# the table one level below it. Other DynamicTableRegion columns, e.g., added by a user, are not part of the hierarchy
+_ICEPHYS_HIERARCHY_COLUMNS = ((SimultaneousRecordingsTable, 'recordings'),
+                              (SequentialRecordingsTable, 'simultaneous_recordings'),
+                              (RepetitionsTable, 'sequential_recordings'),
+                              (ExperimentalConditionsTable, 'repetitions'))
+
+
+def _flatten_icephys_tables(root, tables=None, **kwargs):
+    """
+    Join the tables of the icephys metadata table hierarchy, starting from root, into a single DataFrame with one
+    row for each row of the deepest selected table that is referenced from root, in the order of the rows of root.
+
+    The rows of each level are selected by walking the index and the row indices of the DynamicTableRegion column
+    of each table level by level with NumPy, so that the cost is linear in the total number of rows. Only the
+    tables named in tables (by default all tables of the hierarchy) are converted to DataFrames. kwargs are passed
+    to IntracellularRecordingsTable.to_dataframe.
+    """
+    hierarchy = [root]
+    regions = []
+    while not isinstance(hierarchy[-1], IntracellularRecordingsTable):
+        regions.append(next(name for cls, name in _ICEPHYS_HIERARCHY_COLUMNS if isinstance(hierarchy[-1], cls)))
+        hierarchy.append(hierarchy[-1][regions[-1]].target.table)
+    names = [table.name for table in hierarchy]
+    if tables is None:
+        tables = names
+    for name in tables:
+        if name not in names:
+            raise ValueError("table '%s' is not in the icephys metadata table hierarchy %s" % (name, names))
+    depth = max(names.index(name) for name in tables)
+
+    # the row of each table for each row of the result, where the rows of a level are the targets of the rows
+    # of the level above, repeated for each of their targets
+    rows = [np.arange(len(root))]
+    for table, region in zip(hierarchy[:depth], regions):
+        indptr = _get_indptr(table[region])
+        targets = _read_array(table[region].target.data).astype(np.int64, copy=False)
+        starts = indptr[rows[-1]]
+        counts = indptr[rows[-1] + 1] - starts
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        rows = [np.repeat(r, counts) for r in rows]
+        rows.append(targets[offsets])
+
+    frames = []
+    for table, region, table_rows in zip(hierarchy, regions + [None], rows):
+        if table.name not in tables:
+            continue
+        if region is None:
+            df = table.to_dataframe(**kwargs)
+        else:
+            df = table.to_dataframe(exclude={region})
+            df.columns = pd.MultiIndex.from_arrays([[table.name] * len(df.columns), df.columns])
+            df.index.name = (table.name, 'id')
+        frames.append(df.reset_index().iloc[table_rows].reset_index(drop=True))
+    ret = pd.concat(frames, axis=1)
+    ret.columns.names = ('source_table', 'label')
+    return ret
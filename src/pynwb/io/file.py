@@ -161,6 +161,32 @@ class NWBFileMap(ObjectMapper):
                 ret.append(s)
         return ret
 
+    # NWBFile.copy(lazy=True) copies the tables of the copied file when they are accessed through the copy, so get
+    # the tables from the fields to write links to the tables that were not accessed instead of copying them
+    @ObjectMapper.object_attr('electrodes')
+    def electrodes_obj_attr(self, container, manager):
+        return container.fields.get('electrodes')
+
+    @ObjectMapper.object_attr('epochs')
+    def epochs_obj_attr(self, container, manager):
+        return container.fields.get('epochs')
+
+    @ObjectMapper.object_attr('trials')
+    def trials_obj_attr(self, container, manager):
+        return container.fields.get('trials')
+
+    @ObjectMapper.object_attr('units')
+    def units_obj_attr(self, container, manager):
+        return container.fields.get('units')
+
+    @ObjectMapper.object_attr('sweep_table')
+    def sweep_table_obj_attr(self, container, manager):
+        return container.fields.get('sweep_table')
+
+    @ObjectMapper.object_attr('invalid_times')
+    def invalid_times_obj_attr(self, container, manager):
+        return container.fields.get('invalid_times')
+
     @ObjectMapper.constructor_arg('scratch')
     def scratch(self, builder, manager):
         """Set the constructor arg for 'scratch' to a tuple of objects.
@@ -178,6 +204,8 @@ class NWBFileMap(ObjectMapper):
                 ret.append(manager.construct(g))
             for d in scratch.datasets.values():
                 ret.append(manager.construct(d))
+            for link in scratch.links.values():
+                ret.append(manager.construct(link.builder))
         return tuple(ret) if len(ret) > 0 else None
 
     @ObjectMapper.constructor_arg('session_start_time')
@@ -7,9 +7,11 @@ import numpy as np
 from hdmf.utils import docval, getargs, popargs, popargs_to_dict, get_docval
 
 from . import register_class, CORE_NAMESPACE
-from .base import TimeSeries
+from .base import TimeSeries, _iter_ranges, _read_ranges
+from .core import _add_table_rows, _get_csr, _get_indptr
+from .epoch import TimeIntervals
 from .ecephys import ElectrodeGroup
-from hdmf.common import DynamicTable, DynamicTableRegion
+from hdmf.common import DynamicTable, DynamicTableRegion, VectorIndex
 
 
 @register_class('AnnotationSeries', CORE_NAMESPACE)
@@ -204,6 +206,98 @@ class Units(DynamicTable):
         Add a unit to this table
         """
         super().add_row(**kwargs)
+        self.__set_electrode_table()
+
+    @docval({'name': 'spike_times', 'type': ('array_data', 'data'), 'default': None,
+             'doc': 'the spike times of each unit, or the spike times of all units concatenated into one array '
+                    'if spike_times_offsets is given'},
+            {'name': 'spike_times_offsets', 'type': ('array_data', 'data'), 'default': None,
+             'doc': 'CSR-style offsets of the spike times of each unit into spike_times, with one more element '
+                    'than the number of units: the spike times of unit i are '
+                    'spike_times[spike_times_offsets[i]:spike_times_offsets[i+1]]'},
+            {'name': 'obs_intervals', 'type': ('array_data', 'data'), 'default': None,
+             'doc': 'the observation intervals (valid times) of each unit'},
+            {'name': 'electrodes', 'type': ('array_data', 'data'), 'default': None,
+             'doc': 'the electrodes that each unit came from'},
+            {'name': 'electrode_group', 'type': ('array_data', 'data'), 'default': None,
+             'doc': 'the electrode group that each unit came from'},
+            {'name': 'waveform_mean', 'type': ('array_data', 'data'), 'default': None,
+             'doc': 'the spike waveform mean of each unit'},
+            {'name': 'waveform_sd', 'type': ('array_data', 'data'), 'default': None,
+             'doc': 'the spike waveform standard deviation of each unit'},
+            {'name': 'waveforms', 'type': ('array_data', 'data'), 'default': None,
+             'doc': 'the individual waveforms of each unit'},
+            {'name': 'id', 'type': ('array_data', 'data'), 'default': None, 'doc': 'the id of each unit'},
+            allow_extra=True)
+    def add_units(self, **kwargs):
+        """
+        Add many units to this table at once.
+
+        This is equivalent to calling :py:meth:`~pynwb.misc.Units.add_unit` for each unit, but each column and
+        its index are extended once with the values of all units, and the electrode table is resolved once.
+        All arguments, including the values of other columns given as additional keyword arguments, have one
+        value per unit.
+        """
+        spike_times, offsets, ids = popargs('spike_times', 'spike_times_offsets', 'id', kwargs)
+        if ids is not None and len(ids) and np.asarray(ids).dtype.kind not in 'iu':
+            raise TypeError("Units.add_units: incorrect type for 'id' (got '%s', expected 'int')"
+                            % np.asarray(ids).dtype)
+        if kwargs.get('electrode_group') is not None:
+            for i, group in enumerate(kwargs['electrode_group']):
+                if not isinstance(group, ElectrodeGroup):
+                    raise TypeError("Units.add_units: incorrect type for 'electrode_group' of unit %d (got '%s', "
+                                    "expected 'ElectrodeGroup')" % (i, type(group).__name__))
+        if offsets is not None:
+            if spike_times is None:
+                raise ValueError("spike_times must be given with spike_times_offsets")
+            spike_times = np.asarray(spike_times)
+            if spike_times.dtype.kind not in 'iuf':
+                raise TypeError("Units.add_units: incorrect type for 'spike_times' (got '%s', expected a numeric "
+                                "type)" % spike_times.dtype)
+            if spike_times.ndim != 1:
+                raise ValueError("Units.add_units: incorrect shape for 'spike_times' (got '%s', expected '(None,)')"
+                                 % (spike_times.shape,))
+            offsets = np.asarray(offsets, dtype=np.int64)
+            if (len(offsets) == 0 or offsets[0] != 0 or offsets[-1] != len(spike_times)
+                    or np.any(np.diff(offsets) < 0)):
+                raise ValueError("spike_times_offsets must be non-decreasing and go from 0 to the number of "
+                                 "spike times %d" % len(spike_times))
+            spike_times = np.split(spike_times, offsets[1:-1]) if len(offsets) > 1 else []
+        elif spike_times is not None:
+            self.__check_unit_values('spike_times', spike_times, ((None,),))
+        for name, shapes in self.__UNIT_SHAPES.items():
+            if kwargs.get(name) is not None:
+                self.__check_unit_values(name, kwargs[name], shapes)
+        kwargs['spike_times'] = spike_times
+        _add_table_rows(self, kwargs, ids=ids)
+        self.__set_electrode_table()
+
+    # the shapes of the value of each unit accepted by add_unit, other than spike_times
+    __UNIT_SHAPES = {'obs_intervals': ((None, 2),),
+                     'waveform_mean': ((None,), (None, None)),
+                     'waveform_sd': ((None,), (None, None)),
+                     'waveforms': ((None, None), (None, None, None))}
+
+    @staticmethod
+    def __check_unit_values(name, values, shapes):
+        """Check that the value of each unit is numeric and has one of the given shapes"""
+        if isinstance(values, np.ndarray) and values.dtype != object:
+            # check all units at once
+            dtypes, unit_shapes = [values.dtype], [values.shape[1:]]
+        else:
+            arrays = [np.asarray(value) for value in values]
+            dtypes, unit_shapes = [a.dtype for a in arrays], [a.shape for a in arrays]
+        for i, (dtype, shape) in enumerate(zip(dtypes, unit_shapes)):
+            if dtype.kind not in 'iuf':
+                raise TypeError("Units.add_units: incorrect type for '%s' of unit %d (got '%s', expected a "
+                                "numeric type)" % (name, i, dtype))
+            if not any(len(shape) == len(s) and all(x is None or x == y for x, y in zip(s, shape))
+                       for s in shapes):
+                raise ValueError("Units.add_units: incorrect shape for '%s' of unit %d (got '%s', expected '%s')"
+                                 % (name, i, shape, shapes[0] if len(shapes) == 1 else shapes))
+
+    def __set_electrode_table(self):
+        """Set the table of the electrodes column if it is not set yet"""
         if 'electrodes' in self:
             elec_col = self['electrodes'].target
             if elec_col.table is None:
@@ -217,12 +311,16 @@ class Units(DynamicTable):
 
     @docval({'name': 'index', 'type': (int, list, tuple, np.ndarray),
              'doc': 'the index of the unit in unit_ids to retrieve spike times for'},
-            {'name': 'in_interval', 'type': (tuple, list), 'doc': 'only return values within this interval',
-             'default': None, 'shape': (2,)})
+            {'name': 'in_interval', 'type': (tuple, list, np.ndarray),
+             'doc': 'only return values within this interval, or within the interval of each unit if index '
+                    'selects multiple units and one interval per unit is given',
+             'default': None, 'shape': ((2,), (None, 2))})
     def get_unit_spike_times(self, **kwargs):
         index, in_interval = getargs('index', 'in_interval', kwargs)
-        if type(index) in (list, tuple):
-            return [self.get_unit_spike_times(i, in_interval=in_interval) for i in index]
+        if isinstance(index, (list, tuple, np.ndarray)):
+            return self.__get_units_spike_times(index, in_interval)
+        if in_interval is not None and np.ndim(in_interval) != 1:
+            raise ValueError("in_interval must be a single interval if index is a single unit")
         if in_interval is None:
             return np.asarray(self['spike_times'][index])
         else:
@@ -236,12 +334,231 @@ class Units(DynamicTable):
 
             return np.asarray(st.target[ind_start:ind_stop])
 
+    def __get_units_spike_times(self, index, in_interval):
+        """
+        Get the spike times of multiple units at once.
+
+        The spike_times index is read once, and the spike times of all units are read with a few large reads
+        that merge the spike times of units stored close to each other.
+        """
+        index = np.asarray(index, dtype=np.int64).ravel()
+        st = self['spike_times']
+        ends = np.asarray(st.data[:], dtype=np.int64)
+        starts = np.zeros_like(ends)
+        starts[1:] = ends[:-1]
+        if in_interval is not None:
+            in_interval = np.asarray(in_interval, dtype=float)
+            if in_interval.ndim == 1:
+                in_interval = np.broadcast_to(in_interval, (len(index), 2))
+            elif len(in_interval) != len(index):
+                raise ValueError("in_interval must be a single interval or one interval per unit, got %d intervals "
+                                 "for %d units" % (len(in_interval), len(index)))
+        data = st.target.data
+        ret = [np.zeros(0, dtype=getattr(data, 'dtype', np.float64))] * len(index)
+        for i, values in _iter_ranges(data, starts[index], ends[index]):
+            if in_interval is not None:
+                start_time, stop_time = in_interval[i]
+                values = values[np.searchsorted(values, start_time, side='left'):
+                                np.searchsorted(values, stop_time, side='right')]
+            ret[i] = values
+        return ret
+
     @docval({'name': 'index', 'type': int,
              'doc': 'the index of the unit in unit_ids to retrieve observation intervals for'})
     def get_unit_obs_intervals(self, **kwargs):
         index = getargs('index', kwargs)
         return np.asarray(self['obs_intervals'][index])
 
+    @docval({'name': 'name', 'type': str,
+             'doc': "the name of a ragged column, e.g., 'spike_times', 'obs_intervals', 'electrodes', or 'waveforms'"},
+            returns='the flat data of the column followed by the offsets of each level of its index',
+            rtype=tuple)
+    def get_column_csr(self, **kwargs):
+        """
+        Get the values of a ragged column as CSR-style arrays, without splitting them into one array per unit.
+
+        For a column with a single index, such as spike_times, this returns a tuple ``(data, indptr)`` of
+        NumPy arrays, where the values of unit i are ``data[indptr[i]:indptr[i+1]]``. For a doubly indexed
+        column, such as waveforms, this returns ``(data, indptr, inner_indptr)``, where the rows of
+        inner_indptr of unit i are ``indptr[i]:indptr[i+1]`` and the values of row j of inner_indptr are
+        ``data[inner_indptr[j]:inner_indptr[j+1]]``. For waveforms, the rows of inner_indptr are the spikes
+        and the values are the waveforms of the spike on each electrode.
+
+        The flat data and the indices are read with a single read each, and data that is already stored in
+        a NumPy array is returned without copying.
+        """
+        name = getargs('name', kwargs)
+        index = self[name]
+        if not isinstance(index, VectorIndex):
+            raise ValueError("column '%s' is not a ragged column" % name)
+        return _get_csr(index)
+
+    @docval({'name': 'index', 'type': (int, list, tuple, np.ndarray),
+             'doc': 'the index of the unit to get the waveforms of, or the indices of multiple units'},
+            {'name': 'spikes', 'type': ('array_data', 'data'), 'default': None,
+             'doc': 'the indices of the spikes of the unit to get the waveforms of, or a list with the indices '
+                    'for each unit if index selects multiple units. By default, the waveforms of all spikes are '
+                    'returned'},
+            returns='the waveforms of the unit, or a list with the waveforms of each unit, as an array with shape '
+                    '(spikes, samples, electrodes)', rtype=(np.ndarray, list))
+    def get_unit_waveforms(self, **kwargs):
+        """
+        Get the individual waveforms of units as contiguous (spikes, samples, electrodes) arrays.
+
+        Both levels of the waveforms index are read once and resolved for all requested spikes at once, and
+        the waveforms of all spikes are read with a few large reads that merge the waveforms stored close to
+        each other. All spikes of a unit must have waveforms on the same number of electrodes.
+        """
+        index, spikes = getargs('index', 'spikes', kwargs)
+        multiple = isinstance(index, (list, tuple, np.ndarray))
+        units = np.asarray(index, dtype=np.int64).ravel()
+        if spikes is not None:
+            spikes = list(spikes) if multiple else [spikes]
+            if len(spikes) != len(units):
+                raise ValueError("spikes must be given for each unit, got %d values for %d units"
+                                 % (len(spikes), len(units)))
+        unit_indptr = _get_indptr(self['waveforms'])
+        spike_indptr = _get_indptr(self['waveforms'].target)
+        # the rows of the waveforms index for the selected spikes of each unit
+        unit_spikes = list()
+        for i, unit in enumerate(units.tolist()):
+            unit_spike_rows = np.arange(unit_indptr[unit], unit_indptr[unit + 1])
+            unit_spikes.append(unit_spike_rows if spikes is None else unit_spike_rows[np.asarray(spikes[i],
+                                                                                                 dtype=np.int64)])
+        spike_rows = np.concatenate([np.zeros(0, dtype=np.int64)] + unit_spikes)
+        data = self['waveforms'].target.target.data
+        values, offsets = _read_ranges(data, spike_indptr[spike_rows], spike_indptr[spike_rows + 1])
+        num_samples = values.shape[1] if values.ndim > 1 else 0
+        ret = list()
+        pos = 0
+        for unit, unit_spike_rows in zip(units.tolist(), unit_spikes):
+            num_electrodes = np.unique(spike_indptr[unit_spike_rows + 1] - spike_indptr[unit_spike_rows])
+            if len(num_electrodes) > 1:
+                raise ValueError("the spikes of unit %d have waveforms on different numbers of electrodes" % unit)
+            num_electrodes = num_electrodes[0] if len(num_electrodes) else 0
+            rows = offsets[pos:pos + len(unit_spike_rows), np.newaxis] + np.arange(num_electrodes)
+            # the rows of the waveforms are (spike, electrode) pairs with the samples along the second dimension
+            ret.append(np.ascontiguousarray(values[rows].reshape(len(unit_spike_rows), num_electrodes, num_samples)
+                                            .transpose(0, 2, 1)))
+            pos += len(unit_spike_rows)
+        return ret if multiple else ret[0]
+
+    @docval({'name': 'bin_edges', 'type': ('array_data', 'data'),
+             'doc': 'the increasing edges of the time bins, in seconds'},
+            {'name': 'index', 'type': (list, tuple, np.ndarray), 'default': None,
+             'doc': 'the indices of the units to count spikes for. By default, all units are used'},
+            {'name': 'sparse', 'type': bool, 'default': False,
+             'doc': 'return a scipy.sparse.csr_matrix instead of a dense array. Requires scipy'},
+            returns='the number of spikes of each unit (rows) in each time bin (columns)')
+    def get_spike_counts(self, **kwargs):
+        """
+        Count the spikes of units in time bins.
+
+        Each bin includes its left edge and excludes its right edge. The spike times are read in batches of
+        units with a bounded number of spikes, so memory use does not grow with the total number of spikes.
+        """
+        bin_edges, index, sparse = getargs('bin_edges', 'index', 'sparse', kwargs)
+        bin_edges = _check_bin_edges(bin_edges)
+        index = np.arange(len(self)) if index is None else np.asarray(index, dtype=np.int64).ravel()
+        num_bins = len(bin_edges) - 1
+        if sparse:
+            # import scipy only when needed since it is an optional dependency
+            from scipy.sparse import csr_matrix
+            keys, values = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+        else:
+            counts = np.zeros((len(index), num_bins), dtype=np.int64)
+        for batch_start, batch_stop, spike_times in self.__iter_spike_times(index):
+            units = np.repeat(np.arange(batch_start, batch_stop), [len(times) for times in spike_times])
+            spike_times = np.concatenate(spike_times)
+            bins = np.searchsorted(bin_edges, spike_times, side='right') - 1
+            in_bins = (bins >= 0) & (bins < num_bins)
+            batch_keys = (units[in_bins] - batch_start) * num_bins + bins[in_bins]
+            if sparse:
+                batch_keys, batch_values = np.unique(batch_keys, return_counts=True)
+                keys.append(batch_keys + batch_start * num_bins)
+                values.append(batch_values)
+            else:
+                counts[batch_start:batch_stop] = np.bincount(
+                    batch_keys, minlength=(batch_stop - batch_start) * num_bins
+                ).reshape(batch_stop - batch_start, num_bins)
+        if sparse:
+            keys = np.concatenate(keys)
+            return csr_matrix((np.concatenate(values), (keys // num_bins, keys % num_bins)),
+                              shape=(len(index), num_bins))
+        return counts
+
+    @docval({'name': 'bin_edges', 'type': ('array_data', 'data'),
+             'doc': 'the increasing edges of the time bins relative to each event, in seconds'},
+            {'name': 'events', 'type': ('array_data', 'data', TimeIntervals),
+             'doc': 'the times of the events to align to, in seconds, or a TimeIntervals table whose align_to '
+                    'column gives the times'},
+            {'name': 'align_to', 'type': str, 'default': 'start_time',
+             'doc': 'the column of the TimeIntervals table to align to'},
+            {'name': 'index', 'type': (list, tuple, np.ndarray), 'default': None,
+             'doc': 'the indices of the units to count spikes for. By default, all units are used'},
+            returns='the number of spikes of each unit in each time bin around each event, with shape '
+                    '(units, events, bins)', rtype=np.ndarray)
+    def get_aligned_spike_counts(self, **kwargs):
+        """
+        Count the spikes of units in time bins aligned to events, e.g., the start of trials.
+
+        Each bin includes its left edge and excludes its right edge. The bins around different events may
+        overlap. The spike times of each unit must be sorted.
+        """
+        bin_edges, events, align_to, index = getargs('bin_edges', 'events', 'align_to', 'index', kwargs)
+        bin_edges = _check_bin_edges(bin_edges)
+        if isinstance(events, TimeIntervals):
+            events = events[align_to].data[:]
+        events = np.asarray(events, dtype=float).ravel()
+        index = np.arange(len(self)) if index is None else np.asarray(index, dtype=np.int64).ravel()
+        edges = events[:, np.newaxis] + bin_edges[np.newaxis, :]
+        counts = np.zeros((len(index), len(events), len(bin_edges) - 1), dtype=np.int64)
+        for batch_start, _, spike_times in self.__iter_spike_times(index):
+            for i, times in enumerate(spike_times, start=batch_start):
+                counts[i] = np.diff(np.searchsorted(times, edges, side='left'), axis=1)
+        return counts
+
+    @docval(*get_docval(get_aligned_spike_counts),
+            returns='the mean firing rate of each unit in each time bin around the events, in spikes per second, '
+                    'with shape (units, bins)', rtype=np.ndarray)
+    def get_psth(self, **kwargs):
+        """
+        Compute the peri-stimulus time histogram (PSTH) of units around events, e.g., the start of trials.
+
+        This is the mean over events of :py:meth:`~pynwb.misc.Units.get_aligned_spike_counts` divided by the
+        width of the bins.
+        """
+        counts = self.get_aligned_spike_counts(**kwargs)
+        bin_widths = np.diff(np.asarray(kwargs['bin_edges'], dtype=float))
+        return counts.mean(axis=1) / bin_widths
+
+    def __iter_spike_times(self, index):
+        """
+        Read the spike times of the given units in batches of units with at most _SPIKE_BATCH_SIZE spikes
+        in total (or a single unit with more spikes).
+
+        :returns: Generator of (batch_start, batch_stop, spike_times) tuples, where spike_times is the list of
+                  the spike times of the units index[batch_start:batch_stop]
+        """
+        if len(index) == 0:
+            return
+        st = self['spike_times']
+        ends = np.asarray(st.data[:], dtype=np.int64)
+        starts = np.zeros_like(ends)
+        starts[1:] = ends[:-1]
+        starts, ends = starts[index], ends[index]
+        total = np.cumsum(ends - starts)
+        batch_start = 0
+        while batch_start < len(index):
+            offset = total[batch_start - 1] if batch_start > 0 else 0
+            batch_stop = max(int(np.searchsorted(total, offset + _SPIKE_BATCH_SIZE, side='right')), batch_start + 1)
+            spike_times = [np.zeros(0)] * (batch_stop - batch_start)
+            for i, values in _iter_ranges(st.target.data, starts[batch_start:batch_stop],
+                                          ends[batch_start:batch_stop]):
+                spike_times[i] = values
+            yield batch_start, batch_stop, spike_times
+            batch_start = batch_stop
+
 
 @register_class('DecompositionSeries', CORE_NAMESPACE)
 class DecompositionSeries(TimeSeries):
@@ -326,3 +643,15 @@ class DecompositionSeries(TimeSeries):
             self.__check_column('band_stdev', 'the standard deviation of Gaussian filters in Hz')
 
         self.bands.add_row({k: v for k, v in kwargs.items() if v is not None})
+
+
+# maximum number of spike times read at once when counting spikes of units
+_SPIKE_BATCH_SIZE = 2 ** 24
+
+
+def _check_bin_edges(bin_edges):
+    """Get the edges of time bins as a float array and check that they are increasing"""
+    bin_edges = np.asarray(bin_edges, dtype=float)
+    if bin_edges.ndim != 1 or len(bin_edges) < 2 or np.any(np.diff(bin_edges) <= 0):
+        raise ValueError("bin_edges must be a 1D array of at least 2 increasing values")
+    return bin_edges
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+#
+# sample documentation build configuration file, created by
+# sphinx-quickstart on Mon Apr 16 21:22:43 2012.
+#
+# This file is execfile()d with the current directory set to its containing dir.
+#
+# Not that not all possible configuration values are present in this
+# autogenerated file.
+#
+# All configuration values have a default; values that are commented out
+# serve to show the default.
+
+import sys
+sys.setrecursionlimit(1500)  # Attempt to fix problem with pickle on ReadTheDocs
+
+import sphinx_rtd_theme
+
+# -- Generate sources from YAML---------------------------------------------------
+spec_doc_rebuild_always = True   # Always rebuild the source docs from YAML even if the folder with the source files already exists
+
+def run_doc_autogen(_):
+   """
+   Execute the autogeneration of Sphinx format docs from the YAML sources
+   :param _:
+   """
+   import sys
+   import os
+   conf_file_dir = os.path.dirname(os.path.abspath(__file__))
+   sys.path.append(conf_file_dir)  # Need so that generate format docs can find the conf_doc_autogen file
+   from conf_doc_autogen import spec_output_dir
+
+   if spec_doc_rebuild_always or not os.path.exists(spec_output_dir):
+      from hdmf_docutils.generate_format_docs import main as generate_docs
+      generate_docs()
+
+def setup(app):
+   app.connect('builder-inited', run_doc_autogen)
+   app.add_css_file("theme_overrides.css")  # overrides for wide tables in RTD theme
+
+
+# -- ext settings -----------------------------------------------------
+
+# If extensions (or modules to document with autodoc) are in another directory,
+# add these directories to sys.path here. If the directory is relative to the
+# documentation root, use os.path.abspath to make it absolute, like shown here.
+#sys.path.insert(0, os.path.abspath('.'))
+
+autoclass_content = 'both'
+autodoc_docstring_signature = True
+autodoc_member_order = 'bysource'
+add_function_parentheses = False
+numfig = True
+
+# -- General configuration -----------------------------------------------------
+
+# If your documentation needs a minimal Sphinx version, state it here.
+#needs_sphinx = '1.0'
+
+# Add any Sphinx extension module names here, as strings. They can be extensions
+# coming with Sphinx (named 'sphinx.ext.*') or your custom ones.
+extensions = ['sphinx.ext.autodoc', 'sphinx.ext.intersphinx']
+
+# Add any paths that contain templates here, relative to this directory.
+templates_path = ['_templates']
+
+# The suffix of source filenames.
+source_suffix = '.rst'
+
+# The encoding of source files.
+#source_encoding = 'utf-8-sig'
+
+# The master toctree document.
+master_doc = 'source/index'
+master_doc = 'index'
+
+# General information about the project.
+project = u'NWB Format Specification'
+copyright = u'2017-2024, Neurodata Without Borders'
+
+# The version info for the project you're documenting, acts as replacement for
+# |version| and |release|, also used in various other places throughout the
+# built documents.
+#
+# The short X.Y version.
+version = '2.7.0'
+# The full version, including alpha/beta/rc tags.
+release = '2.7.0'
+
+# The language for content autogenerated by Sphinx. Refer to documentation
+# for a list of supported languages.
+#language = None
+
+# There are two options for replacing |today|: either, you set today to some
+# non-false value, then it is used:
+#today = ''
+# Else, today_fmt is used as the format for a strftime call.
+#today_fmt = '%B %d, %Y'
+
+# List of patterns, relative to source directory, that match files and
+# directories to ignore when looking for source files.
+exclude_patterns = ['_build', 'test.py']
+
+# The reST default role (used for this markup: `text`) to use for all documents.
+#default_role = None
+
+# If true, '()' will be appended to :func: etc. cross-reference text.
+#add_function_parentheses = True
+
+# If true, the current module name will be prepended to all description
+# unit titles (such as .. function::).
+#add_module_names = True
+
+# If true, sectionauthor and moduleauthor directives will be shown in the
+# output. They are ignored by default.
+#show_authors = False
+
+# The name of the Pygments (syntax highlighting) style to use.
+pygments_style = 'sphinx'
+
+# A list of ignored prefixes for module index sorting.
+#modindex_common_prefix = []
+
+intersphinx_mapping = {
+    'hdmf-common-schema': ('https://hdmf-common-schema.readthedocs.io/en/stable/', None),
+}
+
+
+# -- Options for HTML output ---------------------------------------------------
+
+# The theme to use for HTML and HTML Help pages.  See the documentation for
+# a list of builtin themes.
+#html_theme = 'default'
+#html_theme = "sphinxdoc"
+html_theme = "sphinx_rtd_theme"
+html_theme_path = [sphinx_rtd_theme.get_html_theme_path()]
+
+# Theme options are theme-specific and customize the look and feel of a theme
+# further.  For a list of options available for each theme, see the
+# documentation.
+#html_theme_options = {}
+
+# Add any paths that contain custom themes here, relative to this directory.
+#html_theme_path = []
+
+# The name for this set of Sphinx documents.  If None, it defaults to
+# "<project> v<release> documentation".
+#html_title = None
+
+# A shorter title for the navigation bar.  Default is the same as html_title.
+#html_short_title = None
+
+# The name of an image file (relative to this directory) to place at the top
+# of the sidebar.
+#html_logo = None
+#html_logo = 'neuron.png'
+
+# The name of an image file (within the static path) to use as favicon of the
+# docs.  This file should be a Windows icon file (.ico) being 16x16 or 32x32
+# pixels large.
+#html_favicon = 'neuron-180x180.png'
+
+# Add any paths that contain custom static files (such as style sheets) here,
+# relative to this directory. They are copied after the builtin static files,
+# so a file named "default.css" will overwrite the builtin "default.css".
+html_static_path = ['_static']
+
+# If not '', a 'Last updated on:' timestamp is inserted at every page bottom,
+# using the given strftime format.
+#html_last_updated_fmt = '%b %d, %Y'
+
+# If true, SmartyPants will be used to convert quotes and dashes to
+# typographically correct entities.
+#html_use_smartypants = True
+
+# Custom sidebar templates, maps document names to template names.
+#html_sidebars = {}
+
+# Additional templates that should be rendered to pages, maps page names to
+# template names.
+#html_additional_pages = {}
+
+# If false, no module index is generated.
+#html_domain_indices = True
+
+# If false, no index is generated.
+#html_use_index = True
+
+# If true, the index is split into individual pages for each letter.
+#html_split_index = False
+
+# If true, links to the reST sources are added to the pages.
+#html_show_sourcelink = True
+
+# If true, "Created using Sphinx" is shown in the HTML footer. Default is True.
+#html_show_sphinx = True
+
+# If true, "(C) Copyright ..." is shown in the HTML footer. Default is True.
+#html_show_copyright = True
+
+# If true, an OpenSearch description file will be output, and all pages will
+# contain a <link> tag referring to it.  The value of this option must be the
+# base URL from which the finished HTML is served.
+#html_use_opensearch = ''
+
+# This is the file name suffix for HTML files (e.g. ".xhtml").
+#html_file_suffix = None
+
+# Output file base name for HTML help builder.
+htmlhelp_basename = 'sampledoc'
+
+
+# -- Options for LaTeX output --------------------------------------------------
+
+latex_elements = {
+# The paper size ('letterpaper' or 'a4paper').
+'papersize': 'letterpaper',
+
+# The font size ('10pt', '11pt' or '12pt').
+'pointsize': '10pt',
+
+# Additional stuff for the LaTeX preamble.
+'preamble':
+"""
+\setcounter{tocdepth}{3}
+\setcounter{secnumdepth}{6}
+\\usepackage{enumitem}
+\setlistdepth{100}
+\\addto\\captionsenglish{\\renewcommand{\\contentsname}{Table of contents}}
+""",
+}
+# \\renewlist{itemize}{itemize}{100}
+
+# Grouping the document tree into LaTeX files. List of tuples
+# (source start file, target name, title, author, documentclass [howto/manual]).
+#latex_documents = [
+#  ('index', 'sample.tex', u'sample Documentation',
+#   u'Kenneth Reitz', 'manual'),
+#]
+
+# The name of an image file (relative to this directory) to place at the top of
+# the title page.
+#latex_logo = None
+
+# For "manual" documents, if this is true, then toplevel headings are parts,
+# not chapters.
+#latex_use_parts = False
+
+# If true, show page references after internal links.
+#latex_show_pagerefs = False
+
+# If true, show URL addresses after external links.
+#latex_show_urls = False
+
+# Documents to append as an appendix to all manuals.
+#latex_appendices = []
+
+# If false, no module index is generated.
+#latex_domain_indices = True
+
+
+# -- Options for manual page output --------------------------------------------
+
+# One entry per manual page. List of tuples
+# (source start file, name, description, authors, manual section).
+#man_pages = [
+#    ('index', 'sample', u'sample Documentation',
+#     [u'Kenneth Reitz'], 1)
+#]
+#
+## If true, show URL addresses after external links.
+##man_show_urls = False
+#
+#
+## -- Options for Texinfo output ------------------------------------------------
+#
+## Grouping the document tree into Texinfo files. List of tuples
+## (source start file, target name, title, author,
+##  dir menu entry, description, category)
+#texinfo_documents = [
+#  ('index', 'sample', u'sample Documentation',
+#   u'Kenneth Reitz', 'sample', 'One line description of project.',
+#   'Miscellaneous'),
+#]
+
+# Documents to append as an appendix to all manuals.
+#texinfo_appendices = []
+
+# If false, no module index is generated.
+#texinfo_domain_indices = True
+
+# How to display URL addresses: 'footnote', 'no', or 'inline'.
+#texinfo_show_urls = 'footnote'
@@ -2,8 +2,10 @@ import numpy as np
 from datetime import datetime
 from dateutil.tz import tzlocal
 
+from hdmf.backends.hdf5 import H5DataIO
+
 from pynwb import TimeSeries, NWBFile, NWBHDF5IO
-from pynwb.base import Images, Image, ImageReferences
+from pynwb.base import Images, Image, ImageReferences, TimeSeriesPyramid, TimeSeriesReference
 from pynwb.testing import AcquisitionH5IOMixin, TestCase, remove_test_file
 
 
@@ -67,6 +69,33 @@ class TestTimeSeriesLinking(TestCase):
         self.assertIs(tsa.data, tsb.data)
         self.assertIs(tsa.data, tsc.data)
 
+    def test_shared_timestamps_linking(self):
+        ''' Test that many TimeSeries sharing timestamps, directly or through a chain, link to the same dataset '''
+        tsa = TimeSeries(name='a', data=np.linspace(0, 1, 100), timestamps=np.arange(100.), unit='m')
+        nwbfile = NWBFile(identifier='foo',
+                          session_start_time=datetime(2017, 5, 1, 12, 0, 0, tzinfo=tzlocal()),
+                          session_description='bar')
+        nwbfile.add_acquisition(tsa)
+        prev = tsa
+        for i in range(50):
+            nwbfile.add_acquisition(TimeSeries(name='shared%d' % i, data=np.zeros(100), timestamps=tsa, unit='m'))
+            prev = TimeSeries(name='chain%d' % i, data=prev, timestamps=prev, unit='m')
+            nwbfile.add_acquisition(prev)
+        with NWBHDF5IO(self.path, 'w') as io:
+            io.write(nwbfile)
+        with NWBHDF5IO(self.path, 'r') as io:
+            nwbfile = io.read()
+            tsa = nwbfile.acquisition['a']
+            for i in range(50):
+                shared = nwbfile.acquisition['shared%d' % i]
+                chained = nwbfile.acquisition['chain%d' % i]
+                self.assertIs(shared.timestamps, tsa.timestamps)
+                self.assertIs(chained.timestamps, tsa.timestamps)
+                self.assertIs(chained.data, tsa.data)
+                self.assertEqual(chained.unit, 'm')
+                self.assertIs(shared.fields['timestamps'], tsa)
+                self.assertIs(chained.fields['data'], tsa)
+
 
 class TestImagesIO(AcquisitionH5IOMixin, TestCase):
 
@@ -78,3 +107,126 @@ class TestImagesIO(AcquisitionH5IOMixin, TestCase):
         images = Images(name='images_name', images=[image1, image2], order_of_images=image_references)
 
         return images
+
+
+class TestTimeSeriesEventAlignedData(TestCase):
+
+    def setUp(self):
+        self.path = 'test_event_aligned_data.nwb'
+
+    def tearDown(self):
+        remove_test_file(self.path)
+
+    def test_get_event_aligned_data_chunked(self):
+        """Test reading event-aligned data from a chunked dataset with overlapping and distant windows."""
+        data = np.arange(3000).reshape(1000, 3)
+        ts = TimeSeries(name='a', data=H5DataIO(data, chunks=(50, 3)), unit='m', rate=100.0)
+        nwbfile = NWBFile(identifier='foo',
+                          session_start_time=datetime(2017, 5, 1, 12, 0, 0, tzinfo=tzlocal()),
+                          session_description='bar')
+        nwbfile.add_acquisition(ts)
+        with NWBHDF5IO(self.path, 'w') as io:
+            io.write(nwbfile)
+        with NWBHDF5IO(self.path, 'r') as io:
+            read_ts = io.read().acquisition['a']
+            event_times = [0.5, 0.52, 9.0, 2.0]
+            ret = read_ts.get_event_aligned_data(event_times=event_times, window=(-0.1, 0.2), max_workers=2)
+        self.assertEqual(ret.shape, (4, 30, 3))
+        for i, t in enumerate(event_times):
+            start = int(round(t * 100)) - 10
+            np.testing.assert_array_equal(ret[i], data[start:start + 30])
+
+
+class TestTimeSeriesPyramidIO(TestCase):
+
+    def setUp(self):
+        self.path = 'test_timeseries_pyramid.nwb'
+
+    def tearDown(self):
+        remove_test_file(self.path)
+
+    def test_roundtrip_levels(self):
+        """Test that the levels of a pyramid can be stored in a processing module and used after reading."""
+        data = np.sin(np.arange(20000) / 100.)
+        ts = TimeSeries(name='a', data=H5DataIO(data, chunks=(1000,)), unit='m', rate=1000.0)
+        pyramid = TimeSeriesPyramid(ts, factor=10)
+        nwbfile = NWBFile(identifier='foo',
+                          session_start_time=datetime(2017, 5, 1, 12, 0, 0, tzinfo=tzlocal()),
+                          session_description='bar')
+        nwbfile.add_acquisition(ts)
+        module = nwbfile.create_processing_module(name='pyramids', description='overview of the acquisition')
+        for level in pyramid.to_timeseries():
+            module.add(level)
+        with NWBHDF5IO(self.path, 'w') as io:
+            io.write(nwbfile)
+        with NWBHDF5IO(self.path, 'r') as io:
+            read_nwbfile = io.read()
+            read_ts = read_nwbfile.acquisition['a']
+            levels = sorted(read_nwbfile.processing['pyramids'].data_interfaces.values(), key=lambda x: -x.rate)
+            read_pyramid = TimeSeriesPyramid.from_timeseries(read_ts, levels, factor=10)
+            self.assertEqual(read_pyramid.num_levels, pyramid.num_levels)
+            for kwargs in (dict(max_points=300), dict(start_time=3.0, stop_time=3.05, max_points=100)):
+                for expected, actual in zip(pyramid.get_data(**kwargs), read_pyramid.get_data(**kwargs)):
+                    np.testing.assert_array_equal(expected, actual)
+
+
+class TestTimeSeriesReferenceColumnsIO(TestCase):
+
+    def setUp(self):
+        self.path = 'test_timeseries_reference_columns.nwb'
+
+    def tearDown(self):
+        remove_test_file(self.path)
+
+    def test_get_columns(self):
+        """Test that the columns of a TimeSeriesReferenceVectorData read from file resolve each TimeSeries once"""
+        nwbfile = NWBFile(identifier='foo',
+                          session_start_time=datetime(2017, 5, 1, 12, 0, 0, tzinfo=tzlocal()),
+                          session_description='bar')
+        for name in ('a', 'b'):
+            nwbfile.add_acquisition(TimeSeries(name=name, data=np.arange(100.), unit='m', rate=10.0))
+        tsa, tsb = nwbfile.acquisition['a'], nwbfile.acquisition['b']
+        nwbfile.add_trial(start_time=0.0, stop_time=1.0, timeseries=[tsa, tsb])
+        nwbfile.add_trial(start_time=2.0, stop_time=3.0, timeseries=[tsb])
+        nwbfile.add_trial(start_time=4.0, stop_time=5.0, timeseries=[tsa])
+        with NWBHDF5IO(self.path, 'w') as io:
+            io.write(nwbfile)
+        with NWBHDF5IO(self.path, 'r') as io:
+            read_nwbfile = io.read()
+            tsa, tsb = read_nwbfile.acquisition['a'], read_nwbfile.acquisition['b']
+            column = read_nwbfile.trials['timeseries'].target
+            columns = column.get_columns()
+            np.testing.assert_array_equal(columns.idx_start, [0, 0, 20, 40])
+            np.testing.assert_array_equal(columns.count, [10, 10, 10, 10])
+            np.testing.assert_array_equal(columns.valid, [True, True, True, True])
+            self.assertListEqual(columns.categories.tolist(), [tsa, tsb])
+            self.assertListEqual(columns.timeseries.tolist(), [tsa, tsb, tsb, tsa])
+            self.assertIs(column.get_columns([3, 1]).timeseries[0], tsa)
+            self.assertListEqual(column[[3, 1]], [TimeSeriesReference(40, 10, tsa), TimeSeriesReference(0, 10, tsb)])
+            self.assertListEqual(read_nwbfile.trials.to_dataframe()['timeseries'][1],
+                                 [TimeSeriesReference(20, 10, tsb)])
+
+    def test_get_data(self):
+        """Test that the data of many references is read in a few reads and matches the data of each reference"""
+        nwbfile = NWBFile(identifier='foo',
+                          session_start_time=datetime(2017, 5, 1, 12, 0, 0, tzinfo=tzlocal()),
+                          session_description='bar')
+        data = np.arange(10000.).reshape(5000, 2)
+        nwbfile.add_acquisition(TimeSeries(name='a', data=H5DataIO(data, chunks=(500, 2)), unit='m', rate=10.0))
+        tsa = nwbfile.acquisition['a']
+        for i in range(100):
+            nwbfile.add_trial(start_time=i * 4.0, stop_time=i * 4.0 + 3.0 + i % 7 / 10, timeseries=[tsa])
+        with NWBHDF5IO(self.path, 'w') as io:
+            io.write(nwbfile)
+        with NWBHDF5IO(self.path, 'r') as io:
+            read_nwbfile = io.read()
+            column = read_nwbfile.trials['timeseries'].target
+            values = column.get_data(max_workers=2)
+            for ref, value in zip(column[:], values):
+                np.testing.assert_array_equal(value, ref.data)
+            padded = column.get_data(pad=True)
+            length = max(ref.count for ref in column[:])
+            self.assertTupleEqual(padded.shape, (100, length, 2))
+            ref = column[1]
+            np.testing.assert_array_equal(padded[1, :ref.count], data[ref.idx_start:ref.idx_start + ref.count])
+            self.assertTrue(np.all(np.isnan(padded[1, ref.count:])))
@@ -1,6 +1,10 @@
 import os
+
+import numpy as np
+from hdmf.common import DynamicTable, VectorData
 from pynwb.base import TimeSeriesReference
 from pynwb import NWBHDF5IO
+from pynwb.ecephys import ElectricalSeries
 from pynwb.testing import TestCase
 from pynwb.testing.mock.file import mock_NWBFile
 from pynwb.testing.mock.base import mock_TimeSeries
@@ -42,3 +46,41 @@ class TestFileCopy(TestCase):
             ts_val = nwb.trials["timeseries"][0][0]
             assert isinstance(ts_val, TimeSeriesReference)
             assert ts_val.timeseries is nwb.acquisition["test_ts"]
+
+    def test_copy_file_lazy(self):
+        """Test writing a lazy copy that links to the tables that were not accessed and reading that copy."""
+        new_nwb = mock_NWBFile()
+        test_ts = mock_TimeSeries(name="test_ts", timestamps=[1.0, 2.0, 3.0], data=[1.0, 2.0, 3.0])
+        new_nwb.add_acquisition(test_ts)
+        new_nwb.add_trial(start_time=1.0, stop_time=2.0, timeseries=[test_ts])
+        device = new_nwb.create_device(name="device")
+        group = new_nwb.create_electrode_group(name="group", description="desc", location="loc", device=device)
+        new_nwb.add_electrode(location="CA1", group=group)
+        new_nwb.add_electrode(location="CA3", group=group)
+        new_nwb.add_scratch(DynamicTable(name="scratch_table", description="a scratch table",
+                                         columns=[VectorData(name="col", description="a column", data=[1, 2])]))
+
+        with NWBHDF5IO(self.path1, 'w') as io:
+            io.write(new_nwb)
+
+        with NWBHDF5IO(self.path1, 'r') as base_io:
+            nwb = base_io.read()
+            self.assertIs(nwb.intervals["trials"], nwb.trials)
+            nwb_add = nwb.copy(lazy=True)
+            # reading the trials through the copy copies the table, which must not also be linked from intervals
+            self.assertEqual(len(nwb_add.trials), 1)
+            self.assertIsNot(nwb_add.trials, nwb.trials)
+            electrodes = nwb_add.create_electrode_table_region(region=[1], description="the CA3 electrode")
+            nwb_add.add_analysis(ElectricalSeries(name="analysis_es", data=np.ones((3, 1)), rate=1.0,
+                                                  electrodes=electrodes))
+            with NWBHDF5IO(self.path2, 'w', manager=base_io.manager) as out_io:
+                out_io.write(nwb_add)
+
+        with NWBHDF5IO(self.path2, 'r') as io:
+            nwb = io.read()
+            self.assertIs(nwb.analysis["analysis_es"].electrodes.table, nwb.electrodes)
+            self.assertListEqual(nwb.electrodes["location"][:].tolist(), ["CA1", "CA3"])
+            ts_val = nwb.trials["timeseries"][0][0]
+            self.assertIs(ts_val.timeseries, nwb.acquisition["test_ts"])
+            self.assertIs(nwb.intervals["trials"], nwb.trials)
+            self.assertListEqual(nwb.scratch["scratch_table"]["col"][:].tolist(), [1, 2])
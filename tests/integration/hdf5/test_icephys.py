@@ -269,3 +269,10 @@ class TestSweepTableRoundTripComplicated(NWBH5IOMixin, TestCase):
         self.assertEqual(names, ["pcs2a", "pcs2b"])
         sweep_numbers = [elem.sweep_number for elem in series]
         self.assertEqual(sweep_numbers, [4712, 4712])
+
+    def test_get_series_read(self):
+        """ Test getting the series of many sweeps from the SweepTable read from file """
+        sweep_table = self.roundtripContainer()
+        series = sweep_table.get_series([4712, 4713, 4711])
+        self.assertEqual([[elem.name for elem in x] if x is not None else None for x in series],
+                         [["pcs2a", "pcs2b"], None, ["pcs1"]])
@@ -61,6 +61,37 @@ class TestUnitsIO(AcquisitionH5IOMixin, TestCase):
         np.testing.assert_array_equal(received, [3., 4., 5.])
         np.testing.assert_array_equal(ut['spike_times'][:], [[0., 1., 2.], [3., 4., 5.]])
 
+    def test_get_spike_times_multi(self):
+        """ Test whether the spike times of multiple units read from file are what was written """
+        ut = self.roundtripContainer()
+        received = ut.get_unit_spike_times([1, 0])
+        np.testing.assert_array_equal(received[0], [3., 4., 5.])
+        np.testing.assert_array_equal(received[1], [0., 1., 2.])
+        received = ut.get_unit_spike_times([1, 0], in_interval=[(3.5, 5.), (-1., 0.)])
+        np.testing.assert_array_equal(received[0], [4., 5.])
+        np.testing.assert_array_equal(received[1], [0.])
+
+    def test_get_column_csr(self):
+        """ Test whether the CSR arrays of ragged columns read from file are what was written """
+        ut = self.roundtripContainer()
+        data, indptr = ut.get_column_csr('spike_times')
+        np.testing.assert_array_equal(data, [0., 1., 2., 3., 4., 5.])
+        np.testing.assert_array_equal(indptr, [0, 3, 6])
+        data, indptr, inner_indptr = ut.get_column_csr('waveforms')
+        self.assertEqual(data.shape, (ut['waveforms'].target.target.data.shape))
+        np.testing.assert_array_equal(indptr, np.concatenate([[0], ut['waveforms'].data[:]]))
+        np.testing.assert_array_equal(inner_indptr, np.concatenate([[0], ut['waveforms'].target.data[:]]))
+
+    def test_get_unit_waveforms(self):
+        """ Test whether the waveforms of units read from file are what was written """
+        ut = self.roundtripContainer()
+        for i in range(len(ut)):
+            expected = np.transpose(np.asarray(ut['waveforms'][i]), (0, 2, 1))
+            np.testing.assert_array_equal(ut.get_unit_waveforms(i), expected)
+        waveforms = ut.get_unit_waveforms([1, 0], spikes=[[2], [0, 1]])
+        np.testing.assert_array_equal(waveforms[0], np.transpose(np.asarray(ut['waveforms'][1]), (0, 2, 1))[[2]])
+        np.testing.assert_array_equal(waveforms[1], np.transpose(np.asarray(ut['waveforms'][0]), (0, 2, 1))[:2])
+
     def test_get_obs_intervals(self):
         """ Test whether the Units observation intervals read from file are what was written """
         ut = self.roundtripContainer()
@@ -1,3 +1,6 @@
+from unittest.mock import patch, PropertyMock
+
+import h5py
 import numpy as np
 from numpy.testing import assert_array_equal
 
@@ -8,9 +11,11 @@ from pynwb.base import (
     Image,
     TimeSeriesReferenceVectorData,
     TimeSeriesReference,
+    TimeSeriesPyramid,
     ImageReferences
 )
-from pynwb.testing import TestCase
+from pynwb.epoch import TimeIntervals
+from pynwb.testing import TestCase, remove_test_file
 from pynwb.testing.mock.base import mock_TimeSeries
 from hdmf.data_utils import DataChunkIterator
 from hdmf.backends.hdf5 import H5DataIO
@@ -405,6 +410,72 @@ class TestTimeSeries(TestCase):
         ts = mock_TimeSeries(data=[1., 2., 3.])
         assert_array_equal(ts.get_data_in_units(), [1., 2., 3.])
 
+    def test_get_event_aligned_data_rate(self):
+        ts = mock_TimeSeries(data=np.arange(200).reshape(100, 2), rate=10.0, starting_time=1.0)
+        ret = ts.get_event_aligned_data(event_times=[2.0, 5.0], window=(-0.2, 0.3))
+        self.assertEqual(ret.shape, (2, 5, 2))
+        assert_array_equal(ret[:, :, 0], [[16, 18, 20, 22, 24], [76, 78, 80, 82, 84]])
+
+    def test_get_event_aligned_data_out_of_bounds(self):
+        ts = mock_TimeSeries(data=np.arange(100, dtype=np.int16), rate=10.0, starting_time=0.0)
+        ret = ts.get_event_aligned_data(event_times=[0.1, 9.9], window=(-0.3, 0.2))
+        self.assertEqual(ret.dtype, np.float64)
+        assert_array_equal(ret, [[np.nan, np.nan, 0, 1, 2], [96, 97, 98, 99, np.nan]])
+        ret = ts.get_event_aligned_data(event_times=[0.1, 9.9], window=(-0.3, 0.2), fill_value=-1)
+        self.assertEqual(ret.dtype, np.int16)
+        assert_array_equal(ret, [[-1, -1, 0, 1, 2], [96, 97, 98, 99, -1]])
+
+    def test_get_event_aligned_data_timestamps(self):
+        timestamps = np.array([0.0, 0.1, 0.2, 0.25, 0.3, 0.4, 0.5])
+        ts = mock_TimeSeries(data=np.arange(7.), timestamps=timestamps, rate=None)
+        ret = ts.get_event_aligned_data(event_times=[0.1, 0.3], window=(0.0, 0.18))
+        assert_array_equal(ret, [[1, 2, 3], [4, 5, np.nan]])
+
+    def test_get_event_aligned_data_time_intervals(self):
+        ts = mock_TimeSeries(data=np.arange(100.), rate=10.0, starting_time=0.0)
+        intervals = TimeIntervals(name='trials')
+        intervals.add_interval(start_time=1.0, stop_time=2.0)
+        intervals.add_interval(start_time=1.1, stop_time=3.0)
+        intervals.add_interval(start_time=6.0, stop_time=7.0)
+        expected = [[10, 11, 12], [11, 12, 13], [60, 61, 62]]
+        assert_array_equal(ts.get_event_aligned_data(intervals, (0.0, 0.3)), expected)
+        assert_array_equal(ts.get_event_aligned_data(intervals, (0.0, 0.3), max_workers=2), expected)
+        assert_array_equal(ts.get_event_aligned_data(intervals, (-0.1, 0.0), align_to='stop_time'),
+                           [[19], [29], [69]])
+
+    def test_get_event_aligned_data_bad_window(self):
+        ts = mock_TimeSeries(data=np.arange(100.), rate=10.0)
+        with self.assertRaisesWith(ValueError, "window start must not be larger than window stop, got (0.5, 0.1)"):
+            ts.get_event_aligned_data(event_times=[1.0], window=(0.5, 0.1))
+
+    def test_num_samples_read_only_dataset_cached(self):
+        path = 'test_num_samples_cached.h5'
+        with h5py.File(path, 'w') as f:
+            f.create_dataset('data', data=np.arange(10.), maxshape=(None,))
+        try:
+            with h5py.File(path, 'r') as f:
+                ts = TimeSeries(name='test_ts', data=f['data'], unit='volts', timestamps=np.arange(10.))
+                self.assertEqual(ts.num_samples, 10)
+                with patch.object(h5py.Dataset, 'shape', new_callable=PropertyMock) as shape:
+                    self.assertEqual(ts.num_samples, 10)
+                    self.assertTrue(TimeSeriesReference(2, 5, ts).isvalid())
+                    shape.assert_not_called()
+        finally:
+            remove_test_file(path)
+
+    def test_num_samples_appendable_dataset_not_cached(self):
+        path = 'test_num_samples_appendable.h5'
+        try:
+            with h5py.File(path, 'w') as f:
+                dset = f.create_dataset('data', data=np.arange(10.), maxshape=(None,))
+                ts = TimeSeries(name='test_ts', data=dset, unit='volts', rate=1.0)
+                self.assertEqual(ts.num_samples, 10)
+                dset.resize((15,))
+                self.assertEqual(ts.num_samples, 15)
+                self.assertTrue(TimeSeriesReference(12, 3, ts).isvalid())
+        finally:
+            remove_test_file(path)
+
     def test_non_positive_rate(self):
         with self.assertRaisesWith(ValueError, 'Rate must not be a negative value.'):
             TimeSeries(name='test_ts', data=list(), unit='volts', rate=-1.0)
@@ -479,6 +550,69 @@ class TestTimeSeries(TestCase):
         self.assertIn('(link to processing/test_ts1/timestamps)', pm._repr_html_())
 
 
+class TestTimeSeriesPyramid(TestCase):
+
+    def setUp(self):
+        self.data = np.arange(2 * 950, dtype=np.int16).reshape(950, 2)
+        self.ts = mock_TimeSeries(name='test_ts', data=self.data, rate=100.0, starting_time=1.0)
+
+    def test_init(self):
+        pyramid = TimeSeriesPyramid(self.ts, factor=10, buffer_size=64)
+        self.assertIs(pyramid.timeseries, self.ts)
+        self.assertEqual(pyramid.factor, 10)
+        self.assertEqual(pyramid.num_levels, 2)
+        self.assertEqual(pyramid.bin_size(2), 100)
+
+    def test_bad_factor(self):
+        with self.assertRaisesWith(ValueError, "factor must be at least 2, got 1"):
+            TimeSeriesPyramid(self.ts, factor=1)
+
+    def test_num_levels(self):
+        pyramid = TimeSeriesPyramid(self.ts, factor=2, num_levels=3)
+        self.assertEqual(pyramid.num_levels, 3)
+
+    def test_get_data(self):
+        pyramid = TimeSeriesPyramid(self.ts, factor=10, buffer_size=64)
+        level, timestamps, minimum, maximum, mean = pyramid.get_data(max_points=20)
+        self.assertEqual(level, 2)
+        assert_array_equal(timestamps, 1.0 + np.arange(10))
+        assert_array_equal(minimum, self.data[::100])
+        assert_array_equal(maximum[:-1], self.data[99::100])
+        assert_array_equal(maximum[-1], self.data[-1])
+        assert_array_equal(mean[-1], self.data[900:].mean(axis=0))
+
+    def test_get_data_time_range(self):
+        pyramid = TimeSeriesPyramid(self.ts, factor=10)
+        level, timestamps, minimum, maximum, mean = pyramid.get_data(start_time=2.0, stop_time=3.0, max_points=10)
+        self.assertEqual(level, 1)
+        assert_array_equal(timestamps, 2.0 + np.arange(10) / 10)
+        assert_array_equal(minimum, self.data[100:200:10])
+        self.assertEqual(pyramid.select_level(start_time=2.0, stop_time=2.1, max_points=10), 0)
+        level, timestamps, minimum, maximum, mean = pyramid.get_data(start_time=2.0, stop_time=2.1, max_points=10)
+        assert_array_equal(minimum, self.data[100:110])
+        assert_array_equal(mean, self.data[100:110])
+
+    def test_get_data_timestamps(self):
+        ts = mock_TimeSeries(data=np.arange(1000.), timestamps=np.arange(1000.) / 100, rate=None)
+        pyramid = TimeSeriesPyramid(ts, factor=10)
+        level, timestamps, minimum, maximum, mean = pyramid.get_data(start_time=2.0, stop_time=4.0, max_points=50)
+        self.assertEqual(level, 1)
+        assert_array_equal(timestamps, np.arange(200, 400, 10) / 100)
+        assert_array_equal(maximum, np.arange(209., 400., 10))
+
+    def test_to_from_timeseries(self):
+        pyramid = TimeSeriesPyramid(self.ts, factor=10)
+        levels = pyramid.to_timeseries()
+        self.assertEqual([ts.name for ts in levels], ['test_ts_pyramid_10', 'test_ts_pyramid_100'])
+        self.assertEqual(levels[0].data.shape, (95, 3, 2))
+        self.assertEqual(levels[0].rate, 10.0)
+        self.assertEqual(levels[0].starting_time, 1.0)
+        reloaded = TimeSeriesPyramid.from_timeseries(self.ts, levels, factor=10)
+        self.assertEqual(reloaded.num_levels, 2)
+        for expected, actual in zip(pyramid.get_data(max_points=20), reloaded.get_data(max_points=20)):
+            assert_array_equal(expected, actual)
+
+
 class TestImage(TestCase):
     def test_init(self):
         im = Image(name="test_image", data=np.ones((10, 10)))
@@ -693,6 +827,111 @@ class TestTimeSeriesReferenceVectorData(TestCase):
             re[1], TimeSeriesReferenceVectorData.TIME_SERIES_REFERENCE_TUPLE(*values[1])
         )
 
+    def test_get_columns(self):
+        """Get data from a TimeSeriesReferenceVectorData as columns"""
+        ts1 = self._create_time_series_with_rate()
+        ts2 = self._create_time_series_with_rate()
+        temp = TimeSeriesReferenceVectorData(data=[
+            TimeSeriesReference(0, 5, ts1),
+            TimeSeriesReference(-1, -1, ts2),
+            TimeSeriesReference(2, 3, ts2),
+            TimeSeriesReference(1, 4, ts1),
+        ])
+        columns = temp.get_columns()
+        assert_array_equal(columns.idx_start, [0, -1, 2, 1])
+        assert_array_equal(columns.count, [5, -1, 3, 4])
+        assert_array_equal(columns.valid, [True, False, True, True])
+        assert_array_equal(columns.codes, [0, -1, 1, 0])
+        self.assertListEqual(columns.categories.tolist(), [ts1, ts2])
+        self.assertListEqual(columns.timeseries.tolist(), [ts1, None, ts2, ts1])
+
+        columns = temp.get_columns([3, 0])
+        assert_array_equal(columns.idx_start, [1, 0])
+        self.assertListEqual(columns.timeseries.tolist(), [ts1, ts1])
+        columns = temp.get_columns(np.array([False, True, True, False]))
+        assert_array_equal(columns.valid, [False, True])
+        columns = temp.get_columns(2)
+        assert_array_equal(columns.count, [3])
+
+    def test_get_data(self):
+        ts1 = mock_TimeSeries(name='ts1', data=np.arange(20.), rate=1.0)
+        ts2 = mock_TimeSeries(name='ts2', data=np.arange(100, 110), rate=1.0)
+        temp = TimeSeriesReferenceVectorData(data=[
+            TimeSeriesReference(0, 5, ts1),
+            TimeSeriesReference(-1, -1, ts2),
+            TimeSeriesReference(2, 3, ts2),
+            TimeSeriesReference(3, 4, ts1),
+            TimeSeriesReference(4, 0, ts1),
+        ])
+        data = temp.get_data()
+        self.assertEqual(len(data), 5)
+        for values, ref in zip(data, temp[:]):
+            if ref.timeseries is None:
+                self.assertIsNone(values)
+            else:
+                assert_array_equal(values, ref.data)
+        assert_array_equal(temp.get_data(key=[2, 0])[0], [102, 103, 104])
+
+        padded = temp.get_data(pad=True)
+        self.assertTupleEqual(padded.shape, (5, 5))
+        assert_array_equal(padded[0], [0, 1, 2, 3, 4])
+        assert_array_equal(padded[2], [102, 103, 104, np.nan, np.nan])
+        self.assertTrue(np.all(np.isnan(padded[[1, 4]])))
+        assert_array_equal(temp.get_data(key=slice(2, 4), pad=True, fill_value=-1)[0], [102, 103, 104, -1])
+
+    def test_get_data_out_of_range(self):
+        ts = mock_TimeSeries(name='ts', data=np.arange(20.), rate=1.0)
+        temp = TimeSeriesReferenceVectorData(data=[TimeSeriesReference(0, 5, ts), TimeSeriesReference(18, 5, ts)])
+        with self.assertRaisesWith(IndexError, "'idx_start + count' out of range for timeseries 'ts'"):
+            temp.get_data()
+
+    def test_add_rows(self):
+        ts1 = mock_TimeSeries(name='ts1', data=np.arange(20.), rate=1.0)
+        ts2 = mock_TimeSeries(name='ts2', data=np.arange(10.), rate=1.0)
+        temp = TimeSeriesReferenceVectorData()
+        temp.add_row(TimeSeriesReference(0, 1, ts1))
+        temp.add_rows(idx_start=np.array([0, 5, -1]), count=[5, 5, -1], timeseries=ts1)
+        temp.add_rows(idx_start=[1, 2], count=[3, 8], timeseries=[ts2, ts1])
+        self.assertEqual(len(temp), 6)
+        self.assertListEqual(temp[1:], [TimeSeriesReference(0, 5, ts1),
+                                        TimeSeriesReference(5, 5, ts1),
+                                        TimeSeriesReferenceVectorData.TIME_SERIES_REFERENCE_NONE_TYPE,
+                                        TimeSeriesReference(1, 3, ts2),
+                                        TimeSeriesReference(2, 8, ts1)])
+
+    def test_add_rows_bad_values(self):
+        ts = mock_TimeSeries(name='ts', data=np.arange(20.), rate=1.0)
+        temp = TimeSeriesReferenceVectorData()
+        with self.assertRaisesWith(IndexError, "'idx_start' 20 out of range for timeseries 'ts'"):
+            temp.add_rows(idx_start=[0, 20], count=[1, 1], timeseries=ts)
+        with self.assertRaisesWith(IndexError, "'count' -2 invalid. 'count' must be positive"):
+            temp.add_rows(idx_start=[0, 1], count=[1, -2], timeseries=ts)
+        with self.assertRaisesWith(IndexError, "'idx_start + count' out of range for timeseries 'ts'"):
+            temp.add_rows(idx_start=[0, 15], count=[1, 6], timeseries=ts)
+        with self.assertRaisesWith(TypeError, "idx_start must be an integer not float64"):
+            temp.add_rows(idx_start=[0.0], count=[1], timeseries=ts)
+        with self.assertRaisesWith(TypeError, "timeseries must be of type TimeSeries. <class 'int'>"):
+            temp.add_rows(idx_start=[0], count=[1], timeseries=[5])
+        with self.assertRaisesWith(ValueError, "timeseries must be a single TimeSeries or have the same length as "
+                                               "idx_start, got 2 TimeSeries for 1 references"):
+            temp.add_rows(idx_start=[0], count=[1], timeseries=[ts, ts])
+        self.assertEqual(len(temp), 0)
+
+    def test_extend(self):
+        ts = mock_TimeSeries(name='ts', data=np.arange(20.), rate=1.0)
+        temp = TimeSeriesReferenceVectorData()
+        temp.extend([TimeSeriesReference(0, 5, ts), (5, 5, ts)])
+        self.assertListEqual(temp[:], [TimeSeriesReference(0, 5, ts), TimeSeriesReference(5, 5, ts)])
+        with self.assertRaisesWith(TypeError, "count must be an integer <class 'float'>"):
+            temp.extend([(0, 1.0, ts)])
+        self.assertEqual(len(temp), 2)
+
+    def test_get_columns_empty(self):
+        columns = TimeSeriesReferenceVectorData().get_columns()
+        self.assertEqual(len(columns.idx_start), 0)
+        self.assertEqual(len(columns.timeseries), 0)
+        self.assertEqual(len(columns.categories), 0)
+
     def test_add_row(self):
         v = TimeSeriesReferenceVectorData(name='a', description='a')
         val = TimeSeriesReference(0, 5, TimeSeries(name='test', description='test',
@@ -3,6 +3,7 @@ from datetime import datetime
 from uuid import uuid4
 import os
 
+from hdmf.build import TypeMap
 from hdmf.term_set import TermSetWrapper
 
 from pynwb import NWBFile, get_loaded_type_config, load_type_config, unload_type_config
@@ -58,3 +59,22 @@ class TestPyNWBTypeConfig(TestCase):
         nwbfile.subject = subject
 
         self.assertIsInstance(nwbfile.subject.species, TermSetWrapper)
+
+
+class TestFieldTypeMap(TestCase):
+
+    def test_get_type_map(self):
+        """Test that the TypeMap for configuring fields is only copied if a type configuration is loaded"""
+        subject = Subject(subject_id="01")
+        self.assertIsNone(subject._get_type_map())
+        CUR_DIR = os.path.dirname(os.path.realpath(__file__))
+        load_type_config(config_path=os.path.join(CUR_DIR, 'test_config/test_nwb_config.yaml'))
+        try:
+            type_map = subject._get_type_map()
+            self.assertIsInstance(type_map, TypeMap)
+            self.assertIsNot(type_map, subject._get_type_map())
+        finally:
+            unload_type_config()
+        self.assertIsNone(subject._get_type_map())
+        subject.species = "Homo sapiens"
+        self.assertEqual(subject.species, "Homo sapiens")
@@ -1,12 +1,13 @@
+import h5py
 import numpy as np
 import pandas as pd
 from datetime import datetime
 from dateutil import tz
 
-from pynwb.epoch import TimeIntervals
+from pynwb.epoch import TimeIntervals, _searchsorted_dataset
 from pynwb import TimeSeries, NWBFile
 from pynwb.base import TimeSeriesReference, TimeSeriesReferenceVectorData
-from pynwb.testing import TestCase
+from pynwb.testing import TestCase, remove_test_file
 
 
 class TimeIntervalsTest(TestCase):
@@ -72,6 +73,167 @@ class TimeIntervalsTest(TestCase):
         for i, row in df.iterrows():
             nwbfile.add_epoch(start_time=row['start_time'], stop_time=row['stop_time'])
 
+    def test_add_intervals(self):
+        tsa, tsb = self.get_timeseries()
+        expected = TimeIntervals(name='epochs')
+        expected.add_column('foo', 'a column')
+        expected.add_interval(0.2, 0.5, tags='fizz, buzz', timeseries=[tsa, tsb], foo=1)
+        expected.add_interval(0.3, 0.9, tags=['qaz'], timeseries=[tsa, tsb], foo=2)
+        epochs = TimeIntervals(name='epochs')
+        epochs.add_column('foo', 'a column')
+        epochs.add_intervals(start_time=[0.2, 0.3], stop_time=[0.5, 0.9], tags=['fizz, buzz', ['qaz']],
+                             timeseries=[tsa, tsb], foo=[1, 2])
+        self.assertEqual(len(epochs), 2)
+        pd.testing.assert_frame_equal(epochs.to_dataframe(), expected.to_dataframe())
+
+    def test_add_intervals_per_interval_timeseries(self):
+        tsa, tsb = self.get_timeseries()
+        epochs = TimeIntervals(name='epochs')
+        epochs.add_interval(0.1, 0.2, timeseries=[tsa])
+        epochs.add_intervals(start_time=np.array([0.2, 0.3, 0.4]), stop_time=np.array([0.5, 0.9, 1.0]),
+                             timeseries=[tsa, [tsb, tsa], []], id=[10, 11, 12])
+        self.assertListEqual(epochs.id.data, [0, 10, 11, 12])
+        self.assertListEqual(epochs['timeseries'][1], [TimeSeriesReference(2, 3, tsa)])
+        self.assertListEqual(epochs['timeseries'][2],
+                             [TimeSeriesReference(1, 1, tsb), TimeSeriesReference(3, 6, tsa)])
+        self.assertListEqual(epochs['timeseries'][3], [])
+
+    def test_add_intervals_rate(self):
+        ts = TimeSeries(name='test_ts', data=list(range(1000)), unit='unit', rate=10.0, starting_time=0.5)
+        expected = TimeIntervals(name='epochs')
+        epochs = TimeIntervals(name='epochs')
+        start_time = np.arange(50) * 1.37 + 0.5
+        stop_time = start_time + 0.71
+        for start, stop in zip(start_time, stop_time):
+            expected.add_interval(start, stop, timeseries=ts)
+        epochs.add_intervals(start_time=start_time, stop_time=stop_time, timeseries=ts)
+        self.assertListEqual(epochs['timeseries'][:], expected['timeseries'][:])
+
+    def test_add_intervals_dataframe(self):
+        df = self.get_dataframe()
+        epochs = TimeIntervals(name='epochs')
+        epochs.add_column('foo', 'a column')
+        epochs.add_column('bar', 'a column')
+        epochs.add_column('keys', 'a column')
+        epochs.add_intervals(df)
+        pd.testing.assert_frame_equal(epochs.to_dataframe(), TimeIntervals.from_dataframe(df, name='epochs')
+                                      .to_dataframe()[['start_time', 'stop_time', 'foo', 'bar', 'keys', 'tags',
+                                                       'timeseries']])
+
+    def test_add_intervals_dataset_timestamps(self):
+        path = 'test_add_intervals_dataset_timestamps.h5'
+        timestamps = np.cumsum(np.random.default_rng(0).random(1000))
+        start_time = np.array([-1.0, 0.5, 3.0, 250.0, 100.0, timestamps[-1], timestamps[-1] + 1])
+        stop_time = start_time + 10.0
+        expected = TimeIntervals(name='epochs')
+        ts = TimeSeries(name='test_ts', data=list(range(1000)), unit='unit', timestamps=timestamps)
+        expected.add_intervals(start_time=start_time, stop_time=stop_time, timeseries=ts)
+        with h5py.File(path, 'w') as f:
+            f.create_dataset('timestamps', data=timestamps, chunks=(64,))
+        try:
+            with h5py.File(path, 'r') as f:
+                ts = TimeSeries(name='test_ts', data=list(range(1000)), unit='unit', timestamps=f['timestamps'])
+                epochs = TimeIntervals(name='epochs')
+                epochs.add_intervals(start_time=start_time, stop_time=stop_time, timeseries=ts)
+                epochs.add_interval(start_time=3.0, stop_time=13.0, timeseries=ts)
+                refs = [r[0][:2] for r in epochs['timeseries'][:]]
+                self.assertListEqual(refs[:-1], [r[0][:2] for r in expected['timeseries'][:]])
+                self.assertEqual(refs[-1], refs[2])
+        finally:
+            remove_test_file(path)
+
+    def test_searchsorted_dataset(self):
+        path = 'test_searchsorted_dataset.h5'
+        data = np.repeat(np.arange(500.), 2)
+        values = np.array([np.nan, 499.5, 3.0, -1.0, 250.0, 3.0, 0.0, 600.0, 63.0])
+        with h5py.File(path, 'w') as f:
+            f.create_dataset('chunked', data=data, chunks=(7,))
+            f.create_dataset('contiguous', data=data)
+        try:
+            with h5py.File(path, 'r') as f:
+                for name in ('chunked', 'contiguous'):
+                    for side in ('left', 'right'):
+                        with self.subTest(name=name, side=side):
+                            np.testing.assert_array_equal(_searchsorted_dataset(f[name], values, side=side),
+                                                          np.searchsorted(data, values, side=side))
+        finally:
+            remove_test_file(path)
+
+    def test_overlapping(self):
+        epochs = TimeIntervals(name='epochs')
+        epochs.add_intervals(start_time=[4.0, 0.0, 2.0, 0.0, 9.0], stop_time=[6.0, 10.0, 3.0, 1.0, 9.0],
+                             tags=['a', 'b', 'a, c', 'c', 'b'])
+        np.testing.assert_array_equal(epochs.overlapping(2.5, 4.5), [0, 1, 2])
+        np.testing.assert_array_equal(epochs.overlapping(start_time=3.0, stop_time=4.0), [1])
+        np.testing.assert_array_equal(epochs.overlapping(8, 9.5), [1, 4])
+        np.testing.assert_array_equal(epochs.overlapping(10.0, 11.0), [])
+        np.testing.assert_array_equal(epochs.overlapping(0.0, 5.0, tags='a'), [0, 2])
+        np.testing.assert_array_equal(epochs.overlapping(0.0, 5.0, tags=['b', 'c']), [1, 2, 3])
+        np.testing.assert_array_equal(epochs.overlapping(0.0, 5.0, tags='d'), [])
+
+    def test_containing(self):
+        epochs = TimeIntervals(name='epochs')
+        epochs.add_intervals(start_time=[4.0, 0.0, 2.0, 0.0, 9.0], stop_time=[6.0, 10.0, 3.0, 1.0, 9.0],
+                             tags=['a', 'b', 'a, c', 'c', 'b'])
+        time_idx, rows = epochs.containing([10.0, 2.0, 0.5, 9.0, -1.0, 4.0])
+        np.testing.assert_array_equal(time_idx, [1, 1, 2, 2, 3, 5, 5])
+        np.testing.assert_array_equal(rows, [1, 2, 1, 3, 1, 0, 1])
+        time_idx, rows = epochs.containing(times=2.5, tags=['a'])
+        np.testing.assert_array_equal(time_idx, [0])
+        np.testing.assert_array_equal(rows, [2])
+
+    def test_get_tag_index(self):
+        epochs = TimeIntervals(name='epochs')
+        epochs.add_intervals(start_time=[0.0, 1.0, 2.0, 3.0], stop_time=[1.0, 2.0, 3.0, 4.0],
+                             tags=['b, a', [], 'a, c, a', 'c'])
+        index = epochs.get_tag_index()
+        np.testing.assert_array_equal(index.tags, ['a', 'b', 'c'])
+        np.testing.assert_array_equal(index.counts, [2, 1, 2])
+        np.testing.assert_array_equal(index.indptr, [0, 2, 3, 5])
+        np.testing.assert_array_equal(index.rows, [0, 2, 0, 2, 3])
+        epochs.add_interval(4.0, 5.0, tags='d')
+        np.testing.assert_array_equal(epochs.get_tag_index().tags, ['a', 'b', 'c', 'd'])
+
+    def test_get_tag_index_no_tags(self):
+        epochs = TimeIntervals(name='epochs')
+        epochs.add_interval(0.0, 1.0)
+        index = epochs.get_tag_index()
+        self.assertEqual(len(index.tags), 0)
+        np.testing.assert_array_equal(index.indptr, [0])
+        np.testing.assert_array_equal(epochs.get_tag_mask('a'), [False])
+
+    def test_get_tag_mask(self):
+        epochs = TimeIntervals(name='epochs')
+        epochs.add_intervals(start_time=[0.0, 1.0, 2.0, 3.0], stop_time=[1.0, 2.0, 3.0, 4.0],
+                             tags=['b, a', [], 'a, c', 'c'])
+        np.testing.assert_array_equal(epochs.get_tag_mask('a'), [True, False, True, False])
+        np.testing.assert_array_equal(epochs.get_tag_mask(['b', 'c', 'x']), [True, False, True, True])
+        np.testing.assert_array_equal(epochs.get_tag_mask(['a', 'c'], match='all'), [False, False, True, False])
+        np.testing.assert_array_equal(epochs.get_tag_mask(['a', 'x'], match='all'), [False, False, False, False])
+        np.testing.assert_array_equal(epochs.get_tag_mask(tags=['a', 'c'], exclude='b'), [False, False, True, True])
+
+    def test_interval_index_reset(self):
+        epochs = TimeIntervals(name='epochs')
+        np.testing.assert_array_equal(epochs.overlapping(0.0, 1.0), [])
+        np.testing.assert_array_equal(epochs.containing([0.5])[1], [])
+        epochs.add_interval(0.0, 1.0)
+        np.testing.assert_array_equal(epochs.overlapping(0.0, 1.0), [0])
+        epochs.add_intervals(start_time=[0.5, 100.0], stop_time=[0.6, 200.0])
+        np.testing.assert_array_equal(epochs.overlapping(0.0, 1.0), [0, 1])
+        np.testing.assert_array_equal(epochs.containing([0.5, 150.0])[1], [0, 1, 2])
+        epochs.add_row(start_time=0.2, stop_time=0.3)
+        np.testing.assert_array_equal(epochs.overlapping(0.0, 1.0), [0, 1, 3])
+
+    def test_add_intervals_bad_args(self):
+        epochs = TimeIntervals(name='epochs')
+        with self.assertRaisesWith(ValueError, "stop_time is required if start_time is not a DataFrame"):
+            epochs.add_intervals(start_time=[0.1])
+        with self.assertRaisesWith(ValueError, "start_time and stop_time must have the same length, got 2 and 1"):
+            epochs.add_intervals(start_time=[0.1, 0.2], stop_time=[0.3])
+        with self.assertRaisesWith(ValueError, "no other arguments can be given if start_time is a DataFrame"):
+            epochs.add_intervals(start_time=self.get_dataframe(), stop_time=[0.3])
+        self.assertEqual(len(epochs), 0)
+
     def test_from_dataframe(self):
         df = pd.DataFrame({'start_time': [1., 2., 3.], 'stop_time': [2., 3., 4.], 'label': ['a', 'b', 'c']},
                           columns=('start_time', 'stop_time', 'label'))
@@ -1,13 +1,14 @@
 import numpy as np
 import pandas as pd
 
+from unittest.mock import patch, PropertyMock
 from datetime import datetime, timedelta
 from dateutil.tz import tzlocal, tzutc
 from hdmf.common import DynamicTable
 
 from hdmf.common import VectorData
 from hdmf.utils import docval, get_docval, popargs
-from pynwb import NWBFile, TimeSeries, NWBHDF5IO
+from pynwb import NWBFile, TimeSeries, NWBHDF5IO, H5DataIO
 from pynwb.base import Image, Images
 from pynwb.file import Subject, ElectrodeTable, _add_missing_timezone
 from pynwb.epoch import TimeIntervals
@@ -270,6 +271,21 @@ class NWBFileTest(TestCase):
         self.nwbfile.add_unit(id=3)
         self.assertEqual(len(self.nwbfile.units), 3)
 
+    def test_add_units(self):
+        self.nwbfile.add_unit(spike_times=[1.0], id=1)
+        self.nwbfile.add_units(spike_times=[[2.0, 3.0], [4.0]], id=[2, 3])
+        self.assertEqual(len(self.nwbfile.units), 3)
+        self.assertListEqual(self.nwbfile.units.id.data, [1, 2, 3])
+        np.testing.assert_array_equal(self.nwbfile.units.get_unit_spike_times(1), [2.0, 3.0])
+
+    def test_add_units_electrode_table(self):
+        device = self.nwbfile.create_device('a')
+        group = self.nwbfile.create_electrode_group('a', 'b', device=device, location='a')
+        for i in range(4):
+            self.nwbfile.add_electrode(location='a', group=group, id=i)
+        self.nwbfile.add_units(electrodes=[[0], [1, 2]])
+        self.assertIs(self.nwbfile.units['electrodes'].target.table, self.nwbfile.electrodes)
+
     def test_add_trial_column(self):
         self.nwbfile.add_trial_column('trial_type', 'the type of trial')
         self.assertEqual(self.nwbfile.trials.colnames, ('start_time', 'stop_time', 'trial_type'))
@@ -302,6 +318,26 @@ class NWBFileTest(TestCase):
         self.nwbfile.add_trial(start_time=50.0, stop_time=70.0)
         self.assertEqual(len(self.nwbfile.trials), 3)
 
+    def test_add_trials(self):
+        self.nwbfile.add_trial_column('trial_type', 'the type of trial')
+        self.nwbfile.add_trial(start_time=10.0, stop_time=20.0, trial_type='a')
+        self.nwbfile.add_trials(start_time=[30.0, 50.0], stop_time=[40.0, 70.0], trial_type=['b', 'c'])
+        self.assertEqual(len(self.nwbfile.trials), 3)
+        self.assertListEqual(self.nwbfile.trials['trial_type'].data, ['a', 'b', 'c'])
+        self.assertListEqual(self.nwbfile.trials['stop_time'].data, [20.0, 40.0, 70.0])
+
+    def test_add_epochs(self):
+        self.nwbfile.add_epochs(start_time=[0.0, 10.0], stop_time=[5.0, 20.0], tags=['a', 'b, c'])
+        self.assertEqual(len(self.nwbfile.epochs), 2)
+        self.assertListEqual(self.nwbfile.epochs['tags'][1], ['b', 'c'])
+        self.assertSetEqual(self.nwbfile.epoch_tags, {'a', 'b', 'c'})
+
+    def test_invalid_times_overlapping(self):
+        self.nwbfile.add_invalid_time_interval(start_time=5.0, stop_time=6.0)
+        self.nwbfile.add_invalid_time_interval(start_time=1.0, stop_time=2.0)
+        np.testing.assert_array_equal(self.nwbfile.invalid_times.overlapping(0.0, 5.5), [0, 1])
+        np.testing.assert_array_equal(self.nwbfile.invalid_times.containing([1.5, 3.0])[1], [1])
+
     def test_add_invalid_times_column(self):
         self.nwbfile.add_invalid_times_column('comments', 'description of reason for omitting time')
         self.assertEqual(self.nwbfile.invalid_times.colnames, ('start_time', 'stop_time', 'comments'))
@@ -395,6 +431,36 @@ class NWBFileTest(TestCase):
         with self.assertRaisesWith(ValueError, msg):
             nwbfile.add_electrode(group=elecgrp, id=0)
 
+    def test_add_electrode_unique_id(self):
+        nwbfile = NWBFile('a', 'b', datetime.now(tzlocal()))
+        device = nwbfile.create_device('a')
+        elecgrp = nwbfile.create_electrode_group('a', 'b', device=device, location='a')
+        nwbfile.add_electrode(location='a', group=elecgrp, id=0)
+        nwbfile.add_electrodes(location=['a', 'a'], group=elecgrp, id=[1, 2])
+        nwbfile.electrodes.add_row(location='a', group=elecgrp, group_name='a', id=3)
+        for i in range(4):
+            with self.assertRaisesWith(ValueError, "id %d already in the table" % i):
+                nwbfile.add_electrode(location='a', group=elecgrp, id=i)
+        with self.assertRaisesWith(ValueError, "id 4 already in the table"):
+            nwbfile.add_electrodes(location=['a', 'a'], group=elecgrp, id=[4, 4])
+        nwbfile.add_electrode(location='a', group=elecgrp, id=3, enforce_unique_id=False)
+        self.assertListEqual(nwbfile.electrodes.id.data, [0, 1, 2, 3, 3])
+
+    def test_add_electrodes_unique_auto_id(self):
+        nwbfile = NWBFile('a', 'b', datetime.now(tzlocal()))
+        device = nwbfile.create_device('a')
+        elecgrp = nwbfile.create_electrode_group('a', 'b', device=device, location='a')
+        nwbfile.add_electrode(location='a', group=elecgrp, id=1)
+        with self.assertRaisesWith(ValueError, "id 1 already in the table"):
+            nwbfile.add_electrode(location='a', group=elecgrp)
+        with self.assertRaisesWith(ValueError, "id 1 already in the table"):
+            nwbfile.add_electrodes(location=['a'], group=elecgrp)
+        with self.assertRaisesWith(ValueError, "id 1 already in the table"):
+            nwbfile.add_electrodes(location=['a', 'a'], group=elecgrp)
+        self.assertListEqual(nwbfile.electrodes.id.data, [1])
+        nwbfile.add_electrodes(location=['a'], group=elecgrp, enforce_unique_id=False)
+        self.assertListEqual(nwbfile.electrodes.id.data, [1, 1])
+
     def test_add_electrode_missing_group(self):
         """
         Test the case where the user creates an electrode table region with
@@ -405,6 +471,99 @@ class NWBFileTest(TestCase):
         with self.assertRaisesWith(ValueError, msg):
             nwbfile.add_electrode(location='a', id=0)
 
+    def test_add_electrodes(self):
+        dev1 = self.nwbfile.create_device(name='dev1')
+        group1 = self.nwbfile.create_electrode_group('tetrode1', 'tetrode description', 'tetrode location', dev1)
+        group2 = self.nwbfile.create_electrode_group('tetrode2', 'tetrode description', 'tetrode location', dev1)
+        self.nwbfile.add_electrode(x=1.0, y=2.0, z=3.0, location='CA1', group=group1, id=1)
+        self.nwbfile.add_electrodes(
+            x=[4.0, 7.0], y=np.array([5.0, 8.0]), z=[6.0, 9.0],
+            location=['CA1', 'CA3'],
+            group=[group1, group2],
+            id=[2, 3]
+        )
+        self.assertEqual(len(self.nwbfile.electrodes), 3)
+        self.assertEqual(self.nwbfile.electrodes.colnames, ('location', 'group', 'group_name', 'x', 'y', 'z'))
+        self.assertListEqual(self.nwbfile.electrodes.id.data, [1, 2, 3])
+        self.assertListEqual(self.nwbfile.electrodes['x'].data, [1.0, 4.0, 7.0])
+        self.assertListEqual(self.nwbfile.electrodes['location'].data, ['CA1', 'CA1', 'CA3'])
+        self.assertListEqual(self.nwbfile.electrodes['group'].data, [group1, group1, group2])
+        self.assertListEqual(self.nwbfile.electrodes['group_name'].data, ['tetrode1', 'tetrode1', 'tetrode2'])
+
+    def test_add_electrodes_single_group(self):
+        dev1 = self.nwbfile.create_device(name='dev1')
+        group = self.nwbfile.create_electrode_group('tetrode1', 'tetrode description', 'tetrode location', dev1)
+        self.nwbfile.add_electrodes(location=['CA1'] * 4, group=group, rel_y=[0.0, 10.0, 20.0, 30.0],
+                                    reference=['ref1'] * 4)
+        elec = self.nwbfile.electrodes[3]
+        self.assertEqual(elec.index[0], 3)
+        self.assertEqual(elec.iloc[0]['rel_y'], 30.0)
+        self.assertEqual(elec.iloc[0]['reference'], 'ref1')
+        self.assertEqual(elec.iloc[0]['group'], group)
+
+    def test_add_electrodes_dataframe(self):
+        dev1 = self.nwbfile.create_device(name='dev1')
+        group = self.nwbfile.create_electrode_group('tetrode1', 'tetrode description', 'tetrode location', dev1)
+        df = pd.DataFrame({'location': ['CA1', 'CA3'], 'group': [group, group], 'imp': [-1.0, -2.0]},
+                          index=pd.Index([5, 6], name='id'))
+        self.nwbfile.add_electrodes(df)
+        self.assertListEqual(self.nwbfile.electrodes.id.data, [5, 6])
+        self.assertListEqual(self.nwbfile.electrodes['imp'].data, [-1.0, -2.0])
+        self.assertListEqual(self.nwbfile.electrodes['group_name'].data, ['tetrode1', 'tetrode1'])
+
+    def test_add_electrodes_errors(self):
+        dev1 = self.nwbfile.create_device(name='dev1')
+        group = self.nwbfile.create_electrode_group('tetrode1', 'tetrode description', 'tetrode location', dev1)
+        with self.assertRaisesWith(ValueError, "The 'location' argument is required when creating an electrode."):
+            self.nwbfile.add_electrodes(location=['CA1', ''], group=group)
+        with self.assertRaisesWith(ValueError, "The 'group' argument is required when creating an electrode."):
+            self.nwbfile.add_electrodes(location=['CA1', 'CA1'])
+        with self.assertRaisesWith(ValueError, "The 'group' argument is required when creating an electrode."):
+            self.nwbfile.add_electrodes(location=['CA1', 'CA1'], group=[group, None])
+        self.nwbfile.add_electrodes(location=['CA1', 'CA1'], group=group, id=[0, 1])
+        with self.assertRaisesWith(ValueError, "id 1 already in the table"):
+            self.nwbfile.add_electrodes(location=['CA1', 'CA1'], group=group, id=[2, 1])
+        self.assertEqual(len(self.nwbfile.electrodes), 2)
+
+    def test_get_electrode_indices(self):
+        dev1 = self.nwbfile.create_device(name='dev1')
+        group1 = self.nwbfile.create_electrode_group('shank1', 'shank description', 'shank location', dev1)
+        group2 = self.nwbfile.create_electrode_group('shank2', 'shank description', 'shank location', dev1)
+        self.nwbfile.add_electrodes(location=['CA1', 'CA1', 'CA3', 'CA3'], group=[group1, group2, group1, group2],
+                                    x=[0.0, 10.0, 20.0, np.nan], rel_y=[5.0, 0.0, 5.0, 10.0])
+        np.testing.assert_array_equal(self.nwbfile.get_electrode_indices(), [0, 1, 2, 3])
+        np.testing.assert_array_equal(self.nwbfile.get_electrode_indices(location='CA3'), [2, 3])
+        np.testing.assert_array_equal(self.nwbfile.get_electrode_indices(location=['CA1', 'CA3'], group_name='shank2'),
+                                      [1, 3])
+        np.testing.assert_array_equal(self.nwbfile.get_electrode_indices(group=group1), [0, 2])
+        np.testing.assert_array_equal(self.nwbfile.get_electrode_indices(group=[group1, group2], location='CA1'),
+                                      [0, 1])
+        np.testing.assert_array_equal(self.nwbfile.get_electrode_indices(x=(5.0, 20.0)), [1, 2])
+        np.testing.assert_array_equal(self.nwbfile.get_electrode_indices(x=(None, 10.0)), [0, 1])
+        np.testing.assert_array_equal(self.nwbfile.get_electrode_indices(x=[10.0, None], rel_y=[5.0, 5.0]), [2])
+        np.testing.assert_array_equal(self.nwbfile.get_electrode_indices(location='DG'), [])
+
+    def test_get_electrode_indices_after_add(self):
+        dev1 = self.nwbfile.create_device(name='dev1')
+        group = self.nwbfile.create_electrode_group('shank1', 'shank description', 'shank location', dev1)
+        self.nwbfile.add_electrodes(location=['CA1', 'CA3'], group=group)
+        np.testing.assert_array_equal(self.nwbfile.get_electrode_indices(location='CA1'), [0])
+        self.nwbfile.add_electrode(location='CA1', group=group)
+        np.testing.assert_array_equal(self.nwbfile.get_electrode_indices(location='CA1'), [0, 2])
+        region = self.nwbfile.create_electrode_table_region(self.nwbfile.get_electrode_indices(location='CA1'),
+                                                            'CA1 electrodes')
+        self.assertListEqual(region.data, [0, 2])
+        self.assertIs(region.table, self.nwbfile.electrodes)
+
+    def test_get_electrode_indices_errors(self):
+        with self.assertRaisesWith(RuntimeError, "no electrodes available. add electrodes before selecting them"):
+            self.nwbfile.get_electrode_indices(location='CA1')
+        dev1 = self.nwbfile.create_device(name='dev1')
+        group = self.nwbfile.create_electrode_group('shank1', 'shank description', 'shank location', dev1)
+        self.nwbfile.add_electrode(location='CA1', group=group)
+        with self.assertRaisesWith(ValueError, "the electrodes table has no column 'x'"):
+            self.nwbfile.get_electrode_indices(x=(0.0, 1.0))
+
     def test_all_children(self):
         ts1 = TimeSeries('test_ts1', [0, 1, 2, 3, 4, 5], 'grams', timestamps=[0.0, 0.1, 0.2, 0.3, 0.4, 0.5])
         ts2 = TimeSeries('test_ts2', [0, 1, 2, 3, 4, 5], 'grams', timestamps=[0.0, 0.1, 0.2, 0.3, 0.4, 0.5])
@@ -421,6 +580,126 @@ class NWBFileTest(TestCase):
         self.assertIn(device, children)
         self.assertIn(elecgrp, children)
 
+    def test_objects_updated(self):
+        ts1 = TimeSeries('test_ts1', [0, 1, 2, 3, 4, 5], 'grams', timestamps=[0.0, 0.1, 0.2, 0.3, 0.4, 0.5])
+        self.nwbfile.add_acquisition(ts1)
+        self.assertIs(self.nwbfile.objects[ts1.object_id], ts1)
+        ts2 = TimeSeries('test_ts2', [0, 1, 2, 3, 4, 5], 'grams', timestamps=[0.0, 0.1, 0.2, 0.3, 0.4, 0.5])
+        module = self.nwbfile.create_processing_module('test_module', 'a test module')
+        module.add(ts2)
+        self.nwbfile.add_trial(start_time=0.0, stop_time=1.0)
+        self.assertIs(self.nwbfile.objects[ts2.object_id], ts2)
+        self.assertIs(self.nwbfile.objects[module.object_id], module)
+        self.assertIs(self.nwbfile.objects[self.nwbfile.trials.object_id], self.nwbfile.trials)
+        self.assertIs(self.nwbfile.objects[self.nwbfile.trials['start_time'].object_id],
+                      self.nwbfile.trials['start_time'])
+        self.assertEqual(len(self.nwbfile.objects), len(self.nwbfile.all_children()))
+
+        del self.nwbfile.processing['test_module']
+        self.assertNotIn(module.object_id, self.nwbfile.objects)
+        self.assertNotIn(ts2.object_id, self.nwbfile.objects)
+        self.assertIn(ts1.object_id, self.nwbfile.objects)
+        self.assertEqual(len(self.nwbfile.objects), len(self.nwbfile.all_children()))
+
+    def test_objects_updated_incrementally(self):
+        ts1 = TimeSeries('test_ts1', [0, 1, 2], 'grams', timestamps=[0.0, 0.1, 0.2])
+        ts2 = TimeSeries('test_ts2', [0, 1, 2], 'grams', timestamps=[0.0, 0.1, 0.2])
+        self.nwbfile.add_acquisition(ts1)
+        module = self.nwbfile.create_processing_module('test_module', 'a test module')
+        module.add(ts2)
+        self.nwbfile.objects
+        self.assertTrue(self.nwbfile.modified)  # the file was never written
+
+        ts3 = TimeSeries('test_ts3', [0, 1, 2], 'grams', timestamps=[0.0, 0.1, 0.2])
+        module.add(ts3)
+        with patch.object(TimeSeries, 'children', new_callable=PropertyMock, return_value=()) as children:
+            self.assertIs(self.nwbfile.objects[ts3.object_id], ts3)
+        # only the new TimeSeries is visited, not the unchanged TimeSeries in acquisition and in the module
+        children.assert_called_once()
+        self.assertEqual(len(self.nwbfile.objects), len(self.nwbfile.all_children()))
+
+        del module.data_interfaces['test_ts3']
+        self.assertNotIn(ts3.object_id, self.nwbfile.objects)
+        self.assertEqual(len(self.nwbfile.objects), len(self.nwbfile.all_children()))
+
+    def test_get_objects_by_type(self):
+        ts1 = TimeSeries('test_ts1', [0, 1, 2, 3, 4, 5], 'grams', timestamps=[0.0, 0.1, 0.2, 0.3, 0.4, 0.5])
+        self.nwbfile.add_acquisition(ts1)
+        device = self.nwbfile.create_device('a fake device')
+        group = self.nwbfile.create_electrode_group('shank1', 'shank description', 'shank location', device)
+        self.nwbfile.add_electrode(location='CA1', group=group)
+        es = ElectricalSeries(name='test_es', data=[[0.0]], timestamps=[0.0],
+                              electrodes=self.nwbfile.create_electrode_table_region([0], 'the electrode'))
+        self.nwbfile.add_acquisition(es)
+        self.assertListEqual(self.nwbfile.get_objects_by_type('ElectricalSeries'), [es])
+        self.assertCountEqual(self.nwbfile.get_objects_by_type(TimeSeries), [ts1, es])
+        self.assertListEqual(self.nwbfile.get_objects_by_type('TimeSeries', include_subtypes=False), [ts1])
+        self.assertListEqual(self.nwbfile.get_objects_by_type('Device'), [device])
+        self.assertListEqual(self.nwbfile.get_objects_by_type('Units'), [])
+
+        del self.nwbfile.acquisition['test_ts1']
+        self.assertListEqual(self.nwbfile.get_objects_by_type(TimeSeries), [es])
+
+    def test_objects_updated_after_read(self):
+        ts1 = TimeSeries('test_ts1', [0, 1, 2, 3, 4, 5], 'grams', timestamps=[0.0, 0.1, 0.2, 0.3, 0.4, 0.5])
+        self.nwbfile.add_acquisition(ts1)
+        self.path = 'test_objects_updated_after_read.nwb'
+        with NWBHDF5IO(self.path, 'w') as io:
+            io.write(self.nwbfile)
+        try:
+            with NWBHDF5IO(self.path, 'a') as io:
+                read_nwbfile = io.read()
+                self.assertEqual(len(read_nwbfile.objects), len(read_nwbfile.all_children()))
+                ts2 = TimeSeries('test_ts2', [0, 1, 2], 'grams', timestamps=[0.0, 0.1, 0.2])
+                read_nwbfile.add_acquisition(ts2)
+                self.assertIs(read_nwbfile.objects[ts2.object_id], ts2)
+                self.assertCountEqual([ts.name for ts in read_nwbfile.get_objects_by_type(TimeSeries)],
+                                      ['test_ts1', 'test_ts2'])
+                self.assertEqual(len(read_nwbfile.objects), len(read_nwbfile.all_children()))
+        finally:
+            remove_test_file(self.path)
+
+    def test_get_footprint(self):
+        ts1 = TimeSeries('test_ts1', np.zeros(1000), 'grams', timestamps=np.arange(1000.0))
+        ts2 = TimeSeries('test_ts2', [0, 1, 2, 3, 4, 5], 'grams', timestamps=ts1)
+        self.nwbfile.add_acquisition(ts1)
+        self.nwbfile.add_acquisition(ts2)
+        self.nwbfile.add_trial(start_time=0.0, stop_time=1.0)
+        footprint = self.nwbfile.get_footprint().set_index('path')
+        self.assertEqual(footprint.loc['/test_ts1/data', 'neurodata_type'], 'TimeSeries')
+        self.assertEqual(footprint.loc['/test_ts1/data', 'object_id'], ts1.object_id)
+        self.assertEqual(footprint.loc['/test_ts1/data', 'memory_bytes'], 8000)
+        self.assertTupleEqual(footprint.loc['/test_ts1/data', 'shape'], (1000, ))
+        self.assertEqual(footprint.loc['/test_ts2/data', 'memory_bytes'], 0)
+        self.assertGreater(footprint.loc['/test_ts2/data', 'overhead_bytes'], 0)
+        self.assertEqual(footprint.loc['/trials/start_time', 'neurodata_type'], 'VectorData')
+        # the timestamps of test_ts2 are linked to the timestamps of test_ts1
+        self.assertIn('/test_ts1/timestamps', footprint.index)
+        self.assertNotIn('/test_ts2/timestamps', footprint.index)
+        self.assertTrue(footprint['stored_bytes'].isna().all())
+
+    def test_get_footprint_read(self):
+        ts1 = TimeSeries('test_ts1', H5DataIO(np.zeros(10000), compression='gzip', chunks=(1000, )), 'grams',
+                         rate=1.0)
+        self.nwbfile.add_acquisition(ts1)
+        self.path = 'test_get_footprint_read.nwb'
+        with NWBHDF5IO(self.path, 'w') as io:
+            io.write(self.nwbfile)
+        try:
+            with NWBHDF5IO(self.path, 'r') as io:
+                footprint = io.read().get_footprint().set_index('path')
+                row = footprint.loc['/acquisition/test_ts1/data']
+                self.assertEqual(row['neurodata_type'], 'TimeSeries')
+                self.assertEqual(row['memory_bytes'], 0)
+                self.assertEqual(row['data_bytes'], 80000)
+                self.assertLess(row['stored_bytes'], 80000)
+                self.assertEqual(row['compression_ratio'], 80000 / row['stored_bytes'])
+                self.assertEqual(row['num_chunks'], 10)
+                self.assertTupleEqual(row['chunks'], (1000, ))
+                self.assertEqual(row['compression'], 'gzip')
+        finally:
+            remove_test_file(self.path)
+
     def test_fail_if_source_script_file_name_without_source_script(self):
         with self.assertRaises(ValueError):
             # <-- source_script_file_name without source_script is not allowed
@@ -500,6 +779,43 @@ Fields:
         self.assertIs(self.nwbfile.intervals['custom_interval']['stop_time'],
                       newfile.intervals['custom_interval']['stop_time'])
 
+    def test_copy_lazy(self):
+        self.nwbfile.add_unit(spike_times=[1., 2., 3.])
+        device = self.nwbfile.create_device('a')
+        elecgrp = self.nwbfile.create_electrode_group('a', 'b', device=device, location='a')
+        self.nwbfile.add_electrode(x=1.0, location='a', group=elecgrp, id=0)
+        self.nwbfile.add_trial(start_time=50.0, stop_time=70.0)
+        self.nwbfile.create_time_intervals('custom_interval', 'a custom time interval')
+        newfile = self.nwbfile.copy(lazy=True)
+
+        self.assertIs(self.nwbfile.devices['a'], newfile.devices['a'])
+        self.assertIs(self.nwbfile.intervals['custom_interval'], newfile.intervals['custom_interval'])
+        # the tables are linked until they are accessed
+        self.assertIs(newfile.fields['trials'], self.nwbfile.trials)
+        self.assertIs(newfile.fields['units'], self.nwbfile.units)
+        self.assertNotIn(newfile.fields['trials'], newfile.children)
+
+        # methods that only read a table do not copy it
+        self.assertListEqual(newfile.get_electrode_indices(location='a').tolist(), [0])
+        self.assertSetEqual(newfile.epoch_tags, set())
+        self.assertIs(newfile.fields['electrodes'], self.nwbfile.electrodes)
+
+        # any access of the attribute of a table copies the table, without copying its columns
+        electrodes = newfile.electrodes
+        self.assertIsNot(electrodes, self.nwbfile.electrodes)
+        self.assertIs(electrodes, newfile.electrodes)
+        self.assertIs(electrodes.parent, newfile)
+        self.assertIs(electrodes['x'], self.nwbfile.electrodes['x'])
+        self.assertIs(newfile.create_electrode_table_region([0], 'name').table, electrodes)
+        self.assertIs(newfile.objects[electrodes.object_id], electrodes)
+        self.assertIs(newfile.fields['trials'], self.nwbfile.trials)
+
+        # adding a column to a table of the copy does not add it to the table of the copied file
+        newfile.add_trial_column('new_col', 'a new column', data=[1])
+        self.assertIsNot(newfile.trials, self.nwbfile.trials)
+        self.assertIn('new_col', newfile.trials.colnames)
+        self.assertNotIn('new_col', self.nwbfile.trials.colnames)
+
     def test_multi_experimenters(self):
         self.nwbfile = NWBFile('a test session description for a test NWBFile',
                                'FILE123',
@@ -142,6 +142,37 @@ class IntracellularElectrodeConstructor(TestCase):
         self.assertEqual(elec.cell_id, 'this_cell')
 
 
+class SweepTableGetSeries(TestCase):
+
+    def setUp(self):
+        self.electrode = GetElectrode()
+        with self.assertWarns(DeprecationWarning):
+            self.sweep_table = SweepTable()
+        self.series = [PatchClampSeries('pcs%d' % i, [1, 2, 3], 'unit', self.electrode, 1.0, rate=1.0,
+                                        sweep_number=sweep_number)
+                       for i, sweep_number in enumerate([3, 1, 3, 2, 1])]
+        for pcs in self.series:
+            self.sweep_table.add_entry(pcs)
+
+    def test_get_series(self):
+        self.assertListEqual(self.sweep_table.get_series(1), [self.series[1], self.series[4]])
+        self.assertListEqual(self.sweep_table.get_series(np.uint64(3)), [self.series[0], self.series[2]])
+        self.assertIsNone(self.sweep_table.get_series(4))
+
+    def test_get_series_many(self):
+        self.assertListEqual(self.sweep_table.get_series([2, 4, 1]),
+                             [[self.series[3]], None, [self.series[1], self.series[4]]])
+        self.assertListEqual(self.sweep_table.get_series(np.array([], dtype=int)), [])
+
+    def test_get_series_after_add_entry(self):
+        self.assertIsNone(self.sweep_table.get_series(4))
+        pcs = PatchClampSeries('pcs5', [1, 2, 3], 'unit', self.electrode, 1.0, rate=1.0, sweep_number=4)
+        self.sweep_table.add_entry(pcs)
+        self.sweep_table.add_row(sweep_number=2, series=[pcs, self.series[0]])
+        self.assertListEqual(self.sweep_table.get_series(4), [pcs])
+        self.assertListEqual(self.sweep_table.get_series(2), [self.series[3], pcs, self.series[0]])
+
+
 class PatchClampSeriesConstructor(TestCase):
 
     def test_default(self):
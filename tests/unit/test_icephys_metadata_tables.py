@@ -12,9 +12,11 @@ from pandas.testing import assert_frame_equal
 from numpy.testing import assert_array_equal
 import warnings
 import h5py
+import pandas as pd
 
 
-from pynwb.testing import TestCase, remove_test_file, create_icephys_stimulus_and_response
+from pynwb.testing import (TestCase, remove_test_file, create_icephys_stimulus_and_response,
+                           create_icephys_testfile)
 from pynwb.file import NWBFile
 from pynwb.icephys import (
     VoltageClampStimulusSeries,
@@ -32,6 +34,8 @@ from pynwb.icephys import (
 from pynwb.device import Device
 from pynwb.base import TimeSeriesReferenceVectorData
 from pynwb import NWBHDF5IO
+from hdmf.common import DynamicTable, DynamicTableRegion, VectorIndex
+from hdmf.common.hierarchicaltable import to_hierarchical_dataframe, flatten_column_index
 from hdmf.utils import docval, popargs
 
 
@@ -751,6 +755,102 @@ class IntracellularRecordingsTableTests(ICEphysMetaTestBase):
         self.assertEqual(itr["electrodes"].values[0], elec)
 
 
+    def test_add_recordings(self):
+        """Test that add_recordings adds the same rows as add_recording"""
+        local_response = VoltageClampSeries(
+            name='vcs2',
+            data=[0.1, 0.2, 0.3],
+            rate=20e3,
+            electrode=self.electrode,
+            gain=0.02,
+        )
+        self.nwbfile.add_acquisition(local_response)
+        recordings = [dict(stimulus=self.stimulus, response=self.response, response_start_index=1),
+                      dict(stimulus=self.stimulus, response=None, stimulus_start_index=2, stimulus_index_count=2),
+                      dict(stimulus=None, response=local_response),
+                      dict(stimulus=self.stimulus, response=local_response, stimulus_index_count=1)]
+        expected = IntracellularRecordingsTable()
+        expected.add_column(name='quality', description='the quality of the recording')
+        expected.add_column(category='responses', name='gain', description='the gain of the response')
+        expected.add_category(category=DynamicTable(name='recording_lab_data', description='lab data'))
+        expected.add_column(category='recording_lab_data', name='location', description='recording location')
+        for i, recording in enumerate(recordings):
+            expected.add_recording(**recording, id=i + 10, quality=float(i),
+                                   response_metadata=dict(gain=i), recording_lab_data=dict(location='l%d' % i))
+
+        ir = IntracellularRecordingsTable()
+        ir.add_column(name='quality', description='the quality of the recording')
+        ir.add_column(category='responses', name='gain', description='the gain of the response')
+        ir.add_category(category=DynamicTable(name='recording_lab_data', description='lab data'))
+        ir.add_column(category='recording_lab_data', name='location', description='recording location')
+        row_indices = ir.add_recordings(
+            stimuli=[self.stimulus, self.stimulus, None, self.stimulus],
+            stimulus_start_index=[-1, 2, -1, -1],
+            stimulus_index_count=[-1, 2, -1, 1],
+            responses=[self.response, None, local_response, local_response],
+            response_start_index=np.array([1, -1, -1, -1]),
+            id=np.arange(10, 14),
+            quality=[0.0, 1.0, 2.0, 3.0],
+            response_metadata=dict(gain=[0, 1, 2, 3]),
+            recording_lab_data=dict(location=['l0', 'l1', 'l2', 'l3'])
+        )
+        assert_array_equal(row_indices, [0, 1, 2, 3])
+        assert_frame_equal(ir.to_dataframe(), expected.to_dataframe())
+        assert_array_equal(ir.add_recordings(stimuli=[self.stimulus], responses=[self.response], quality=[4.0],
+                                             response_metadata=dict(gain=[4]),
+                                             recording_lab_data=dict(location=['l4'])), [4])
+        self.assertTupleEqual(ir[4][('stimuli', 'stimulus')].iloc[0], (0, 5, self.stimulus))
+        self.write_test_helper(ir)
+
+    def test_add_recordings_stimulus_template(self):
+        ir = IntracellularRecordingsTable()
+        ir.add_recordings(stimuli=[self.stimulus, self.stimulus], responses=[self.response, self.response],
+                          stimulus_templates=[self.stimulus, None], stimulus_template_index_count=[2, -1])
+        res = ir.to_dataframe()
+        self.assertTupleEqual(res[('stimuli', 'stimulus_template')].iloc[0], (0, 2, self.stimulus))
+        self.assertTupleEqual(ir.category_tables['stimuli']['stimulus_template'].data[1], (-1, -1, self.stimulus))
+        self.assertIs(res[('electrodes', 'electrode')].iloc[0], self.electrode)
+
+    def test_add_recordings_no_stimulus_template(self):
+        """Test that add_recordings only adds the stimulus_template column if a stimulus template is given"""
+        ir = IntracellularRecordingsTable()
+        ir.add_recordings(stimuli=[self.stimulus, self.stimulus], responses=[self.response, self.response],
+                          stimulus_templates=[None, None])
+        self.assertNotIn('stimulus_template', ir.category_tables['stimuli'].colnames)
+        ir.add_recording(electrode=self.electrode, stimulus=self.stimulus, response=self.response)
+        self.assertNotIn('stimulus_template', ir.category_tables['stimuli'].colnames)
+
+    def test_add_recordings_errors(self):
+        ir = IntracellularRecordingsTable()
+        with self.assertRaisesWith(ValueError, "stimuli and responses cannot both be None."):
+            ir.add_recordings()
+        with self.assertRaisesWith(ValueError, "stimulus and response cannot both be None, got None for both in "
+                                               "recording 1"):
+            ir.add_recordings(stimuli=[self.stimulus, None], responses=[self.response, None])
+        with self.assertRaisesWith(IndexError, "stimulus_start_index out of range"):
+            ir.add_recordings(stimuli=[self.stimulus], responses=[self.response], stimulus_start_index=[5])
+        with self.assertRaisesWith(IndexError, "response_start_index + response_index_count out of range"):
+            ir.add_recordings(stimuli=[self.stimulus], responses=[self.response], response_index_count=[6])
+        local_stimulus = CurrentClampStimulusSeries(name="ccss", data=[1, 2, 3, 4, 5], rate=10e3,
+                                                    electrode=self.electrode, gain=0.1)
+        with self.assertRaisesWith(ValueError, "Incompatible types given for 'stimulus' and 'response' parameters. "
+                                               "'stimulus' is of type CurrentClampStimulusSeries and 'response' is "
+                                               "of type VoltageClampSeries."):
+            ir.add_recordings(stimuli=[self.stimulus, local_stimulus], responses=[self.response, self.response])
+        with self.assertRaisesWith(TypeError, "electrodes must be IntracellularElectrode objects, got "
+                                              "<class 'str'> for recording 1"):
+            ir.add_recordings(stimuli=[self.stimulus, self.stimulus], responses=[self.response, self.response],
+                              electrodes=[self.electrode, 'electrode'])
+        ir.add_column(category='stimuli', name='gain', description='the gain of the stimulus')
+        with self.assertRaisesWith(ValueError, "got 1 values of column 'gain' for 2 recordings"):
+            ir.add_recordings(stimuli=[self.stimulus, self.stimulus], responses=[self.response, self.response],
+                              stimulus_metadata=dict(gain=[1]))
+        self.assertEqual(len(ir), 0)
+        ir.add_recordings(stimuli=[self.stimulus], responses=[self.response], id=[3], stimulus_metadata=dict(gain=[1]))
+        with self.assertRaisesWith(ValueError, "id 3 already in the table"):
+            ir.add_recordings(stimuli=[self.stimulus], responses=[self.response], id=[3],
+                              stimulus_metadata=dict(gain=[1]))
+
 class SimultaneousRecordingsTableTests(ICEphysMetaTestBase):
     """
     Test class for testing the SimultaneousRecordingsTable Container class
@@ -1093,6 +1193,23 @@ class NWBFileTests(TestCase):
             sweep_number=np.uint64(15)
         )
 
+    def test_add_intracellular_recordings(self):
+        """
+        Test that add_intracellular_recordings adds the stimuli, responses, and electrodes to the file
+        """
+        nwbfile = self.__get_icephysfile()
+        device = self.__add_device(nwbfile)
+        electrode = IntracellularElectrode(name="elec0", description='a mock intracellular electrode', device=device)
+        stimulus = self.__get_stimulus(electrode=electrode)
+        response = self.__get_response(electrode=electrode)
+        row_indices = nwbfile.add_intracellular_recordings(stimuli=[stimulus, stimulus], responses=[response, None],
+                                                           electrodes=electrode)
+        assert_array_equal(row_indices, [0, 1])
+        self.assertIs(nwbfile.stimulus['ccss'], stimulus)
+        self.assertIs(nwbfile.acquisition['vcs'], response)
+        self.assertIs(nwbfile.icephys_electrodes['elec0'], electrode)
+        self.assertEqual(len(nwbfile.intracellular_recordings), 2)
+
     def test_deprecate_simultaneous_recordings_on_add_stimulus(self):
         """
         Test that warnings are raised if the user tries to use a simultaneous_recordings table
@@ -1294,6 +1411,88 @@ class NWBFileTests(TestCase):
         self.assertIsInstance(local_nwbfile.get_icephys_meta_parent_table(),
                               ExperimentalConditionsTable)
 
+    def test_get_icephys_meta_dataframe(self):
+        nwbfile = create_icephys_testfile()
+        expected = to_hierarchical_dataframe(nwbfile.get_icephys_meta_parent_table()).reset_index()
+        expected = flatten_column_index(expected, max_levels=2)
+        expected.columns = pd.MultiIndex.from_tuples(expected.columns, names=('source_table', 'label'))
+        assert_frame_equal(nwbfile.get_icephys_meta_dataframe(), expected)
+
+    def test_get_icephys_meta_dataframe_tables(self):
+        nwbfile = create_icephys_testfile()
+        df = nwbfile.get_icephys_meta_dataframe(tables=['repetitions', 'sequential_recordings'])
+        self.assertListEqual(df.columns.tolist(), [('repetitions', 'id'), ('repetitions', 'type'),
+                                                   ('sequential_recordings', 'id'),
+                                                   ('sequential_recordings', 'stimulus_type'),
+                                                   ('sequential_recordings', 'type')])
+        expected = nwbfile.get_icephys_meta_dataframe().drop_duplicates(('sequential_recordings', 'id'))
+        self.assertListEqual(df[('sequential_recordings', 'id')].tolist(),
+                             expected[('sequential_recordings', 'id')].tolist())
+        self.assertListEqual(df[('repetitions', 'id')].tolist(), expected[('repetitions', 'id')].tolist())
+
+        df = nwbfile.get_icephys_meta_dataframe(tables=['intracellular_recordings'], ignore_category_ids=True,
+                                                stimulus_refs_as_objectids=True)
+        assert_frame_equal(df, nwbfile.intracellular_recordings.to_dataframe(
+            ignore_category_ids=True, stimulus_refs_as_objectids=True).reset_index(), check_names=False)
+
+        msg = ("table 'trials' is not in the icephys metadata table hierarchy ['experimental_conditions', "
+               "'repetitions', 'sequential_recordings', 'simultaneous_recordings', 'intracellular_recordings']")
+        with self.assertRaisesWith(ValueError, msg):
+            nwbfile.get_icephys_meta_dataframe(tables=['trials'])
+
+    def test_get_icephys_meta_dataframe_read(self):
+        nwbfile = create_icephys_testfile()
+        expected = nwbfile.get_icephys_meta_dataframe(electrode_refs_as_objectids=True,
+                                                      stimulus_refs_as_objectids=True,
+                                                      response_refs_as_objectids=True)
+        with NWBHDF5IO(self.path, 'w') as io:
+            io.write(nwbfile)
+        with NWBHDF5IO(self.path, 'r') as io:
+            df = io.read().get_icephys_meta_dataframe(electrode_refs_as_objectids=True,
+                                                      stimulus_refs_as_objectids=True,
+                                                      response_refs_as_objectids=True)
+            assert_frame_equal(df, expected)
+
+    def test_get_icephys_meta_dataframe_other_region(self):
+        """Test that other DynamicTableRegion columns, even before the hierarchy column, are not followed"""
+        nwbfile = NWBFile(session_description='test', identifier='test', session_start_time=datetime.now(tzlocal()))
+        electrode = nwbfile.create_icephys_electrode(name='elec0', description='electrode',
+                                                     device=nwbfile.create_device(name='device'))
+        stimulus, response = create_icephys_stimulus_and_response(sweep_number=np.uint64(0), electrode=electrode,
+                                                                  randomize_data=False)
+        nwbfile.add_intracellular_recordings(electrodes=[electrode] * 2, stimuli=[stimulus] * 2,
+                                             responses=[response] * 2)
+        ir = nwbfile.intracellular_recordings
+        other = DynamicTableRegion(name='electrode_row', description='a row of the electrodes category',
+                                   data=[0], table=ir.category_tables['electrodes'])
+        recordings = DynamicTableRegion(name='recordings', description='the recordings', data=[1, 0], table=ir)
+        recordings_index = VectorIndex(name='recordings_index', data=[2], target=recordings)
+        nwbfile.icephys_simultaneous_recordings = SimultaneousRecordingsTable(
+            columns=[other, recordings, recordings_index], colnames=['electrode_row', 'recordings'])
+        df = nwbfile.get_icephys_meta_dataframe(ignore_category_ids=True)
+        self.assertListEqual(df[('intracellular_recordings', 'id')].tolist(), [1, 0])
+        self.assertIn(('simultaneous_recordings', 'electrode_row'), df.columns)
+
+    def test_get_icephys_meta_dataframe_no_columns(self):
+        nwbfile = NWBFile(session_description='test', identifier='test', session_start_time=datetime.now(tzlocal()))
+        self.assertIsNone(nwbfile.get_icephys_meta_dataframe())
+        electrode = nwbfile.create_icephys_electrode(name='elec0', description='electrode',
+                                                     device=nwbfile.create_device(name='device'))
+        stimulus, response = create_icephys_stimulus_and_response(sweep_number=np.uint64(0), electrode=electrode,
+                                                                  randomize_data=False)
+        nwbfile.add_intracellular_recordings(electrodes=[electrode] * 3, stimuli=[stimulus] * 3,
+                                             responses=[response] * 3)
+        nwbfile.add_icephys_simultaneous_recording(recordings=[2, 0])
+        nwbfile.add_icephys_simultaneous_recording(recordings=[])
+        nwbfile.add_icephys_simultaneous_recording(recordings=[1])
+        df = nwbfile.get_icephys_meta_dataframe(tables=['simultaneous_recordings', 'intracellular_recordings'],
+                                                ignore_category_ids=True)
+        self.assertListEqual(df[('simultaneous_recordings', 'id')].tolist(), [0, 0, 2])
+        self.assertListEqual(df[('intracellular_recordings', 'id')].tolist(), [2, 0, 1])
+        df = nwbfile.get_icephys_meta_dataframe(tables=['simultaneous_recordings'])
+        self.assertListEqual(df.columns.tolist(), [('simultaneous_recordings', 'id')])
+        self.assertListEqual(df[('simultaneous_recordings', 'id')].tolist(), [0, 1, 2])
+
     def test_add_icephys_meta_full_roundtrip(self):
         """
         This test adds all data and then constructs step-by-step the full table structure
@@ -1,7 +1,9 @@
 import numpy as np
+from unittest.mock import patch
 
-from hdmf.common import DynamicTable, VectorData, DynamicTableRegion
+from hdmf.common import DynamicTable, VectorData, VectorIndex, DynamicTableRegion
 
+from pynwb.epoch import TimeIntervals
 from pynwb.misc import AnnotationSeries, AbstractFeatureSeries, IntervalSeries, Units, DecompositionSeries
 from pynwb.file import TimeSeries, ElectrodeTable as get_electrode_table
 from pynwb.device import Device
@@ -215,6 +217,37 @@ class UnitsTests(TestCase):
         ut.add_unit(spike_times=[3, 4, 5])
         np.testing.assert_array_equal(ut.get_unit_spike_times((0, 1), (1.5, 3.5)), [[2], [3]])
 
+    def test_get_spike_times_multi_array_index(self):
+        ut = Units()
+        ut.add_unit(spike_times=[0, 1, 2])
+        ut.add_unit(spike_times=[])
+        ut.add_unit(spike_times=[3, 4, 5])
+        received = ut.get_unit_spike_times(np.array([2, 0, 1, 2]))
+        self.assertEqual(len(received), 4)
+        np.testing.assert_array_equal(received[0], [3, 4, 5])
+        np.testing.assert_array_equal(received[1], [0, 1, 2])
+        np.testing.assert_array_equal(received[2], [])
+        np.testing.assert_array_equal(received[3], [3, 4, 5])
+
+    def test_get_spike_times_multi_per_unit_interval(self):
+        ut = Units()
+        ut.add_unit(spike_times=[0, 1, 2])
+        ut.add_unit(spike_times=[3, 4, 5])
+        received = ut.get_unit_spike_times([0, 1, 0], in_interval=[(0.5, 2), (3, 3), (5, 6)])
+        np.testing.assert_array_equal(received[0], [1, 2])
+        np.testing.assert_array_equal(received[1], [3])
+        np.testing.assert_array_equal(received[2], [])
+
+    def test_get_spike_times_bad_interval(self):
+        ut = Units()
+        ut.add_unit(spike_times=[0, 1, 2])
+        ut.add_unit(spike_times=[3, 4, 5])
+        msg = "in_interval must be a single interval or one interval per unit, got 3 intervals for 2 units"
+        with self.assertRaisesWith(ValueError, msg):
+            ut.get_unit_spike_times([0, 1], in_interval=[(0, 1), (1, 2), (2, 3)])
+        with self.assertRaisesWith(ValueError, "in_interval must be a single interval if index is a single unit"):
+            ut.get_unit_spike_times(0, in_interval=[(0, 1), (1, 2)])
+
     def test_times(self):
         ut = Units()
         ut.add_unit(spike_times=[0, 1, 2])
@@ -252,6 +285,234 @@ class UnitsTests(TestCase):
         ut.add_unit(electrode_group=electrode_group)
         self.assertEqual(ut['electrode_group'][0], electrode_group)
 
+    def test_add_units(self):
+        device = Device('test_device')
+        electrode_group = ElectrodeGroup('test_electrode_group', 'description', 'location', device)
+        expected = Units()
+        expected.add_unit(spike_times=[0., 1.], obs_intervals=[[0, 2]], electrode_group=electrode_group,
+                          waveform_mean=[1., 2.], id=10)
+        expected.add_unit(spike_times=[], obs_intervals=[[2, 3], [4, 5]], electrode_group=electrode_group,
+                          waveform_mean=[3., 4.], id=11)
+        ut = Units()
+        ut.add_units(spike_times=[[0., 1.], []], obs_intervals=[[[0, 2]], [[2, 3], [4, 5]]],
+                     electrode_group=[electrode_group] * 2, waveform_mean=np.array([[1., 2.], [3., 4.]]),
+                     id=[10, 11])
+        self.assertEqual(len(ut), 2)
+        self.assertListEqual(ut.id.data, [10, 11])
+        self.assertListEqual(ut['spike_times'].data, expected['spike_times'].data)
+        self.assertListEqual(ut['obs_intervals'].data, expected['obs_intervals'].data)
+        np.testing.assert_array_equal(ut['obs_intervals'][1], [[2, 3], [4, 5]])
+        self.assertListEqual(ut['electrode_group'].data, [electrode_group] * 2)
+        np.testing.assert_array_equal(ut['waveform_mean'][:], [[1., 2.], [3., 4.]])
+
+    def test_add_units_offsets(self):
+        ut = Units()
+        ut.add_unit(spike_times=[0.5])
+        ut.add_units(spike_times=np.arange(6.), spike_times_offsets=[0, 2, 2, 6])
+        self.assertEqual(len(ut), 4)
+        self.assertListEqual(ut.id.data, [0, 1, 2, 3])
+        self.assertListEqual(ut['spike_times'].data, [1, 3, 3, 7])
+        np.testing.assert_array_equal(ut.get_unit_spike_times(1), [0., 1.])
+        np.testing.assert_array_equal(ut.get_unit_spike_times(2), [])
+        np.testing.assert_array_equal(ut.get_unit_spike_times(3), [2., 3., 4., 5.])
+
+    def test_add_units_index_dtype(self):
+        """Test that the spike_times index uses the same unsigned integer type as with add_unit"""
+        expected = Units()
+        ut = Units()
+        for table in (expected, ut):
+            table.add_unit(spike_times=[0.5])
+        self.assertIs(type(ut['spike_times'].data[0]), np.uint8)
+        for _ in range(2):
+            expected.add_unit(spike_times=np.arange(200.))
+        ut.add_units(spike_times=[np.arange(200.)] * 2)
+        for table in (expected, ut):
+            table.add_unit(spike_times=[1.5])
+        self.assertListEqual(ut['spike_times'].data, expected['spike_times'].data)
+        self.assertListEqual([type(x) for x in ut['spike_times'].data], [np.uint16] * 4)
+        self.assertListEqual([type(x) for x in expected['spike_times'].data], [np.uint16] * 4)
+
+    def test_add_units_electrodes(self):
+        table = get_electrode_table()
+        device = Device('test_device')
+        group = ElectrodeGroup('test_electrode_group', 'description', 'location', device)
+        for _ in range(4):
+            table.add_row(location='CA1', group=group, group_name='test_electrode_group')
+        ut = Units(electrode_table=table)
+        ut.add_units(electrodes=[[0, 1], [3]])
+        self.assertIs(ut['electrodes'].target.table, table)
+        self.assertListEqual(ut['electrodes'].data, [2, 3])
+        self.assertListEqual(ut['electrodes'].target.data, [0, 1, 3])
+
+    def test_add_units_bad_offsets(self):
+        ut = Units()
+        msg = "spike_times_offsets must be non-decreasing and go from 0 to the number of spike times 3"
+        with self.assertRaisesWith(ValueError, msg):
+            ut.add_units(spike_times=[0., 1., 2.], spike_times_offsets=[0, 2])
+        with self.assertRaisesWith(ValueError, msg):
+            ut.add_units(spike_times=[0., 1., 2.], spike_times_offsets=[0, 2, 1, 3])
+        with self.assertRaisesWith(ValueError, "spike_times must be given with spike_times_offsets"):
+            ut.add_units(spike_times_offsets=[0, 2])
+        self.assertEqual(len(ut), 0)
+
+    def test_add_units_bad_types(self):
+        device = Device('test_device')
+        group = ElectrodeGroup('test_electrode_group', 'description', 'location', device)
+        ut = Units()
+        msg = ("Units.add_units: incorrect type for 'electrode_group' of unit 1 (got 'str', "
+               "expected 'ElectrodeGroup')")
+        with self.assertRaisesWith(TypeError, msg):
+            ut.add_units(electrode_group=[group, 'group'])
+        msg = "Units.add_units: incorrect type for 'spike_times' of unit 1 (got '<U1', expected a numeric type)"
+        with self.assertRaisesWith(TypeError, msg):
+            ut.add_units(spike_times=[[0., 1.], ['a']])
+        msg = "Units.add_units: incorrect type for 'spike_times' (got '<U1', expected a numeric type)"
+        with self.assertRaisesWith(TypeError, msg):
+            ut.add_units(spike_times=['a', 'b'], spike_times_offsets=[0, 1, 2])
+        msg = "Units.add_units: incorrect type for 'obs_intervals' of unit 0 (got '<U1', expected a numeric type)"
+        with self.assertRaisesWith(TypeError, msg):
+            ut.add_units(obs_intervals=[[['a', 'b']]])
+        msg = "Units.add_units: incorrect type for 'id' (got 'float64', expected 'int')"
+        with self.assertRaisesWith(TypeError, msg):
+            ut.add_units(spike_times=[[0.]], id=[1.5])
+        self.assertEqual(len(ut), 0)
+
+    def test_add_units_bad_shapes(self):
+        ut = Units()
+        msg = "Units.add_units: incorrect shape for 'spike_times' of unit 0 (got '(1, 2)', expected '(None,)')"
+        with self.assertRaisesWith(ValueError, msg):
+            ut.add_units(spike_times=[[[0., 1.]]])
+        msg = "Units.add_units: incorrect shape for 'spike_times' (got '(1, 2)', expected '(None,)')"
+        with self.assertRaisesWith(ValueError, msg):
+            ut.add_units(spike_times=[[0., 1.]], spike_times_offsets=[0, 1])
+        msg = "Units.add_units: incorrect shape for 'obs_intervals' of unit 1 (got '(3,)', expected '(None, 2)')"
+        with self.assertRaisesWith(ValueError, msg):
+            ut.add_units(obs_intervals=[[[0, 1]], [0, 1, 2]])
+        msg = ("Units.add_units: incorrect shape for 'waveform_mean' of unit 0 (got '(2, 2, 2)', "
+               "expected '((None,), (None, None))')")
+        with self.assertRaisesWith(ValueError, msg):
+            ut.add_units(waveform_mean=np.zeros((2, 2, 2, 2)))
+        msg = ("Units.add_units: incorrect shape for 'waveforms' of unit 0 (got '(2,)', "
+               "expected '((None, None), (None, None, None))')")
+        with self.assertRaisesWith(ValueError, msg):
+            ut.add_units(waveforms=[[1., 2.]])
+        self.assertEqual(len(ut), 0)
+
+    def test_get_column_csr(self):
+        ut = Units()
+        ut.add_units(spike_times=[[0., 1., 2.], [], [3.]], obs_intervals=[[[0, 2]], [[2, 3], [4, 5]], [[0, 5]]])
+        data, indptr = ut.get_column_csr('spike_times')
+        np.testing.assert_array_equal(data, [0., 1., 2., 3.])
+        np.testing.assert_array_equal(indptr, [0, 3, 3, 4])
+        data, indptr = ut.get_column_csr(name='obs_intervals')
+        np.testing.assert_array_equal(data, [[0, 2], [2, 3], [4, 5], [0, 5]])
+        np.testing.assert_array_equal(indptr, [0, 1, 3, 4])
+
+    def test_get_column_csr_no_copy(self):
+        spike_times = np.arange(5.)
+        column = VectorData(name='spike_times', description='spike times', data=spike_times)
+        ut = Units(columns=[column, VectorIndex(name='spike_times_index', data=np.array([2, 5]), target=column)])
+        data, indptr = ut.get_column_csr('spike_times')
+        self.assertIs(data, spike_times)
+        np.testing.assert_array_equal(indptr, [0, 2, 5])
+
+    def test_get_column_csr_waveforms(self):
+        ut = Units()
+        wf1 = [[[1, 2], [3, 4]], [[5, 6], [7, 8]], [[9, 10], [11, 12]]]  # 3 spikes on 2 electrodes
+        wf2 = [[[13, 14]]]  # 1 spike on 1 electrode
+        ut.add_units(waveforms=[wf1, wf2])
+        data, indptr, inner_indptr = ut.get_column_csr('waveforms')
+        np.testing.assert_array_equal(data, np.arange(1, 15).reshape(7, 2))
+        np.testing.assert_array_equal(indptr, [0, 3, 4])
+        np.testing.assert_array_equal(inner_indptr, [0, 2, 4, 6, 7])
+
+    def test_get_unit_waveforms(self):
+        ut = Units()
+        wf1 = [[[1, 2], [3, 4]], [[5, 6], [7, 8]], [[9, 10], [11, 12]]]  # 3 spikes on 2 electrodes
+        wf2 = [[[13, 14]]]  # 1 spike on 1 electrode
+        ut.add_units(waveforms=[wf1, wf2])
+        waveforms = ut.get_unit_waveforms(0)
+        self.assertEqual(waveforms.shape, (3, 2, 2))
+        self.assertTrue(waveforms.flags['C_CONTIGUOUS'])
+        np.testing.assert_array_equal(waveforms, np.transpose(wf1, (0, 2, 1)))
+        np.testing.assert_array_equal(ut.get_unit_waveforms(index=1), [[[13], [14]]])
+        np.testing.assert_array_equal(ut.get_unit_waveforms(0, spikes=[2, 0]), np.transpose(wf1, (0, 2, 1))[[2, 0]])
+
+    def test_get_unit_waveforms_multi(self):
+        ut = Units()
+        wf1 = [[[1, 2], [3, 4]], [[5, 6], [7, 8]], [[9, 10], [11, 12]]]
+        wf2 = [[[13, 14]]]
+        ut.add_units(waveforms=[wf1, wf2])
+        waveforms = ut.get_unit_waveforms([1, 0])
+        self.assertEqual(len(waveforms), 2)
+        np.testing.assert_array_equal(waveforms[0], [[[13], [14]]])
+        np.testing.assert_array_equal(waveforms[1], np.transpose(wf1, (0, 2, 1)))
+        waveforms = ut.get_unit_waveforms([1, 0], spikes=[[], [1]])
+        self.assertEqual(waveforms[0].shape, (0, 2, 0))
+        np.testing.assert_array_equal(waveforms[1], [[[5, 7], [6, 8]]])
+        msg = "spikes must be given for each unit, got 1 values for 2 units"
+        with self.assertRaisesWith(ValueError, msg):
+            ut.get_unit_waveforms([1, 0], spikes=[[0]])
+
+    def test_get_unit_waveforms_different_electrodes(self):
+        ut = Units()
+        ut.add_unit(waveforms=[[[1, 2], [3, 4]], [[5, 6]]])
+        msg = "the spikes of unit 0 have waveforms on different numbers of electrodes"
+        with self.assertRaisesWith(ValueError, msg):
+            ut.get_unit_waveforms(0)
+        np.testing.assert_array_equal(ut.get_unit_waveforms(0, spikes=[1]), [[[5], [6]]])
+
+    def test_get_column_csr_not_ragged(self):
+        ut = Units()
+        ut.add_unit(waveform_mean=[1., 2.])
+        with self.assertRaisesWith(ValueError, "column 'waveform_mean' is not a ragged column"):
+            ut.get_column_csr('waveform_mean')
+
+    def test_get_spike_counts(self):
+        ut = Units()
+        ut.add_units(spike_times=[[0.1, 0.5, 1.0, 1.2, 3.5], [], [2.0, 2.5, 2.9]])
+        expected = [[2, 2, 0], [0, 0, 0], [0, 0, 3]]
+        np.testing.assert_array_equal(ut.get_spike_counts([0., 1., 2., 3.]), expected)
+        np.testing.assert_array_equal(ut.get_spike_counts([0., 1., 2., 3.], index=[2, 0]), [[0, 0, 3], [2, 2, 0]])
+        with patch('pynwb.misc._SPIKE_BATCH_SIZE', 2):
+            np.testing.assert_array_equal(ut.get_spike_counts([0., 1., 2., 3.]), expected)
+            np.testing.assert_array_equal(ut.get_spike_counts([0., 1., 2., 3.], sparse=True).toarray(), expected)
+
+    def test_get_spike_counts_sparse(self):
+        ut = Units()
+        ut.add_units(spike_times=[[0.1, 0.5, 1.0, 1.2, 3.5], [], [2.0, 2.5, 2.9]])
+        counts = ut.get_spike_counts(bin_edges=[0., 1., 2., 3.], sparse=True)
+        self.assertEqual(counts.shape, (3, 3))
+        self.assertEqual(counts.nnz, 3)
+        np.testing.assert_array_equal(counts.toarray(), [[2, 2, 0], [0, 0, 0], [0, 0, 3]])
+
+    def test_get_spike_counts_bad_bin_edges(self):
+        ut = Units()
+        ut.add_unit(spike_times=[0.1])
+        msg = "bin_edges must be a 1D array of at least 2 increasing values"
+        for bin_edges in ([0.], [0., 1., 1.], [[0., 1.]]):
+            with self.subTest(bin_edges=bin_edges):
+                with self.assertRaisesWith(ValueError, msg):
+                    ut.get_spike_counts(bin_edges)
+
+    def test_get_aligned_spike_counts(self):
+        ut = Units()
+        ut.add_units(spike_times=[[0.1, 0.5, 1.0, 1.2, 3.5], [2.0, 2.5, 2.9]])
+        counts = ut.get_aligned_spike_counts(bin_edges=[-0.5, 0., 0.5], events=[1.0, 3.0])
+        np.testing.assert_array_equal(counts, [[[1, 2], [0, 0]], [[0, 0], [2, 0]]])
+        trials = TimeIntervals(name='trials')
+        trials.add_intervals(start_time=[0.0, 2.0], stop_time=[1.0, 3.0])
+        counts = ut.get_aligned_spike_counts([0., 0.5, 1.0], trials, align_to='stop_time', index=[1])
+        np.testing.assert_array_equal(counts, [[[0, 0], [0, 0]]])
+        counts = ut.get_aligned_spike_counts([0., 0.5, 1.0], trials)
+        np.testing.assert_array_equal(counts, [[[1, 1], [0, 0]], [[0, 0], [1, 2]]])
+
+    def test_get_psth(self):
+        ut = Units()
+        ut.add_units(spike_times=[[0.1, 0.5, 1.0, 1.2, 3.5], [2.0, 2.5, 2.9]])
+        psth = ut.get_psth(bin_edges=[0., 0.5, 1.0], events=[0.0, 2.0])
+        np.testing.assert_allclose(psth, [[1., 1.], [1., 2.]])
+
     def test_waveform_attrs(self):
         ut = Units(waveform_rate=40000.)
         self.assertEqual(ut.waveform_rate, 40000.)